@@ -0,0 +1,65 @@
+"""
+Offline throughput check for the report-text client against the local stand-in.
+
+Generates texts for --clients scenario lists, of which --distinct are
+different (the rest repeat them, like clients with the same profile), with
+--latency-ms per backend call, then runs the same set again to show the
+cache taking over:
+
+    python benchmarks/bench_report_text.py --clients 2000 --distinct 500 \
+        --latency-ms 200
+"""
+import argparse
+import asyncio
+import time
+
+from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
+from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+from ru_smb_it_budget_planner.calculator.pipeline import evaluate_scenarios
+from ru_smb_it_budget_planner.ai_interface.report_text_client import (
+    ReportTextClient, DEFAULT_MAX_BATCH, DEFAULT_MAX_CONCURRENCY
+)
+from ru_smb_it_budget_planner.ai_interface.report_text_standin import start_standin
+
+EXAMPLES = "examples/small_retail_on_prem"
+
+
+async def _run(args: argparse.Namespace) -> None:
+    base = evaluate_scenarios(parse_infra_spec(f"{EXAMPLES}/infra.yaml"),
+                              load_pricing_context(f"{EXAMPLES}/pricing.yaml"))
+    distinct = [
+        [s.model_copy(update={"total_yearly_rub": s.total_yearly_rub + i})
+         for s in base]
+        for i in range(args.distinct)
+    ]
+    lists = [distinct[i % args.distinct] for i in range(args.clients)]
+
+    backend, server = await start_standin(port=0, latency_ms=args.latency_ms)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        async with ReportTextClient("127.0.0.1", port, max_batch=args.max_batch,
+                                    max_concurrency=args.concurrency) as client:
+            for label in ("cold", "warm"):
+                calls, hits = backend.requests, client.cache.hits
+                start = time.perf_counter()
+                await client.generate_many(lists)
+                elapsed = time.perf_counter() - start
+                print(f"{label}: {len(lists) / elapsed:,.0f} texts/s, {elapsed:.2f} s, "
+                      f"backend calls {backend.requests - calls}, "
+                      f"cache hits {client.cache.hits - hits}")
+    finally:
+        server.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--distinct", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
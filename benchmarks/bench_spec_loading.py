@@ -0,0 +1,76 @@
+"""
+Spec loading benchmark: pure-Python YAML vs libyaml vs JSON validation.
+
+Generates a synthetic spec with N on-prem servers (and as many workloads),
+writes it as YAML and JSON and reports the best-of-R load time per mode:
+
+    python benchmarks/bench_spec_loading.py --servers 50000 --repeat 3
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any, Callable, List, Tuple
+
+import yaml
+
+from ru_smb_it_budget_planner.models.infra_model import InfraSpec
+from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
+
+from synthetic import generate_infra
+
+
+def _legacy_load(path: str) -> InfraSpec:
+    """The original path: pure-Python safe_load followed by InfraSpec(**data)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return InfraSpec(**yaml.safe_load(f))
+
+
+def _best_of(func: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(servers: int, repeat: int) -> List[Tuple[str, float]]:
+    spec = generate_infra(2 * servers,
+                          counts={"on_prem_servers": servers, "workloads": servers})
+    with tempfile.TemporaryDirectory() as tmp:
+        yaml_path = os.path.join(tmp, "infra.yaml")
+        json_path = os.path.join(tmp, "infra.json")
+        with open(yaml_path, "w", encoding="utf-8") as f:
+            yaml.dump(spec, f, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper),
+                      allow_unicode=True)
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(spec, f, ensure_ascii=False)
+
+        return [
+            ("yaml.safe_load + InfraSpec(**data)",
+             _best_of(lambda: _legacy_load(yaml_path), repeat)),
+            ("parse_infra_spec (.yaml, CSafeLoader)",
+             _best_of(lambda: parse_infra_spec(yaml_path), repeat)),
+            ("parse_infra_spec (.json, validate_json)",
+             _best_of(lambda: parse_infra_spec(json_path), repeat)),
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--servers", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Спецификация: {args.servers} серверов и {args.servers} нагрузок, лучшее "
+          f"из {args.repeat}")
+    results = run(args.servers, args.repeat)
+    baseline = results[0][1]
+    for name, seconds in results:
+        print(f"{name:<42} {seconds:8.3f} с  x{baseline / seconds:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
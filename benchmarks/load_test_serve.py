@@ -0,0 +1,125 @@
+"""
+Load test for `ru-smb-it-budget-planner serve` on localhost.
+
+Sends --requests plan requests over --concurrency keep-alive connections and
+checks the p50/p99 latency targets; exits with status 1 if a target is missed.
+With --pricing the script starts the service itself on a free port:
+
+    python benchmarks/load_test_serve.py \\
+        --pricing examples/small_retail_on_prem/pricing.yaml \\
+        --spec examples/small_retail_on_prem/infra.yaml \\
+        --requests 5000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+import yaml
+
+from ru_smb_it_budget_planner.runner.server import start_service
+
+DEFAULT_SPEC = "examples/small_retail_on_prem/infra.yaml"
+
+
+async def _request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                   host: str, body: bytes) -> int:
+    writer.write(
+        f"POST /plan HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(host: str, port: int, body: bytes, count: int,
+                  latencies: List[float]) -> int:
+    reader, writer = await asyncio.open_connection(host, port)
+    failures = 0
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            if await _request(reader, writer, host, body) != 200:
+                failures += 1
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+    return failures
+
+
+async def run(host: str, port: int, body: bytes, requests: int, concurrency: int,
+              pricing: Optional[str]) -> Tuple[int, float, float]:
+    """Returns (failed requests, p50 ms, p99 ms)."""
+    server = batcher = None
+    if pricing:
+        service, server, batcher = await start_service(pricing, host, 0)
+        port = server.sockets[0].getsockname()[1]
+
+    latencies: List[float] = []
+    counts = [requests // concurrency + (1 if i < requests % concurrency else 0)
+              for i in range(concurrency)]
+    start = time.perf_counter()
+    failures = sum(
+        await asyncio.gather(
+            *(_client(host, port, body, c, latencies) for c in counts if c)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    if server is not None:
+        per_batch = service.requests_served / max(service.batches, 1)
+        print(f"Пакетов: {service.batches}, в среднем {per_batch:.1f} "
+              f"запросов в пакете")
+        server.close()
+        batcher.cancel()
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"Запросов: {len(latencies)}, ошибок: {failures}, "
+          f"{len(latencies) / elapsed:.0f} запросов/с")
+    print(f"p50 {p50:.1f} мс, p99 {p99:.1f} мс")
+    return failures, p50, p99
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--pricing",
+                        help="Start the service in-process with this pricing file")
+    parser.add_argument("--spec", default=DEFAULT_SPEC,
+                        help="Infrastructure spec to send (YAML or JSON)")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--p50-ms", type=float, default=20.0,
+                        help="Target median latency")
+    parser.add_argument("--p99-ms", type=float, default=100.0,
+                        help="Target 99th percentile latency")
+    args = parser.parse_args()
+
+    with open(args.spec, encoding="utf-8") as f:
+        spec = json.load(f) if args.spec.endswith(".json") else yaml.safe_load(f)
+    body = json.dumps(spec, ensure_ascii=False).encode("utf-8")
+
+    failures, p50, p99 = asyncio.run(
+        run(args.host, args.port, body, args.requests, args.concurrency, args.pricing))
+    ok = failures == 0 and p50 <= args.p50_ms and p99 <= args.p99_ms
+    print(f"Цели p50 <= {args.p50_ms:g} мс, p99 <= {args.p99_ms:g} мс: "
+          f"{'выполнены' if ok else 'НЕ выполнены'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Benchmark suite: parse, validate, compute and render stages per spec size.
+
+    python benchmarks/run_benchmarks.py                  # default sizes vs the baseline
+    python benchmarks/run_benchmarks.py --sizes 10,1000,1000000 --output out.json
+    python benchmarks/run_benchmarks.py --save-baseline  # refresh the baseline
+
+Each stage is timed separately on a seeded synthetic spec (see synthetic.py),
+best of --repeat runs. Results are written as JSON; a stage that is slower
+than the baseline by more than --threshold is reported and makes the script
+exit with status 1. Baselines are machine-specific: refresh them on the
+machine that runs the comparison.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import yaml
+
+from ru_smb_it_budget_planner.dsl.parser import (
+    YamlLoader, validate_infra_spec, validate_infra_spec_json
+)
+from ru_smb_it_budget_planner.calculator.scenario_builder import PricingContext
+from ru_smb_it_budget_planner.calculator.pipeline import (
+    evaluate_scenarios, build_ledger
+)
+from ru_smb_it_budget_planner.calculator.batch_engine import calculate_batch
+from ru_smb_it_budget_planner.calculator.consolidation import consolidate
+from ru_smb_it_budget_planner.reporting.tables import (
+    print_scenario_comparison, print_cost_breakdown
+)
+from ru_smb_it_budget_planner.reporting.owner_report_ru import generate_owner_report
+from ru_smb_it_budget_planner.reporting.ledger_export import write_ledger_csv
+
+from synthetic import generate_infra, generate_pricing
+
+DEFAULT_SIZES = (10, 100, 1_000, 10_000, 100_000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "baseline.json")
+# YAML parsing is by far the slowest stage; above this size it is skipped
+YAML_ITEM_LIMIT = 100_000
+# Consolidation packs per workload; 10,000 items are ~5,000 workloads on ~3,000 servers
+CONSOLIDATION_ITEM_LIMIT = 10_000
+# Slowdowns smaller than this are timer noise, whatever the ratio
+MIN_REGRESSION_MS = 0.5
+
+
+def _best_of(func: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _render(scenarios: List[Any]) -> None:
+    with contextlib.redirect_stdout(io.StringIO()):
+        print_scenario_comparison(scenarios)
+        print_cost_breakdown(scenarios)
+        generate_owner_report(scenarios)
+
+
+def bench_size(items: int, pricing: PricingContext, seed: int,
+               repeat: int) -> Dict[str, Optional[float]]:
+    data = generate_infra(items, seed)
+    json_bytes = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    infra = validate_infra_spec(data)
+    scenarios = evaluate_scenarios(infra, pricing)
+
+    stages: Dict[str, Optional[float]] = {}
+    if items <= YAML_ITEM_LIMIT:
+        dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+        yaml_text = yaml.dump(data, Dumper=dumper, allow_unicode=True)
+
+        def parse_yaml() -> Any:
+            # YamlLoader is the safe loader load_yaml uses, timed on its own
+            return yaml.load(yaml_text, Loader=YamlLoader)  # noqa: S506  # nosec B506
+
+        stages["parse_yaml"] = _best_of(parse_yaml, repeat)
+    else:
+        stages["parse_yaml"] = None
+    stages["parse_json"] = _best_of(lambda: json.loads(json_bytes), repeat)
+    stages["validate"] = _best_of(lambda: validate_infra_spec(data), repeat)
+    stages["parse_validate_json"] = _best_of(
+        lambda: validate_infra_spec_json(json_bytes), repeat
+    )
+    stages["compute"] = _best_of(lambda: evaluate_scenarios(infra, pricing), repeat)
+    stages["compute_batch_engine"] = _best_of(
+        lambda: calculate_batch([infra], pricing), repeat
+    )
+    stages["render"] = _best_of(lambda: _render(scenarios), repeat)
+    stages["ledger"] = _best_of(lambda: build_ledger(infra, pricing), repeat)
+    ledger = build_ledger(infra, pricing)
+    stages["ledger_csv"] = _best_of(lambda: write_ledger_csv(ledger, io.StringIO()),
+                                    repeat)
+    if items <= CONSOLIDATION_ITEM_LIMIT:
+        stages["consolidate"] = _best_of(lambda: consolidate(infra, pricing), repeat)
+    else:
+        stages["consolidate"] = None
+    return stages
+
+
+def run(sizes: List[int], seed: int, repeat: int) -> Dict[str, Any]:
+    pricing = PricingContext.model_validate(generate_pricing(seed))
+    results = []
+    for items in sizes:
+        for stage, seconds in bench_size(items, pricing, seed, repeat).items():
+            results.append({"items": items, "stage": stage, "seconds": seconds})
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float) -> List[str]:
+    """Prints current vs baseline and returns the regressions."""
+    previous = {(r["items"], r["stage"]): r["seconds"] for r in baseline["results"]}
+    regressions = []
+    print(f"{'Элементов':>10} {'Этап':<22} {'Сейчас, мс':>12} {'База, мс':>12} "
+          f"{'Отношение':>10}")
+    for r in current["results"]:
+        now, before = r["seconds"], previous.get((r["items"], r["stage"]))
+        if now is None:
+            continue
+        line = f"{r['items']:>10} {r['stage']:<22} {now * 1000:>12.3f}"
+        if before:
+            ratio = now / before
+            slower = ratio > threshold and (now - before) * 1000 > MIN_REGRESSION_MS
+            flag = "  <-- регрессия" if slower else ""
+            print(f"{line} {before * 1000:>12.3f} {ratio:>10.2f}{flag}")
+            if flag:
+                regressions.append(f"{r['stage']} @ {r['items']}: x{ratio:.2f}")
+        else:
+            print(f"{line} {'-':>12} {'-':>10}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Comma-separated item counts (10 .. 1000000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Overwrite the baseline with this run")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Slowdown ratio that counts as a regression")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    current = run(sizes, args.seed, args.repeat)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"Базовые результаты сохранены в {args.baseline}")
+        return
+
+    baseline = {"results": []}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = compare(current, baseline, args.threshold)
+    if regressions:
+        print("Регрессии производительности:\n"
+              + "\n".join(f"- {r}" for r in regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
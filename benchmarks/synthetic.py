@@ -0,0 +1,171 @@
+"""
+Seeded synthetic InfraSpec and pricing generators for the benchmarks.
+
+Specs mix items the way CMDB exports of Russian SMB clients do: servers
+concentrated in Moscow and St. Petersburg with a long tail of regions (in
+the spellings customers actually write), mostly 1C/web/DB workloads, and
+personal data flags that depend on the workload type. The same seed always
+gives the same spec.
+"""
+import random
+from typing import Any, Dict, List, Optional
+
+from ru_smb_it_budget_planner.models.regions import REGION_DISTRICTS
+
+# (spelling in customer files, weight)
+REGION_MIX = (
+    ("Москва", 30), ("г. Москва", 5), ("Moscow", 2), ("Санкт-Петербург", 12),
+    ("СПб", 3), ("Московская обл.", 6), ("Татарстан", 5),
+    ("Новосибирская область", 4), ("Свердловская область", 4),
+    ("Краснодарский край", 4), ("Нижегородская область", 3),
+    ("Самарская область", 3), ("Ростовская область", 3),
+    ("Республика Башкортостан", 2), ("Приморский край", 2),
+    ("Красноярский край", 2), ("Калининградская область", 2),
+    ("Республика Саха (Якутия)", 1), ("Камчатский край", 1),
+    ("Чукотский автономный округ", 1),
+)
+
+# type -> (weight, vcpus choices, ram per vcpu, storage range, P(personal data))
+WORKLOAD_MIX = {
+    "1c": (25, (2, 4, 8, 16), 4, (100, 1000), 0.9),
+    "web": (25, (1, 2, 4), 2, (20, 200), 0.2),
+    "db": (15, (4, 8, 16, 32), 8, (200, 4000), 0.7),
+    "bitrix": (10, (2, 4, 8), 4, (50, 500), 0.6),
+    "email": (10, (2, 4), 4, (200, 2000), 0.8),
+    "vpn": (5, (1, 2), 1, (10, 20), 0.0),
+    "other": (10, (1, 2, 4, 8), 2, (20, 500), 0.3),
+}
+
+# Share of the items per section
+SECTION_SHARES = (
+    ("workloads", 0.50), ("on_prem_servers", 0.30), ("cloud_usage", 0.10),
+    ("colocation_units", 0.05), ("licenses", 0.05),
+)
+
+CLOUD_PROFILES = (
+    # code, vCPU/h, RAM GB/h, storage GB/month, egress GB, certified for PD
+    ("ru_cloud_gp", 1.5, 0.5, 5.0, 1.0, False),
+    ("ru_cloud_pd", 2.1, 0.7, 7.5, 1.5, True),
+    ("ru_cloud_budget", 1.1, 0.35, 3.5, 0.8, False),
+)
+
+LICENSE_PRODUCTS = (
+    ("1C", "user", 12000), ("Bitrix24", "user", 6000), ("MS SQL", "socket", 180000),
+    ("Kaspersky", "vm", 2500), ("Astra Linux", "vm", 9000),
+)
+
+
+def _counts(items: int) -> Dict[str, int]:
+    counts = {name: int(items * share) for name, share in SECTION_SHARES}
+    counts["workloads"] += items - sum(counts.values())
+    return counts
+
+
+def generate_infra(items: int, seed: int = 0,
+                   counts: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """
+    Raw InfraSpec data with about `items` items in total (or explicit
+    per-section counts).
+    """
+    rng = random.Random(seed)  # noqa: S311 - reproducible synthetic data
+    counts = counts or _counts(items)
+    regions = [r for r, _ in REGION_MIX]
+    region_weights = [w for _, w in REGION_MIX]
+    types = list(WORKLOAD_MIX)
+    type_weights = [WORKLOAD_MIX[t][0] for t in types]
+
+    workloads: List[Dict[str, Any]] = []
+    for i in range(counts.get("workloads", 0)):
+        wtype = rng.choices(types, type_weights)[0]
+        _, vcpu_choices, ram_per_vcpu, storage, pd_share = WORKLOAD_MIX[wtype]
+        vcpus = rng.choice(vcpu_choices)
+        pd = rng.random() < pd_share
+        workload: Dict[str, Any] = {
+            "name": f"{wtype}-{i}", "type": wtype, "vcpus": vcpus,
+            "ram_gb": vcpus * ram_per_vcpu, "storage_gb": rng.randint(*storage),
+            "iops_profile": rng.choice(("low", "medium", "high")),
+            "availability": rng.choice(("99.5", "99.9", "99.95")), "contains_pd": pd,
+            "contains_pd_special": pd and rng.random() < 0.05,
+            "kii_related": rng.random() < 0.02,
+        }
+        if wtype in ("1c", "db") or rng.random() < 0.3:
+            workload["backup"] = {"daily_full": rng.random() < 0.5,
+                                  "retention_days": rng.choice((7, 14, 30, 90))}
+        workloads.append(workload)
+
+    servers = []
+    for i in range(counts.get("on_prem_servers", 0)):
+        vcpus = rng.choice((8, 16, 24, 32, 48, 64))
+        servers.append({
+            "name": f"srv-{i}", "vcpus": vcpus, "ram_gb": vcpus * rng.choice((2, 4, 8)),
+            "storage_gb": rng.choice((500, 1000, 2000, 4000, 8000)),
+            "power_watts": rng.randint(200, 900),
+            "region": rng.choices(regions, region_weights)[0],
+            "age_years": rng.randint(0, 8),
+            "capex_rub": float(rng.randint(150, 1500) * 1000),
+        })
+
+    colocation = [
+        {"dc_region": rng.choices(regions, region_weights)[0],
+         "units": rng.randint(1, 10), "power_watts": rng.choice((300, 500, 1000)),
+         "bandwidth_mbps": rng.choice((100, 1000))}
+        for _ in range(counts.get("colocation_units", 0))
+    ]
+    cloud_usage = [
+        {"provider_profile": rng.choice(CLOUD_PROFILES)[0],
+         "vcpus": rng.choice((2, 4, 8, 16)), "ram_gb": rng.choice((4, 8, 16, 32, 64)),
+         "storage_gb": rng.randint(20, 2000),
+         "region": rng.choices(regions, region_weights)[0],
+         "egress_gb": rng.randint(0, 2000)}
+        for _ in range(counts.get("cloud_usage", 0))
+    ]
+    licenses = []
+    for _ in range(counts.get("licenses", 0)):
+        product, metric, price = rng.choice(LICENSE_PRODUCTS)
+        seats = rng.randint(1, 200)
+        licenses.append({"product": product, "metric": metric, "seats": seats,
+                         "cost_rub_per_year": float(seats * price)})
+
+    return {
+        "company_profile": {
+            "name": f"ООО Синтетика-{seed}",
+            "industry": rng.choice(("retail", "it", "logistics", "medicine")),
+            "size_class": "250+", "region": "Москва",
+            "has_pd": True, "has_pd_special": False, "has_kii": False,
+        },
+        "workloads": workloads,
+        "current_deployment": {
+            "on_prem_servers": servers, "colocation_units": colocation,
+            "cloud_usage": cloud_usage,
+        },
+        "licenses": licenses,
+    }
+
+
+def generate_pricing(seed: int = 0) -> Dict[str, Any]:
+    """
+    Raw pricing data covering every region, federal district and the national
+    default.
+    """
+    rng = random.Random(seed)  # noqa: S311 - reproducible synthetic data
+    districts = sorted(set(REGION_DISTRICTS.values()))
+    region_keys = list(REGION_DISTRICTS)
+    electricity = [
+        {"region": name, "tariff_rub_per_kwh": round(rng.uniform(3.5, 11.0), 2),
+         "updated_at": "2025-01-01"}
+        for name in region_keys + [d.upper() for d in districts] + ["Россия"]
+    ]
+    colocation = [
+        {"region": name, "price_rub_per_u_per_month": float(rng.randint(15, 60) * 100),
+         "included_power_watts": 300, "included_bandwidth_mbps": 100}
+        for name in ["Москва", "Санкт-Петербург", "Татарстан", "Новосибирская область"]
+        + [d.upper() for d in districts] + ["Россия"]
+    ]
+    cloud_profiles = [
+        {"code": code, "vCPU_price_rub_per_hour": vcpu,
+         "ram_price_rub_per_gb_hour": ram, "storage_price_rub_per_gb_month": storage,
+         "egress_price_rub_per_gb": egress, "pd_compliant": pd}
+        for code, vcpu, ram, storage, egress, pd in CLOUD_PROFILES
+    ]
+    return {"electricity": electricity, "colocation": colocation,
+            "cloud_profiles": cloud_profiles}
@@ -0,0 +1,208 @@
+"""
+Keyword extraction of InfraSpec objects from free-text questionnaires.
+
+Every KeywordRule lists keywords and what an occurrence of any of them adds
+to the spec: company profile fields and/or a workload. All keywords of all
+rules are compiled into one multi-pattern matcher, so a text is lowercased
+once and scanned once however many keywords there are; the scan yields a
+bitmask of the rules found and stops early when every rule has matched.
+Keywords match anywhere in the text, as substrings. The matcher is a single
+regular expression run by the C engine of re (a pure-Python Aho-Corasick
+automaton is several times slower), with Aho-Corasick semantics: nested and
+overlapping keywords are all found.
+
+A spec depends only on that bitmask, so its data is built once per distinct
+bitmask and validated with validate_infra_spec into a fresh InfraSpec; there
+is no YAML round-trip. extract_specs streams over any number of texts,
+in-process or with the scanning fanned out to a process pool (the workers
+return bitmasks only). spec_to_yaml serializes a spec when YAML text is
+wanted.
+"""
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import islice
+from typing import (
+    Any, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+)
+
+import yaml
+
+from ru_smb_it_budget_planner.models.infra_model import InfraSpec
+from ru_smb_it_budget_planner.dsl.parser import validate_infra_spec
+
+DEFAULT_CHUNK_SIZE = 256
+MAX_CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+
+@dataclass(frozen=True)
+class KeywordRule:
+    keywords: Tuple[str, ...]
+    # CompanyProfile fields set on a match
+    profile: Mapping[str, Any] = field(default_factory=dict)
+    # Workload added on a match
+    workload: Optional[Mapping[str, Any]] = None
+
+
+DEFAULT_PROFILE: Mapping[str, Any] = {
+    "name": "Generated Company",
+    "industry": "generic",
+    "size_class": "10-50",
+    "region": "Moscow",
+    "has_pd": False,
+    "has_pd_special": False,
+    "has_kii": False,
+}
+
+DEFAULT_RULES: Tuple[KeywordRule, ...] = (
+    KeywordRule(("персональные данные",), profile={"has_pd": True}),
+    KeywordRule(("сайт", "web"), workload={
+        "name": "website", "type": "web", "vcpus": 2, "ram_gb": 4, "storage_gb": 20,
+        "iops_profile": "low", "availability": "99.5",
+        "contains_pd": False, "contains_pd_special": False, "kii_related": False,
+    }),
+    # Cyrillic "с"; callers may add spellings via their own rules
+    KeywordRule(("1с",), workload={
+        "name": "1c-server", "type": "1c", "vcpus": 4, "ram_gb": 16, "storage_gb": 200,
+        "iops_profile": "medium", "availability": "99.9",
+        "contains_pd": True, "contains_pd_special": False, "kii_related": False,
+    }),
+)
+
+
+class KeywordMatcher:
+    """All keywords (lowercase, each reporting a bitmask) as one compiled pattern."""
+
+    def __init__(self, keywords: Mapping[str, int]):
+        # An occurrence of a keyword is an occurrence of every keyword inside it, so
+        # each reports those masks too (the output links of an Aho-Corasick automaton)
+        self._masks = {word: 0 for word in keywords}
+        for word in keywords:
+            for other, mask in keywords.items():
+                if other in word:
+                    self._masks[word] |= mask
+        # The lookahead tries every position, and at each one the longest keyword
+        # is preferred, so overlapping and nested occurrences are all seen
+        words = sorted(keywords, key=len, reverse=True)
+        self._pattern = None
+        if words:
+            self._pattern = re.compile("(?=(" + "|".join(map(re.escape, words)) + "))")
+        self._all = 0
+        for mask in keywords.values():
+            self._all |= mask
+
+    def matches(self, text: str) -> int:
+        """Union of the masks of the keywords occurring in text (already lowercased)."""
+        if self._pattern is None:
+            return 0
+        masks, everything = self._masks, self._all
+        found = 0
+        for match in self._pattern.finditer(text):
+            found |= masks[match.group(1)]
+            if found == everything:
+                break
+        return found
+
+
+class InfraTextExtractor:
+    def __init__(self, rules: Sequence[KeywordRule] = DEFAULT_RULES,
+                 profile: Mapping[str, Any] = DEFAULT_PROFILE):
+        self.rules = tuple(rules)
+        self.profile = dict(profile)
+        keywords: Dict[str, int] = {}
+        for i, rule in enumerate(self.rules):
+            for word in rule.keywords:
+                keywords[word.lower()] = keywords.get(word.lower(), 0) | 1 << i
+        self.matcher = KeywordMatcher(keywords)
+        self._data: Dict[int, Dict[str, Any]] = {}
+        # Every rule at once: a broken rule fails here rather than on the first
+        # matching text
+        validate_infra_spec(self.spec_data((1 << len(self.rules)) - 1))
+
+    def match(self, text: str) -> int:
+        """Bitmask of the rules with a keyword in text."""
+        return self.matcher.matches(text.lower())
+
+    def spec_data(self, mask: int) -> Dict[str, Any]:
+        """
+        InfraSpec data for the rules in mask, in rule order; shared, do not
+        modify.
+        """
+        data = self._data.get(mask)
+        if data is None:
+            profile = dict(self.profile)
+            workloads = []
+            for i, rule in enumerate(self.rules):
+                if mask >> i & 1:
+                    profile.update(rule.profile)
+                    if rule.workload is not None:
+                        workloads.append(dict(rule.workload))
+            data = self._data[mask] = {
+                "company_profile": profile,
+                "workloads": workloads,
+                "current_deployment": {
+                    "on_prem_servers": [], "colocation_units": [], "cloud_usage": [],
+                },
+                "licenses": [],
+            }
+        return data
+
+    def spec(self, mask: int) -> InfraSpec:
+        return validate_infra_spec(self.spec_data(mask))
+
+    def extract(self, text: str) -> InfraSpec:
+        return self.spec(self.match(text))
+
+
+@lru_cache(maxsize=1)
+def default_extractor() -> InfraTextExtractor:
+    return InfraTextExtractor()
+
+
+_worker_extractor: Optional[InfraTextExtractor] = None
+
+
+def _init_worker(extractor: InfraTextExtractor) -> None:
+    global _worker_extractor
+    _worker_extractor = extractor
+
+
+def _match_chunk(texts: List[str]) -> List[int]:
+    extractor = _worker_extractor
+    if extractor is None:
+        raise RuntimeError("Процесс извлечения не инициализирован")
+    return [extractor.match(t) for t in texts]
+
+
+def extract_specs(texts: Iterable[str], extractor: Optional[InfraTextExtractor] = None,
+                  workers: int = 1,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[InfraSpec]:
+    """
+    One InfraSpec per text, in input order. texts are consumed lazily; with
+    workers > 1 at most MAX_CHUNKS_IN_FLIGHT_PER_WORKER chunks per worker are
+    being scanned at any time.
+    """
+    extractor = extractor or default_extractor()
+    if workers <= 1:
+        for text in texts:
+            yield extractor.extract(text)
+        return
+
+    it = iter(texts)
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(extractor,)) as pool:
+        for chunk in iter(lambda: list(islice(it, chunk_size)), []):
+            pending.append(pool.submit(_match_chunk, chunk))
+            if len(pending) >= workers * MAX_CHUNKS_IN_FLIGHT_PER_WORKER:
+                yield from map(extractor.spec, pending.popleft().result())
+        while pending:
+            yield from map(extractor.spec, pending.popleft().result())
+
+
+def spec_to_yaml(spec: InfraSpec) -> str:
+    data = spec.model_dump(mode="json", exclude_none=True)
+    text: str = yaml.safe_dump(data, allow_unicode=True, sort_keys=False)
+    return text
@@ -0,0 +1,245 @@
+"""
+Async client for a report-text backend (an LLM service in production, the
+stand-in of report_text_standin offline).
+
+A backend call has high latency whatever its size, so concurrent
+generate() calls are grouped: a batcher takes whatever arrived while it was
+waiting for a free connection slot (up to max_batch, waiting at most
+max_wait_ms for more) and sends it as one request. At most max_concurrency
+requests are in flight, and each one is abandoned after timeout seconds;
+the callers of that batch get a ReportTextError.
+
+    POST /generate  {"prompt_version": V,
+                     "items": [{"key": K, "scenarios": [ScenarioCost, ...]}, ...]}
+                    -> {"texts": [str, ...]}  (in item order)
+
+Texts are cached by content: the key is a SHA-256 of the prompt version and
+the canonical JSON of the scenarios, so equal inputs (from any client) hit
+the same entry and a new prompt version misses everything. The cache keeps
+the max_entries most recently used texts. Concurrent calls with the same key
+share one pending request.
+"""
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from ru_smb_it_budget_planner.calculator.scenario_builder import ScenarioCost
+
+PROMPT_VERSION = "1"
+DEFAULT_MAX_BATCH = 16
+DEFAULT_MAX_WAIT_MS = 5.0
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_TIMEOUT_S = 30.0
+DEFAULT_CACHE_ENTRIES = 4096
+
+
+class ReportTextError(Exception):
+    pass
+
+
+class LruTextCache:
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._texts: "OrderedDict[str, str]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def get(self, key: str) -> Optional[str]:
+        text = self._texts.get(key)
+        if text is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._texts.move_to_end(key)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        self._texts[key] = text
+        self._texts.move_to_end(key)
+        while len(self._texts) > self.max_entries:
+            self._texts.popitem(last=False)
+
+
+def scenarios_payload(scenarios: Sequence[ScenarioCost]) -> List[Dict[str, Any]]:
+    return [s.model_dump() for s in scenarios]
+
+
+def content_key(payload: List[Dict[str, Any]],
+                prompt_version: str = PROMPT_VERSION) -> str:
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False,
+                           separators=(",", ":"))
+    return hashlib.sha256(f"{prompt_version}\n{canonical}".encode("utf-8")).hexdigest()
+
+
+# (cache key, scenarios as JSON-ready dicts, future of the text)
+_Pending = Tuple[str, List[Dict[str, Any]], "asyncio.Future[str]"]
+
+
+class ReportTextClient:
+    def __init__(self, host: str, port: int, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 timeout: float = DEFAULT_TIMEOUT_S,
+                 cache: Optional[LruTextCache] = None,
+                 prompt_version: str = PROMPT_VERSION):
+        self.host = host
+        self.port = port
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.timeout = timeout
+        self.cache = cache if cache is not None else LruTextCache()
+        self.prompt_version = prompt_version
+        self.backend_calls = 0
+        self._max_concurrency = max_concurrency
+        self._queue: Optional["asyncio.Queue[_Pending]"] = None
+        self._batcher: Optional["asyncio.Task[None]"] = None
+        self._calls: "Set[asyncio.Task[None]]" = set()
+        self._inflight: Dict[str, "asyncio.Future[str]"] = {}
+
+    async def __aenter__(self) -> "ReportTextClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def generate(self, scenarios: Sequence[ScenarioCost]) -> str:
+        payload = scenarios_payload(scenarios)
+        key = content_key(payload, self.prompt_version)
+        text = self.cache.get(key)
+        if text is not None:
+            return text
+        future = self._inflight.get(key)
+        if future is None:
+            queue = self._queue
+            if queue is None or self._batcher is None:
+                queue = self._start()
+            future = self._inflight[key] = asyncio.get_running_loop().create_future()
+            await queue.put((key, payload, future))
+        # Shielded: a cancelled caller must not cancel the request shared with others
+        return await asyncio.shield(future)
+
+    async def generate_many(
+        self, scenario_lists: Sequence[Sequence[ScenarioCost]]
+    ) -> List[str]:
+        return list(await asyncio.gather(*(self.generate(s) for s in scenario_lists)))
+
+    async def close(self) -> None:
+        if self._batcher is not None:
+            self._batcher.cancel()
+            self._batcher = None
+        for task in list(self._calls):
+            task.cancel()
+        await asyncio.gather(*self._calls, return_exceptions=True)
+        for future in self._inflight.values():
+            future.cancel()
+        self._inflight.clear()
+
+    def _start(self) -> "asyncio.Queue[_Pending]":
+        queue: "asyncio.Queue[_Pending]" = asyncio.Queue()
+        slots = asyncio.Semaphore(self._max_concurrency)
+        self._queue = queue
+        loop = asyncio.get_running_loop()
+        self._batcher = loop.create_task(self._run_batcher(queue, slots))
+        return queue
+
+    async def _run_batcher(self, queue: "asyncio.Queue[_Pending]",
+                           slots: asyncio.Semaphore) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            # Requests keep queueing while every slot is busy and join this batch
+            await slots.acquire()
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            task = loop.create_task(self._send(batch, slots))
+            self._calls.add(task)
+            task.add_done_callback(self._calls.discard)
+
+    async def _send(self, batch: List[_Pending], slots: asyncio.Semaphore) -> None:
+        try:
+            self.backend_calls += 1
+            items = [(key, payload) for key, payload, _ in batch]
+            texts = await asyncio.wait_for(self._post(items), self.timeout)
+        except asyncio.TimeoutError:
+            self._fail(batch, ReportTextError(
+                f"Сервис генерации текста не ответил за {self.timeout:g} с"))
+        except ReportTextError as e:
+            self._fail(batch, e)
+        except Exception as e:
+            # Refused or dropped connections, truncated or garbled bodies: every
+            # waiter must get an answer
+            self._fail(batch, ReportTextError(
+                f"Сервис генерации текста недоступен: {str(e) or type(e).__name__}"))
+        else:
+            for (key, _, future), text in zip(batch, texts):
+                self.cache.put(key, text)
+                self._inflight.pop(key, None)
+                if not future.done():
+                    future.set_result(text)
+        finally:
+            slots.release()
+
+    def _fail(self, batch: List[_Pending], error: Exception) -> None:
+        for key, _, future in batch:
+            self._inflight.pop(key, None)
+            if not future.done():
+                future.set_exception(error)
+
+    async def _post(self, items: List[Tuple[str, List[Dict[str, Any]]]]) -> List[str]:
+        body = json.dumps({
+            "prompt_version": self.prompt_version,
+            "items": [{"key": key, "scenarios": payload} for key, payload in items],
+        }, ensure_ascii=False).encode("utf-8")
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            head = (f"POST /generate HTTP/1.1\r\nHost: {self.host}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n")
+            writer.write(head.encode("latin-1") + body)
+            await writer.drain()
+            status, payload = await _read_response(reader)
+        finally:
+            writer.close()
+        if status != 200:
+            raise ReportTextError(
+                f"Сервис генерации текста вернул {status}: {payload.get('error', '')}")
+        texts = payload.get("texts")
+        if not isinstance(texts, list) or len(texts) != len(items):
+            raise ReportTextError("Сервис генерации текста вернул неполный ответ")
+        if not all(isinstance(text, str) for text in texts):
+            raise ReportTextError("Сервис генерации текста вернул некорректный ответ")
+        return texts
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, Any]]:
+    line = await reader.readline()
+    try:
+        status = int(line.split()[1])
+    except (IndexError, ValueError):
+        raise ReportTextError("Некорректный ответ сервиса генерации текста") from None
+    length: Optional[int] = None
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    body = await (reader.readexactly(length) if length is not None else reader.read())
+    payload = json.loads(body) if body else {}
+    return status, payload if isinstance(payload, dict) else {}
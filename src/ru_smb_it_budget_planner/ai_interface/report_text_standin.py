@@ -0,0 +1,77 @@
+"""
+Local stand-in for the report-text backend, for testing the client's
+throughput and cache behavior offline.
+
+It speaks the protocol of report_text_client (POST /generate) and answers
+every item with generate_report_text_stub after a fixed latency per request,
+the way a remote text model costs about the same per call whatever the
+batch size. Counters of requests and items are kept for the tests and
+benchmarks; GET /health returns them.
+"""
+import asyncio
+import json
+from typing import Any, Tuple
+
+from ru_smb_it_budget_planner.calculator.scenario_builder import ScenarioCost
+from ru_smb_it_budget_planner.ai_interface.report_text_generator_stub import (
+    generate_report_text_stub
+)
+from ru_smb_it_budget_planner.runner.server import (
+    HttpError, serve_connection, DEFAULT_HOST
+)
+
+DEFAULT_PORT = 8090
+DEFAULT_LATENCY_MS = 200.0
+
+
+class StandInBackend:
+    def __init__(self, latency_ms: float = DEFAULT_LATENCY_MS):
+        self.latency = latency_ms / 1000.0
+        self.requests = 0
+        self.items = 0
+
+    def render(self, item: Any) -> str:
+        scenarios = [ScenarioCost.model_validate(s) for s in item["scenarios"]]
+        return generate_report_text_stub(scenarios)
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        if target == "/generate":
+            if method != "POST":
+                raise HttpError(405, "Используйте POST")
+            try:
+                items = json.loads(body)["items"]
+                texts = [self.render(item) for item in items]
+            except (ValueError, KeyError, TypeError) as e:
+                raise HttpError(422, f"Некорректный запрос: {e}") from None
+            self.requests += 1
+            self.items += len(items)
+            await asyncio.sleep(self.latency)
+            return 200, {"texts": texts}
+        if target == "/health":
+            return 200, {"status": "ok", "requests": self.requests, "items": self.items}
+        raise HttpError(404, f"Неизвестный путь: {target}")
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        await serve_connection(reader, writer, self.dispatch)
+
+
+async def start_standin(
+    host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+    latency_ms: float = DEFAULT_LATENCY_MS,
+) -> Tuple[StandInBackend, asyncio.AbstractServer]:
+    """Starts listening; port=0 picks a free port (see server.sockets)."""
+    backend = StandInBackend(latency_ms)
+    server = await asyncio.start_server(backend.handle_connection, host, port)
+    return backend, server
+
+
+async def _serve(host: str, port: int, latency_ms: float) -> None:
+    _, server = await start_standin(host, port, latency_ms)
+    async with server:
+        await server.serve_forever()
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+          latency_ms: float = DEFAULT_LATENCY_MS) -> None:
+    asyncio.run(_serve(host, port, latency_ms))
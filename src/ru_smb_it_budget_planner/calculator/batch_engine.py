@@ -0,0 +1,277 @@
+"""
+Vectorized scenario engine for many InfraSpecs at once.
+
+The specs are compiled (see models.compiled) and their columns concatenated
+(every item tagged with the index of the spec it belongs to); prices are
+resolved once per distinct region or profile name. The scenarios are
+computed with NumPy group-by reductions. Item costs are evaluated with the same
+float operations as in scenario_builder and rounded to kopecks per item (see
+calculator.money); the integer sums match the per-spec functions exactly,
+however the specs are split into batches.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, NoReturn, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ru_smb_it_budget_planner.models.infra_model import InfraSpec
+from ru_smb_it_budget_planner.models.compiled import CompiledInfra, compile_infra
+from ru_smb_it_budget_planner.calculator.scenario_builder import (
+    PricingContext, ScenarioCost, DEFAULT_TARGET_PROFILE, CLOUD_PRICE_FIELDS,
+    ON_PREM_CATEGORIES,
+)
+from ru_smb_it_budget_planner.calculator.cloud_calc import (
+    HOURS_PER_MONTH, WORKLOAD_EGRESS_GB
+)
+from ru_smb_it_budget_planner.calculator.energy_calc import calculate_monthly_kwh
+from ru_smb_it_budget_planner.calculator.on_prem_calc import server_monthly_amortization
+from ru_smb_it_budget_planner.calculator.money import (
+    group_sum, scale_kopecks, to_kopecks, to_rub
+)
+from ru_smb_it_budget_planner.tracing import traced, count
+
+SCENARIO_NAMES = ("as_is", "minimal_cloud", "hybrid")
+DETAIL_CATEGORIES = ("hardware_amortization", "electricity", "colocation", "cloud",
+                     "licenses")
+
+SCENARIO_DTYPE = np.dtype(
+    [
+        ("total_monthly_rub", np.float64),
+        ("total_yearly_rub", np.float64),
+        ("capex_yearly_amortized", np.float64),
+        ("opex_monthly", np.float64),
+    ]
+    + [(cat, np.float64) for cat in DETAIL_CATEGORIES]
+)
+RESULT_DTYPE = np.dtype([(name, SCENARIO_DTYPE) for name in SCENARIO_NAMES])
+
+@dataclass
+class SpecColumns:
+    """Column arrays for N specs. Every *_owner array holds spec indexes."""
+    n_specs: int
+    # On-prem servers
+    server_owner: np.ndarray
+    server_capex: np.ndarray
+    server_age: np.ndarray
+    server_power: np.ndarray
+    server_tariff: np.ndarray
+    # Colocation units
+    colo_owner: np.ndarray
+    colo_units: np.ndarray
+    colo_price: np.ndarray
+    # Cloud usage rows
+    cloud_owner: np.ndarray
+    cloud_vcpus: np.ndarray
+    cloud_ram: np.ndarray
+    cloud_storage: np.ndarray
+    cloud_egress: np.ndarray
+    # shape (n, 4): vCPU/h, RAM GB/h, storage GB/month, egress GB
+    cloud_prices: np.ndarray
+    # Workloads
+    workload_owner: np.ndarray
+    workload_vcpus: np.ndarray
+    workload_ram: np.ndarray
+    workload_storage: np.ndarray
+    workload_web_movable: np.ndarray
+    workload_unregulated: np.ndarray
+    # Licenses
+    license_owner: np.ndarray
+    license_cost: np.ndarray
+
+
+def _raise_missing(idx: int, spec: CompiledInfra, pricing: PricingContext) -> NoReturn:
+    missing = "\n".join(f"- {m}" for m in pricing.missing_keys(spec))
+    raise ValueError(f"Спецификация #{idx} ({spec.company.name}): "
+                     f"в ценах отсутствуют данные:\n{missing}")
+
+
+def _concat(arrays: List[np.ndarray], dtype: type) -> np.ndarray:
+    return np.concatenate([np.zeros(0, dtype=dtype)] + arrays).astype(dtype, copy=False)
+
+
+def build_columns(specs: Sequence[Union[InfraSpec, CompiledInfra]],
+                  pricing: PricingContext) -> SpecColumns:
+    compiled = [compile_infra(spec) for spec in specs]
+    # Memoize resolved prices per distinct name across specs; the catalog lookups
+    # normalize names.
+    memo: Dict[Tuple[str, str], Optional[Tuple[float, ...]]] = {}
+    lookups = {
+        "electricity": (pricing.get_electricity_tariff, ("tariff_rub_per_kwh",)),
+        "colocation": (pricing.get_colocation_tariff, ("price_rub_per_u_per_month",)),
+        "cloud": (pricing.get_cloud_profile, CLOUD_PRICE_FIELDS),
+    }
+
+    def prices(idx: int, spec: CompiledInfra, kind: str, names: Sequence[str],
+               ids: np.ndarray) -> np.ndarray:
+        lookup, fields = lookups[kind]
+        rows = []
+        for name in names:
+            key = (kind, name)
+            if key not in memo:
+                row = lookup(name)
+                memo[key] = (None if row is None
+                             else tuple(getattr(row, f) for f in fields))
+            if memo[key] is None:
+                _raise_missing(idx, spec, pricing)
+            rows.append(memo[key])
+        table = np.asarray(rows, dtype=np.float64).reshape(len(names), len(fields))
+        return np.asarray(table[ids])
+
+    server_tariff, colo_price, cloud_prices = [], [], []
+    for idx, spec in enumerate(compiled):
+        server_tariff.append(prices(idx, spec, "electricity", spec.server_region_names,
+                                    spec.server_region)[:, 0])
+        colo_price.append(prices(idx, spec, "colocation", spec.colo_region_names,
+                                 spec.colo_region)[:, 0])
+        cloud_prices.append(prices(idx, spec, "cloud", spec.cloud_profile_names,
+                                   spec.cloud_profile))
+
+    def owner(column: str) -> np.ndarray:
+        return np.repeat(np.arange(len(compiled), dtype=np.int64),
+                         [getattr(spec, column).size for spec in compiled])
+
+    def ints(column: str) -> np.ndarray:
+        return _concat([getattr(spec, column) for spec in compiled], np.int64)
+
+    def floats(column: str) -> np.ndarray:
+        return _concat([getattr(spec, column) for spec in compiled], np.float64)
+
+    return SpecColumns(
+        n_specs=len(compiled),
+        server_owner=owner("server_capex"),
+        server_capex=floats("server_capex"),
+        server_age=ints("server_age"),
+        server_power=ints("server_power"),
+        server_tariff=_concat(server_tariff, np.float64),
+        colo_owner=owner("colo_units"),
+        colo_units=ints("colo_units"),
+        colo_price=_concat(colo_price, np.float64),
+        cloud_owner=owner("cloud_vcpus"),
+        cloud_vcpus=ints("cloud_vcpus"),
+        cloud_ram=ints("cloud_ram"),
+        cloud_storage=ints("cloud_storage"),
+        cloud_egress=ints("cloud_egress"),
+        cloud_prices=np.concatenate([np.zeros((0, 4))] + cloud_prices),
+        workload_owner=owner("workload_vcpus"),
+        workload_vcpus=ints("workload_vcpus"),
+        workload_ram=ints("workload_ram"),
+        workload_storage=ints("workload_storage"),
+        workload_web_movable=_concat([spec.minimal_cloud_mask() for spec in compiled],
+                                     np.bool_),
+        workload_unregulated=_concat([spec.hybrid_mask() for spec in compiled],
+                                     np.bool_),
+        license_owner=owner("license_cost"),
+        license_cost=floats("license_cost"),
+    )
+
+
+def _cloud_cost(vcpus: np.ndarray, ram: np.ndarray, storage: np.ndarray,
+                egress: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    compute = (vcpus * prices[:, 0] + ram * prices[:, 1]) * HOURS_PER_MONTH
+    return np.asarray(compute + storage * prices[:, 2] + egress * prices[:, 3])
+
+
+def _fill_scenario(out: np.ndarray, details: Dict[str, np.ndarray]) -> None:
+    # details are int64 kopecks, like scenario_builder.scenario_from_kopecks
+    capex = details["hardware_amortization"]
+    opex = (details["electricity"] + details["colocation"] + details["cloud"]
+            + details["licenses"])
+    total = capex + opex
+    out["total_monthly_rub"] = to_rub(total)
+    out["total_yearly_rub"] = to_rub(total * 12)
+    out["capex_yearly_amortized"] = to_rub(capex * 12)
+    out["opex_monthly"] = to_rub(opex)
+    for cat in DETAIL_CATEGORIES:
+        out[cat] = to_rub(details[cat])
+
+
+def _calculate_as_is(cols: SpecColumns, result: np.ndarray) -> Dict[str, np.ndarray]:
+    n = cols.n_specs
+    amort = server_monthly_amortization(cols.server_capex, cols.server_age)
+    energy = calculate_monthly_kwh(cols.server_power) * cols.server_tariff
+    colo = cols.colo_units * cols.colo_price
+    cloud = _cloud_cost(cols.cloud_vcpus, cols.cloud_ram, cols.cloud_storage,
+                        cols.cloud_egress, cols.cloud_prices)
+    licenses = cols.license_cost / 12.0
+
+    details = {
+        "hardware_amortization": group_sum(cols.server_owner, to_kopecks(amort), n),
+        "electricity": group_sum(cols.server_owner, to_kopecks(energy), n),
+        "colocation": group_sum(cols.colo_owner, to_kopecks(colo), n),
+        "cloud": group_sum(cols.cloud_owner, to_kopecks(cloud), n),
+        "licenses": group_sum(cols.license_owner, to_kopecks(licenses), n),
+    }
+    _fill_scenario(result["as_is"], details)
+    return details
+
+
+def _calculate_moved(cols: SpecColumns, as_is: Dict[str, np.ndarray],
+                     movable: np.ndarray, target_prices: Optional[tuple],
+                     out: np.ndarray) -> None:
+    n = cols.n_specs
+    if target_prices is None:
+        movable = np.zeros_like(movable)
+    owner = cols.workload_owner[movable]
+    prices = np.broadcast_to(np.asarray(target_prices or (0.0, 0.0, 0.0, 0.0)),
+                             (owner.size, 4))
+    cost = _cloud_cost(
+        cols.workload_vcpus[movable], cols.workload_ram[movable],
+        cols.workload_storage[movable],
+        np.full(owner.size, WORKLOAD_EGRESS_GB), prices,
+    )
+    cloud_increase = group_sum(owner, to_kopecks(cost), n)
+    moved_vcpus = group_sum(owner, cols.workload_vcpus[movable], n)
+    total_vcpus = group_sum(cols.workload_owner, cols.workload_vcpus, n)
+
+    reduction = np.zeros(n)
+    np.divide(moved_vcpus, total_vcpus, out=reduction, where=total_vcpus != 0)
+
+    details = dict(as_is)
+    for cat in ON_PREM_CATEGORIES:
+        details[cat] = scale_kopecks(as_is[cat], 1.0 - reduction)
+    details["cloud"] = as_is["cloud"] + cloud_increase
+
+    _fill_scenario(out, details)
+
+
+def calculate_batch_columns(cols: SpecColumns, pricing: PricingContext) -> np.ndarray:
+    result = np.zeros(cols.n_specs, dtype=RESULT_DTYPE)
+    as_is = _calculate_as_is(cols, result)
+
+    profile = pricing.get_cloud_profile(DEFAULT_TARGET_PROFILE)
+    target = None
+    if profile:
+        target = (profile.vCPU_price_rub_per_hour, profile.ram_price_rub_per_gb_hour,
+                  profile.storage_price_rub_per_gb_month,
+                  profile.egress_price_rub_per_gb)
+    _calculate_moved(cols, as_is, cols.workload_web_movable, target,
+                     result["minimal_cloud"])
+    _calculate_moved(cols, as_is, cols.workload_unregulated, target, result["hybrid"])
+    return result
+
+
+@traced("calculate_batch")
+def calculate_batch(specs: Sequence[Union[InfraSpec, CompiledInfra]],
+                    pricing: PricingContext) -> np.ndarray:
+    """
+    Computes as_is, minimal_cloud and hybrid for every spec.
+    Returns a structured array of RESULT_DTYPE, one row per spec.
+    """
+    count("specs_processed", len(specs))
+    return calculate_batch_columns(build_columns(specs, pricing), pricing)
+
+
+def to_scenario_costs(row: np.void) -> List[ScenarioCost]:
+    """Converts one row of calculate_batch output back to ScenarioCost objects."""
+    scenarios = []
+    for name in SCENARIO_NAMES:
+        s = row[name]
+        scenarios.append(ScenarioCost(
+            scenario_name=name,
+            total_monthly_rub=float(s["total_monthly_rub"]),
+            total_yearly_rub=float(s["total_yearly_rub"]),
+            capex_yearly_amortized=float(s["capex_yearly_amortized"]),
+            opex_monthly=float(s["opex_monthly"]),
+            details={cat: float(s[cat]) for cat in DETAIL_CATEGORIES},
+        ))
+    return scenarios
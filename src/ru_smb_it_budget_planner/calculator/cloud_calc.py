@@ -2,6 +2,7 @@ from ru_smb_it_budget_planner.models.infra_model import Workload, CloudUsage
 from ru_smb_it_budget_planner.models.pricing_model import CloudProfile
 
 HOURS_PER_MONTH = 730
+WORKLOAD_EGRESS_GB = 100  # Placeholder until workloads declare their egress
 
 def calculate_cloud_profile_cost(profile: CloudProfile, vcpus: int, ram_gb: int, storage_gb: int, egress_gb: int) -> float:
     compute_cost = (vcpus * profile.vCPU_price_rub_per_hour + ram_gb * profile.ram_price_rub_per_gb_hour) * HOURS_PER_MONTH
@@ -11,12 +12,11 @@ def calculate_cloud_profile_cost(profile: CloudProfile, vcpus: int, ram_gb: int,
 
 def calculate_workload_cloud_cost(workload: Workload, profile: CloudProfile) -> float:
     # Estimate egress based on workload type if not known?
-    # For now assume 0 or some default.
-    egress_gb = 100 # Placeholder default
+    # For now assume some default.
     return calculate_cloud_profile_cost(
         profile,
         workload.vcpus,
         workload.ram_gb,
         workload.storage_gb,
-        egress_gb
+        WORKLOAD_EGRESS_GB
     )
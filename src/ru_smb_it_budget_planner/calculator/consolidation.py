@@ -0,0 +1,271 @@
+"""
+Server consolidation: packs the workloads that stay on own hardware onto the
+on-prem servers and finds the servers that can be decommissioned.
+
+The scenarios scale on-prem cost by the share of moved vCPUs; here every
+remaining workload (vcpus, ram_gb, storage_gb) is assigned to a concrete
+server instead:
+- servers are ranked by monthly cost (amortization + electricity, as in
+  as_is_item_costs) per unit of capacity, normalized by the fleet totals;
+- multi-dimensional first-fit decreasing: workloads in decreasing normalized
+  size go to the first already used server they fit on in that ranking, or
+  else open the first free one;
+- local search until a pass changes nothing (at most max_passes): a used
+  server is emptied when all its workloads fit on the other used servers
+  (most expensive servers first), and one whose whole load fits on a cheaper
+  free server is swapped for it.
+
+Fit checks are NumPy comparisons over all servers at once, so thousands of
+workloads on hundreds of servers pack in well under a second. Workloads that
+fit on no server are reported as unplaced.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+from ru_smb_it_budget_planner.models.infra_model import InfraSpec
+from ru_smb_it_budget_planner.models.compiled import CompiledInfra, compile_infra
+from ru_smb_it_budget_planner.calculator.scenario_builder import (
+    PricingContext, as_is_item_costs
+)
+from ru_smb_it_budget_planner.tracing import traced, count
+
+CONSOLIDATION_NODE_PREFIX = "consolidation:"
+DEFAULT_MAX_PASSES = 10
+
+_UNPLACED = -1
+
+
+class WorkloadAssignment(BaseModel):
+    workload: str
+    server: Optional[str]  # None: fits on no server
+
+
+class ServerPlan(BaseModel):
+    server: str
+    region: str
+    keep: bool
+    workloads: int
+    vcpus_used: int
+    vcpus: int
+    ram_used_gb: int
+    ram_gb: int
+    storage_used_gb: int
+    storage_gb: int
+    amortization_rub_monthly: float
+    electricity_rub_monthly: float
+
+
+class ConsolidationResult(BaseModel):
+    scenario: str
+    assignments: List[WorkloadAssignment]
+    servers: List[ServerPlan]
+    unplaced: List[str]
+    passes: int
+
+    @property
+    def decommissioned(self) -> List[ServerPlan]:
+        return [s for s in self.servers if not s.keep]
+
+    @property
+    def amortization_savings_rub_monthly(self) -> float:
+        return sum(s.amortization_rub_monthly for s in self.decommissioned)
+
+    @property
+    def electricity_savings_rub_monthly(self) -> float:
+        return sum(s.electricity_rub_monthly for s in self.decommissioned)
+
+
+def _fitting(rem: np.ndarray, size: np.ndarray) -> np.ndarray:
+    """
+    Bins with room for size; rem is (dims, bins), which keeps the comparison
+    contiguous.
+    """
+    return np.asarray((rem >= size[:, None]).all(axis=0))
+
+
+def _loads(sizes: np.ndarray, assign: np.ndarray, n_bins: int) -> np.ndarray:
+    """Summed item sizes per bin, shape (dims, bins)."""
+    placed = assign != _UNPLACED
+    return np.stack([
+        np.bincount(assign[placed], weights=sizes[placed, d], minlength=n_bins)
+        for d in range(sizes.shape[1])
+    ]).astype(np.int64)
+
+
+def first_fit_decreasing(sizes: np.ndarray, caps: np.ndarray,
+                         bin_order: np.ndarray) -> np.ndarray:
+    """
+    Bin per item (_UNPLACED if it fits nowhere); sizes (items, dims), caps
+    (bins, dims). Bins are tried in bin_order, used bins before free ones.
+    """
+    assign = np.full(len(sizes), _UNPLACED, dtype=np.int64)
+    if not len(caps):
+        return assign
+    rem = np.ascontiguousarray(caps[bin_order].T)
+    used = np.zeros(len(caps), dtype=bool)
+    scale = np.maximum(caps.sum(axis=0), 1).astype(np.float64)
+    for i in np.argsort(-(sizes / scale).sum(axis=1), kind="stable").tolist():
+        fits = _fitting(rem, sizes[i])
+        candidates = fits & used
+        if not candidates.any():
+            candidates = fits
+            if not candidates.any():
+                continue
+        rank = int(candidates.argmax())
+        used[rank] = True
+        rem[:, rank] -= sizes[i]
+        assign[i] = bin_order[rank]
+    return assign
+
+
+def _empty_bins(sizes: np.ndarray, caps: np.ndarray, cost: np.ndarray, rank: np.ndarray,
+                assign: np.ndarray) -> bool:
+    """
+    Moves every item off a used bin when the other used bins can take them;
+    True if a bin was emptied.
+    """
+    rem = caps - _loads(sizes, assign, caps.shape[1])
+    used = np.bincount(assign[assign != _UNPLACED], minlength=caps.shape[1]) > 0
+    free = rem[:, used].sum(axis=1)
+    improved = False
+    for b in sorted(np.flatnonzero(used).tolist(), key=lambda b: -cost[b]):
+        # Cheap necessary condition: the other used bins have room for the load in total
+        if (caps[:, b] - rem[:, b] > free - rem[:, b]).any():
+            continue
+        items = np.flatnonzero(assign == b)
+        items = items[np.argsort(-sizes[items].sum(axis=1), kind="stable")]
+        targets = used.copy()
+        targets[b] = False
+        trial = rem.copy()
+        moves: List[Tuple[int, int]] = []
+        for i in items.tolist():
+            fits = targets & _fitting(trial, sizes[i])
+            if not fits.any():
+                break
+            t = int(np.flatnonzero(fits)[rank[fits].argmin()])
+            trial[:, t] -= sizes[i]
+            moves.append((i, t))
+        else:
+            for i, t in moves:
+                assign[i] = t
+            rem = trial
+            rem[:, b] = caps[:, b]
+            used[b] = False
+            free = rem[:, used].sum(axis=1)
+            improved = True
+    return improved
+
+
+def _swap_bins(sizes: np.ndarray, caps: np.ndarray, cost: np.ndarray,
+               assign: np.ndarray) -> bool:
+    """
+    Moves the whole load of a used bin to a cheaper free bin that holds it;
+    True if any moved.
+    """
+    load = _loads(sizes, assign, caps.shape[1])
+    used = np.bincount(assign[assign != _UNPLACED], minlength=caps.shape[1]) > 0
+    improved = False
+    for b in sorted(np.flatnonzero(used).tolist(), key=lambda b: -cost[b]):
+        candidates = ~used & (cost < cost[b]) & _fitting(caps, load[:, b])
+        if not candidates.any():
+            continue
+        t = int(np.flatnonzero(candidates)[cost[candidates].argmin()])
+        assign[assign == b] = t
+        load[:, t], load[:, b] = load[:, b], 0
+        used[t], used[b] = True, False
+        improved = True
+    return improved
+
+
+def pack(sizes: np.ndarray, caps: np.ndarray, cost: np.ndarray,
+         max_passes: int = DEFAULT_MAX_PASSES) -> Tuple[np.ndarray, int]:
+    """
+    First-fit decreasing followed by local search; sizes (items, dims), caps
+    (bins, dims), cost per bin. Returns (bin per item, local search passes).
+    """
+    sizes = np.asarray(sizes, dtype=np.int64).reshape(len(sizes), -1)
+    caps = np.asarray(caps, dtype=np.int64).reshape(len(caps), sizes.shape[1])
+    cost = np.asarray(cost, dtype=np.float64)
+    capacity = (caps / np.maximum(caps.sum(axis=0), 1)).sum(axis=1)
+    per_capacity = np.divide(cost, capacity, out=np.full(len(cost), np.inf),
+                             where=capacity > 0)
+    bin_order = np.lexsort((-capacity, per_capacity))
+    rank = np.empty(len(cost), dtype=np.int64)
+    rank[bin_order] = np.arange(len(cost))
+
+    assign = first_fit_decreasing(sizes, caps, bin_order)
+    caps = np.ascontiguousarray(caps.T)  # (dims, bins) for the local search
+    passes = 0
+    while passes < max_passes:
+        passes += 1
+        emptied = _empty_bins(sizes, caps, cost, rank, assign)
+        swapped = _swap_bins(sizes, caps, cost, assign)
+        if not (emptied or swapped):
+            break
+    return assign, passes
+
+
+@traced("consolidate")
+def consolidate(infra: Union[InfraSpec, CompiledInfra], pricing: PricingContext,
+                moved: Optional[np.ndarray] = None, scenario: str = "as_is",
+                items: Optional[Dict[str, np.ndarray]] = None,
+                server_names: Optional[Sequence[str]] = None,
+                max_passes: int = DEFAULT_MAX_PASSES) -> ConsolidationResult:
+    """
+    Packs the workloads that are not moved (a boolean mask over the
+    workloads; None keeps all of them) onto the on-prem servers. items are the
+    as_is_item_costs of the spec, computed when not given.
+    """
+    c = compile_infra(infra)
+    if items is None:
+        pricing.require_coverage(c)
+        items = as_is_item_costs(c, pricing)
+    if server_names is None:
+        if isinstance(infra, InfraSpec):
+            server_names = [s.name for s in infra.current_deployment.on_prem_servers]
+        else:
+            server_names = [f"#{i + 1}" for i in range(c.server_vcpus.size)]
+
+    stays = np.ones(len(c.workload_names), dtype=bool) if moved is None else ~moved
+    workloads = np.flatnonzero(stays)
+    sizes = np.column_stack(
+        [c.workload_vcpus, c.workload_ram, c.workload_storage]
+    )[workloads]
+    caps = np.column_stack([c.server_vcpus, c.server_ram, c.server_storage])
+    amortization, electricity = items["hardware_amortization"], items["electricity"]
+    count("items_processed", workloads.size)
+
+    assign, passes = pack(sizes, caps, amortization + electricity, max_passes)
+
+    placed = assign != _UNPLACED
+    load = np.zeros_like(caps)
+    np.add.at(load, assign[placed], sizes[placed])
+    hosted = np.bincount(assign[placed], minlength=len(caps))
+    region_names = np.asarray(c.server_region_names, dtype=object)
+    regions = region_names[c.server_region].tolist() if caps.size else []
+    servers = [
+        ServerPlan(
+            server=server_names[j], region=regions[j],
+            keep=bool(hosted[j]), workloads=int(hosted[j]),
+            vcpus_used=int(load[j, 0]), vcpus=int(caps[j, 0]),
+            ram_used_gb=int(load[j, 1]), ram_gb=int(caps[j, 1]),
+            storage_used_gb=int(load[j, 2]), storage_gb=int(caps[j, 2]),
+            amortization_rub_monthly=float(amortization[j]),
+            electricity_rub_monthly=float(electricity[j]),
+        )
+        for j in range(len(caps))
+    ]
+    names = c.workload_names
+    return ConsolidationResult(
+        scenario=scenario,
+        assignments=[
+            WorkloadAssignment(workload=names[w],
+                               server=None if a == _UNPLACED else server_names[a])
+            for w, a in zip(workloads.tolist(), assign.tolist())
+        ],
+        servers=servers,
+        unplaced=[names[w] for w in workloads[~placed].tolist()],
+        passes=passes,
+    )
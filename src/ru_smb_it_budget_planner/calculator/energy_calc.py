@@ -1,8 +1,20 @@
+from typing import Union, overload
+
+import numpy as np
+
 from ru_smb_it_budget_planner.models.pricing_model import ElectricityTariff
 
 HOURS_PER_MONTH = 730
 
-def calculate_monthly_kwh(power_watts: int, hours: int = HOURS_PER_MONTH) -> float:
+@overload
+def calculate_monthly_kwh(power_watts: float,
+                          hours: float = HOURS_PER_MONTH) -> float: ...
+@overload
+def calculate_monthly_kwh(power_watts: np.ndarray,
+                          hours: float = HOURS_PER_MONTH) -> np.ndarray: ...
+def calculate_monthly_kwh(power_watts: Union[np.ndarray, float],
+                          hours: float = HOURS_PER_MONTH) -> Union[np.ndarray, float]:
+    """Energy drawn in a month at constant power; scalars or arrays."""
     return (power_watts / 1000.0) * hours
 
 def calculate_monthly_energy_cost(kwh: float, tariff: ElectricityTariff) -> float:
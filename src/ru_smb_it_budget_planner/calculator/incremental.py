@@ -0,0 +1,293 @@
+"""
+Incremental recalculation for edited specs.
+
+IncrementalPlan keeps every spec item (server, colocation unit, cloud usage,
+workload, license) together with its cost contribution and running category
+totals. update() diffs each section of a new raw spec against the previous
+one: the common prefix and suffix are compared item by item (an edit in the
+middle of a 10k-item list costs a few thousand dict comparisons), and the
+items in between are matched by content, so moved items are reused too. Only
+added or edited items are validated and priced; removed ones are subtracted
+from the totals. as_is, minimal_cloud and hybrid are then derived from the totals
+in constant time. Other scenarios are evaluated through the pipeline on the
+rebuilt InfraSpec.
+
+Contributions are kept in kopecks (see calculator.money), so the running
+totals are exact: after any number of edits they equal a full recalculation.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple, Type, cast
+
+from pydantic import BaseModel, ValidationError
+
+from ru_smb_it_budget_planner.models.infra_model import (
+    InfraSpec, CompanyProfile, CurrentDeployment, OnPremServer, ColocationUnit,
+    CloudUsage, Workload, License
+)
+from ru_smb_it_budget_planner.dsl.parser import validate_infra_spec
+from ru_smb_it_budget_planner.calculator.scenario_builder import (
+    PricingContext, ScenarioCost, DEFAULT_TARGET_PROFILE, scenario_from_moved,
+    scenario_from_kopecks,
+)
+from ru_smb_it_budget_planner.calculator.money import kopecks
+from ru_smb_it_budget_planner.calculator.cloud_calc import (
+    calculate_cloud_profile_cost, calculate_workload_cloud_cost
+)
+from ru_smb_it_budget_planner.calculator.energy_calc import calculate_monthly_kwh
+from ru_smb_it_budget_planner.calculator.on_prem_calc import server_monthly_amortization
+from ru_smb_it_budget_planner.calculator.pipeline import ScenarioRun, DEFAULT_SCENARIOS
+
+# Positions in a contribution vector (amounts in kopecks)
+TOTALS = (
+    "hardware_amortization", "electricity", "colocation", "cloud", "licenses",
+    "total_vcpus", "minimal_cloud_vcpus", "minimal_cloud_cost", "hybrid_vcpus",
+    "hybrid_cost",
+)
+(_HW, _ENERGY, _COLO, _CLOUD, _LICENSES,
+ _VCPUS, _MIN_VCPUS, _MIN_COST, _HYB_VCPUS, _HYB_COST) = range(len(TOTALS))
+
+# Section -> (path in the spec, item model)
+SECTIONS: Dict[str, Tuple[Tuple[str, ...], Type[BaseModel]]] = {
+    "on_prem_servers": (("current_deployment", "on_prem_servers"), OnPremServer),
+    "colocation_units": (("current_deployment", "colocation_units"), ColocationUnit),
+    "cloud_usage": (("current_deployment", "cloud_usage"), CloudUsage),
+    "workloads": (("workloads",), Workload),
+    "licenses": (("licenses",), License),
+}
+_REQUIRED = ("company_profile", "workloads", "current_deployment")
+
+
+@dataclass
+class _Item:
+    raw: Any
+    model: BaseModel
+    contribution: List[int]
+
+
+@dataclass
+class UpdateStats:
+    added: int = 0
+    removed: int = 0
+    unchanged: int = 0
+
+    @property
+    def changed(self) -> int:
+        return self.added + self.removed
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return cast(Hashable, value)  # Scalars of parsed YAML/JSON
+
+
+def _item_key(raw: Any) -> Hashable:
+    if isinstance(raw, dict):
+        key = tuple(raw.items())
+        try:
+            hash(key)
+            return key
+        except TypeError:  # Nested mappings, e.g. a workload's backup
+            pass
+    return _freeze(raw)
+
+
+def _section(data: Any, path: Tuple[str, ...]) -> Optional[List[Any]]:
+    """
+    Items of a section: [] when it is absent, None when it (or its parent)
+    has the wrong type.
+    """
+    for name in path:
+        if not isinstance(data, dict):
+            return None
+        if name not in data:
+            return []
+        data = data[name]
+    return data if isinstance(data, list) else None
+
+
+class IncrementalPlan:
+    def __init__(self, pricing: PricingContext,
+                 profile_code: str = DEFAULT_TARGET_PROFILE):
+        self.pricing = pricing
+        self.profile_code = profile_code
+        self.totals = [0] * len(TOTALS)
+        self._order: Dict[str, List[_Item]] = {name: [] for name in SECTIONS}
+        self._company: Optional[CompanyProfile] = None
+        self._infra: Optional[InfraSpec] = None
+
+    # Item pricing
+
+    def _contribution(self, section: str, item: Any,
+                      missing: Dict[str, None]) -> List[int]:
+        c = [0] * len(TOTALS)
+        pricing = self.pricing
+        if section == "on_prem_servers":
+            power_tariff = pricing.get_electricity_tariff(item.region)
+            if power_tariff is None:
+                missing[f"тариф электроэнергии для региона '{item.region}'"] = None
+                return c
+            c[_HW] = kopecks(
+                server_monthly_amortization(item.capex_rub, item.age_years)
+            )
+            kwh = calculate_monthly_kwh(item.power_watts)
+            c[_ENERGY] = kopecks(kwh * power_tariff.tariff_rub_per_kwh)
+        elif section == "colocation_units":
+            rack_tariff = pricing.get_colocation_tariff(item.dc_region)
+            if rack_tariff is None:
+                missing[f"тариф колокации для региона '{item.dc_region}'"] = None
+                return c
+            c[_COLO] = kopecks(item.units * rack_tariff.price_rub_per_u_per_month)
+        elif section == "cloud_usage":
+            profile = pricing.get_cloud_profile(item.provider_profile)
+            if profile is None:
+                missing[f"облачный профиль '{item.provider_profile}'"] = None
+                return c
+            c[_CLOUD] = kopecks(calculate_cloud_profile_cost(
+                profile, item.vcpus, item.ram_gb, item.storage_gb, item.egress_gb
+            ))
+        elif section == "workloads":
+            c[_VCPUS] = item.vcpus
+            profile = pricing.get_cloud_profile(self.profile_code)
+            if profile is not None:
+                # Same rules as minimal_cloud_candidates / hybrid_candidates
+                cost = kopecks(calculate_workload_cloud_cost(item, profile))
+                if item.type == "web" and not item.contains_pd and not item.kii_related:
+                    c[_MIN_VCPUS], c[_MIN_COST] = item.vcpus, cost
+                if not (item.contains_pd or item.kii_related
+                        or item.contains_pd_special):
+                    c[_HYB_VCPUS], c[_HYB_COST] = item.vcpus, cost
+        elif section == "licenses":
+            c[_LICENSES] = kopecks(item.cost_rub_per_year / 12.0)
+        return c
+
+    # Updates
+
+    def update(self, data: Dict[str, Any]) -> UpdateStats:
+        """
+        Applies a new raw spec (as loaded from YAML/JSON). Invalid specs and
+        missing tariffs raise ValueError and leave the previous state intact.
+        """
+        sections = {section: _section(data, path)
+                    for section, (path, _) in SECTIONS.items()}
+        if (not isinstance(data, dict) or any(name not in data for name in _REQUIRED)
+                or any(items is None for items in sections.values())):
+            validate_infra_spec(data)  # Raises the usual validation message
+        stats = UpdateStats()
+        missing: Dict[str, None] = {}
+        new_order: Dict[str, List[_Item]] = {}
+        removed: List[_Item] = []
+        added: List[_Item] = []
+        try:
+            company = CompanyProfile.model_validate(data.get("company_profile"))
+            for section, (_path, model) in SECTIONS.items():
+                old = self._order[section]
+                new = sections[section] or []
+                # Unchanged head and tail
+                limit = min(len(old), len(new))
+                head = 0
+                while head < limit and old[head].raw == new[head]:
+                    head += 1
+                tail = 0
+                while tail < limit - head and old[-1 - tail].raw == new[-1 - tail]:
+                    tail += 1
+
+                # Everything in between is matched by content
+                candidates: Dict[Hashable, List[_Item]] = {}
+                for item in old[head:len(old) - tail]:
+                    candidates.setdefault(_item_key(item.raw), []).append(item)
+                middle = []
+                for raw in new[head:len(new) - tail]:
+                    reusable = candidates.get(_item_key(raw))
+                    if reusable:
+                        middle.append(reusable.pop())
+                        continue
+                    parsed = model.model_validate(raw)
+                    item = _Item(raw, parsed,
+                                 self._contribution(section, parsed, missing))
+                    middle.append(item)
+                    added.append(item)
+                leftovers = [item for rest in candidates.values() for item in rest]
+                removed.extend(leftovers)
+
+                new_order[section] = old[:head] + middle + old[len(old) - tail:]
+                stats.removed += len(leftovers)
+        except ValidationError:
+            validate_infra_spec(data)
+            raise  # Not reached: the full validation reports the error
+        if missing:
+            raise ValueError(
+                "В ценах отсутствуют данные:\n" + "\n".join(f"- {m}" for m in missing)
+            )
+
+        stats.added = len(added)
+        stats.unchanged = sum(len(order) for order in new_order.values()) - stats.added
+
+        # Commit: subtract what disappeared, add what is new
+        for item in removed:
+            self._apply(item.contribution, -1)
+        for item in added:
+            self._apply(item.contribution, 1)
+        self._order, self._company = new_order, company
+        self._infra = None
+        return stats
+
+    def _apply(self, contribution: List[int], sign: int) -> None:
+        totals = self.totals
+        for i, value in enumerate(contribution):
+            if value:
+                totals[i] += sign * value
+
+    # Results
+
+    @property
+    def infra(self) -> InfraSpec:
+        """The current spec, rebuilt from the validated items without re-validation."""
+        if self._company is None:
+            raise ValueError("Спецификация еще не загружена")
+        if self._infra is None:
+            models = {section: [item.model for item in order]
+                      for section, order in self._order.items()}
+            self._infra = InfraSpec.model_construct(
+                company_profile=self._company,
+                workloads=models["workloads"],
+                current_deployment=CurrentDeployment.model_construct(
+                    on_prem_servers=models["on_prem_servers"],
+                    colocation_units=models["colocation_units"],
+                    cloud_usage=models["cloud_usage"],
+                ),
+                licenses=models["licenses"],
+            )
+        return self._infra
+
+    def as_is(self) -> ScenarioCost:
+        t = self.totals
+        return scenario_from_kopecks("as_is", {
+            "hardware_amortization": t[_HW],
+            "electricity": t[_ENERGY],
+            "colocation": t[_COLO],
+            "cloud": t[_CLOUD],
+            "licenses": t[_LICENSES],
+        })
+
+    def scenarios(self, names: Iterable[str] = DEFAULT_SCENARIOS) -> List[ScenarioCost]:
+        t = self.totals
+        as_is = self.as_is()
+        incremental = {
+            "as_is": lambda: as_is,
+            "minimal_cloud": lambda: scenario_from_moved(
+                "minimal_cloud", as_is, t[_VCPUS], t[_MIN_VCPUS], t[_MIN_COST]),
+            "hybrid": lambda: scenario_from_moved(
+                "hybrid", as_is, t[_VCPUS], t[_HYB_VCPUS], t[_HYB_COST]),
+        }
+        run: Optional[ScenarioRun] = None
+        result = []
+        for name in names:
+            if name in incremental:
+                result.append(incremental[name]())
+            else:
+                run = run or ScenarioRun(self.infra, self.pricing)
+                result.append(run.scenario(name))
+        return result
@@ -0,0 +1,274 @@
+"""
+Itemized cost ledger.
+
+ScenarioCost.details keeps five category totals. The ledger keeps the rows
+behind them: one row per (scenario, item, category) with the monthly amount
+in RUB, so every total can be traced back to the server, colocation unit,
+cloud usage row, license or workload it came from. Rows are stored as
+columns (NumPy arrays of small integer codes plus one float column), about
+20 bytes per row, so ledgers with millions of rows stay cheap to build and
+export (see reporting.ledger_export).
+
+Items are identified by their kind (ITEM_KINDS) and their position in the
+corresponding section of the spec; names are kept once per item and joined to
+the rows only when a ledger is exported. Amounts are whole kopecks (see
+calculator.money). Per category and scenario they add up to ScenarioCost.details
+(exactly for as_is, up to a kopeck per row for the other scenarios, which
+scale and round every item instead of the total).
+
+Ledgers are built by pipeline nodes named "ledger:<scenario>" (see
+calculator.pipeline.ScenarioRun.ledger); third-party scenarios can register
+their own with the helpers below.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ru_smb_it_budget_planner.models.infra_model import InfraSpec
+from ru_smb_it_budget_planner.models.compiled import CompiledInfra
+from ru_smb_it_budget_planner.calculator.scenario_builder import (
+    COST_CATEGORIES, ScenarioCost
+)
+from ru_smb_it_budget_planner.calculator.money import group_sum, to_kopecks, to_rub
+from ru_smb_it_budget_planner.calculator.placement import (
+    PlacementResult, ON_PREM, COLOCATION as COLO_PLACEMENT, CLOUD_PREFIX
+)
+from ru_smb_it_budget_planner.tracing import traced, count
+
+ITEM_KINDS = ("server", "colocation", "cloud", "license", "workload")
+SERVER, COLOCATION, CLOUD, LICENSE, WORKLOAD = range(len(ITEM_KINDS))
+
+LEDGER_NODE_PREFIX = "ledger:"
+
+# Which item kind each as_is category is made of
+AS_IS_KINDS = {
+    "hardware_amortization": SERVER,
+    "electricity": SERVER,
+    "colocation": COLOCATION,
+    "cloud": CLOUD,
+    "licenses": LICENSE,
+}
+
+_INT32_MAX = np.iinfo(np.int32).max
+
+
+@dataclass
+class LedgerRows:
+    """Rows of one scenario: item kind, item position, category and amount per row."""
+    kind: np.ndarray
+    item: np.ndarray
+    category: np.ndarray
+    amount: np.ndarray
+
+
+@dataclass
+class CostLedger:
+    scenario_names: Tuple[str, ...]
+    scenario: np.ndarray  # uint16 codes into scenario_names
+    kind: np.ndarray      # uint8 codes into ITEM_KINDS
+    item: np.ndarray      # Position of the item within its section of the spec
+    category: np.ndarray  # uint8 codes into COST_CATEGORIES
+    amount: np.ndarray    # RUB per month, whole kopecks
+    # Item names per kind, indexed like `item`; kinds without names are exported blank
+    item_names: Mapping[str, Sequence[str]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return int(self.amount.size)
+
+    @property
+    def nbytes(self) -> int:
+        columns = (self.scenario, self.kind, self.item, self.category, self.amount)
+        return sum(a.nbytes for a in columns)
+
+    def totals(self) -> Dict[str, Dict[str, float]]:
+        """Sums per scenario and category, shaped like ScenarioCost.details."""
+        n_cat = len(COST_CATEGORIES)
+        keys = self.scenario.astype(np.int64) * n_cat + self.category
+        sums = to_rub(group_sum(keys, to_kopecks(self.amount),
+                                len(self.scenario_names) * n_cat))
+        return {
+            name: dict(zip(COST_CATEGORIES, sums[i * n_cat:(i + 1) * n_cat].tolist()))
+            for i, name in enumerate(self.scenario_names)
+        }
+
+    def item_dictionary(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Item names as a dictionary: (names, code per row) with names[code] the
+        name of the row's item and "" for items of kinds without names.
+        """
+        names: List[str] = [""]
+        offsets = np.zeros(len(ITEM_KINDS), dtype=np.int64)
+        named = np.zeros(len(ITEM_KINDS), dtype=bool)
+        for k, kind in enumerate(ITEM_KINDS):
+            kind_names = self.item_names.get(kind)
+            if kind_names is not None:
+                offsets[k] = len(names)
+                named[k] = True
+                names.extend(kind_names)
+        codes = np.where(named[self.kind], offsets[self.kind] + self.item, 0)
+        return names, codes
+
+    @classmethod
+    def from_rows(
+        cls, scenario_name: str, rows: Sequence[LedgerRows],
+        item_names: Optional[Mapping[str, Sequence[str]]] = None
+    ) -> "CostLedger":
+        amount = np.concatenate([r.amount for r in rows]) if rows else np.zeros(0)
+        return cls(
+            scenario_names=(scenario_name,),
+            scenario=np.zeros(amount.size, dtype=np.uint16),
+            kind=_concat([r.kind for r in rows], np.uint8),
+            item=_concat([r.item for r in rows], np.int32),
+            category=_concat([r.category for r in rows], np.uint8),
+            amount=amount,
+            item_names=item_names or {},
+        )
+
+    @classmethod
+    def concat(cls, ledgers: Sequence["CostLedger"]) -> "CostLedger":
+        """Stacks ledgers of the same spec; scenarios with the same name are merged."""
+        names: Dict[str, int] = {}
+        scenario = []
+        for ledger in ledgers:
+            remap = np.array([names.setdefault(n, len(names))
+                              for n in ledger.scenario_names], dtype=np.uint16)
+            scenario.append(remap[ledger.scenario])
+        return cls(
+            scenario_names=tuple(names),
+            scenario=_concat(scenario, np.uint16),
+            kind=_concat([lg.kind for lg in ledgers], np.uint8),
+            item=_concat([lg.item for lg in ledgers], np.int32),
+            category=_concat([lg.category for lg in ledgers], np.uint8),
+            amount=_concat([lg.amount for lg in ledgers], np.float64),
+            item_names=ledgers[0].item_names if ledgers else {},
+        )
+
+
+def _concat(arrays: Sequence[np.ndarray], dtype: type) -> np.ndarray:
+    return np.concatenate(arrays) if arrays else np.zeros(0, dtype=dtype)
+
+
+def _positions(n: int) -> np.ndarray:
+    return np.arange(n, dtype=np.int32 if n <= _INT32_MAX else np.int64)
+
+
+def rows(kind: int, category: str, amount: np.ndarray,
+         item: Optional[np.ndarray] = None) -> LedgerRows:
+    """
+    One row per element of amount (rounded to kopecks); items default to
+    0..n-1 of the given kind.
+    """
+    n = amount.size
+    return LedgerRows(
+        kind=np.full(n, kind, dtype=np.uint8),
+        item=_positions(n) if item is None else item,
+        category=np.full(n, COST_CATEGORIES.index(category), dtype=np.uint8),
+        amount=to_rub(to_kopecks(amount)),
+    )
+
+
+def item_names(infra: Union[InfraSpec, CompiledInfra],
+               compiled: CompiledInfra) -> Dict[str, Sequence[str]]:
+    """
+    Names used when exporting: server names and license products come from the
+    spec (a compiled spec does not keep them), colocation units and cloud usage
+    rows are named after their region / profile, workloads after themselves.
+    """
+    names: Dict[str, Sequence[str]] = {
+        "colocation": _expand(compiled.colo_region_names, compiled.colo_region),
+        "cloud": _expand(compiled.cloud_profile_names, compiled.cloud_profile),
+        "workload": compiled.workload_names,
+    }
+    if isinstance(infra, InfraSpec):
+        names["server"] = [s.name for s in infra.current_deployment.on_prem_servers]
+        names["license"] = [lic.product for lic in infra.licenses]
+    return names
+
+
+def _expand(interned: Tuple[str, ...], ids: np.ndarray) -> List[str]:
+    return np.asarray(interned, dtype=object)[ids].tolist() if ids.size else []
+
+
+def _item_positions(positions: np.ndarray, n: int) -> np.ndarray:
+    return positions.astype(np.int32) if n <= _INT32_MAX else positions
+
+
+def scaled_as_is_rows(items: Mapping[str, np.ndarray],
+                      factors: Mapping[str, float]) -> List[LedgerRows]:
+    """
+    as_is rows per category with every amount multiplied by
+    factors.get(category, 1.0).
+    """
+    return [rows(AS_IS_KINDS[cat], cat, items[cat] * factors.get(cat, 1.0))
+            for cat in COST_CATEGORIES]
+
+
+@traced("as_is_ledger")
+def as_is_ledger(items: Mapping[str, np.ndarray],
+                 names: Mapping[str, Sequence[str]]) -> CostLedger:
+    ledger = CostLedger.from_rows("as_is", scaled_as_is_rows(items, {}), names)
+    count("ledger_rows", len(ledger))
+    return ledger
+
+
+@traced("moved_to_cloud_ledger")
+def moved_to_cloud_ledger(scenario_name: str, compiled: CompiledInfra,
+                          items: Mapping[str, np.ndarray], mask: np.ndarray,
+                          workload_costs: Optional[np.ndarray],
+                          names: Mapping[str, Sequence[str]]) -> CostLedger:
+    """
+    Rows of calculate_moved_to_cloud: on-prem items scaled down by the share of
+    moved vCPUs plus one cloud row per moved workload. workload_costs is None
+    when the target profile is missing (nothing moves).
+    """
+    total_vcpus = int(compiled.workload_vcpus.sum())
+    moved_vcpus = (0 if workload_costs is None
+                   else int(compiled.workload_vcpus[mask].sum()))
+    keep = 1.0 - (moved_vcpus / total_vcpus if total_vcpus else 0)
+    parts = scaled_as_is_rows(items, {"hardware_amortization": keep,
+                                      "electricity": keep, "colocation": keep})
+    if workload_costs is not None:
+        moved = np.flatnonzero(mask)
+        parts.insert(4, rows(WORKLOAD, "cloud", workload_costs[moved],
+                             _item_positions(moved, mask.size)))
+    ledger = CostLedger.from_rows(scenario_name, parts, names)
+    count("ledger_rows", len(ledger))
+    return ledger
+
+
+@traced("optimal_ledger")
+def optimal_ledger(compiled: CompiledInfra, items: Mapping[str, np.ndarray],
+                   as_is: ScenarioCost, placement: PlacementResult,
+                   names: Mapping[str, Sequence[str]]) -> CostLedger:
+    """
+    Rows of calculate_optimal: own hardware scaled by the placed vCPU shares,
+    rack rent per workload moved to colocation and a cloud row per workload
+    placed in the cloud.
+    """
+    vcpus = compiled.workload_vcpus
+    place = np.array([p.placement for p in placement.placements], dtype=object)
+    cost = np.array([p.monthly_cost_rub for p in placement.placements],
+                    dtype=np.float64)
+    on_prem = place == ON_PREM
+    colo = place == COLO_PLACEMENT
+    cloud = np.array([p.startswith(CLOUD_PREFIX) for p in place.tolist()], dtype=bool)
+
+    total_vcpus = int(vcpus.sum())
+    on_prem_share = int(vcpus[on_prem].sum()) / total_vcpus if total_vcpus else 1.0
+    own_share = int(vcpus[on_prem | colo].sum()) / total_vcpus if total_vcpus else 1.0
+    amort_rate = (as_is.details["hardware_amortization"] / total_vcpus
+                  if total_vcpus else 0.0)
+
+    parts = scaled_as_is_rows(items, {"hardware_amortization": own_share,
+                                      "electricity": on_prem_share,
+                                      "colocation": on_prem_share})
+    colo_items, cloud_items = np.flatnonzero(colo), np.flatnonzero(cloud)
+    parts.insert(3, rows(WORKLOAD, "colocation",
+                         cost[colo_items] - amort_rate * vcpus[colo_items],
+                         _item_positions(colo_items, vcpus.size)))
+    parts.insert(5, rows(WORKLOAD, "cloud", cost[cloud_items],
+                         _item_positions(cloud_items, vcpus.size)))
+    ledger = CostLedger.from_rows("optimal", parts, names)
+    count("ledger_rows", len(ledger))
+    return ledger
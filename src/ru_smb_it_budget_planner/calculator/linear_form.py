@@ -0,0 +1,289 @@
+"""
+Linear cost form: a spec compiled for instant repricing.
+
+Every monthly cost of as_is, minimal_cloud and hybrid is linear in the
+tariffs: the kWh price and the rack unit price of every region, and the four
+rates of every cloud profile. compile_linear_form() reduces a spec to a fixed
+part per scenario (amortization and licenses, which no tariff touches) and a
+coefficient row over the tariffs the spec actually uses. The whole catalog may
+hold hundreds of tariffs; a spec touches a handful, so only those columns are
+kept. Repricing a scenario is then one dot product, and repricing under a
+whole matrix of price vectors is one matrix product.
+
+Which workloads move to the cloud depends on their flags, not on prices, so
+the moved share is fixed at compile time. The optimal scenario chooses
+placements by price and is not linear; it is rejected. Parameters are the
+catalog rows the spec resolves to at compile time (after region normalization
+and fallbacks, see PricingContext); price_vector() reads the same rows from any
+other catalog. Repriced costs match the calculators up to their per-item
+kopeck rounding (see calculator.money).
+
+sensitivity() uses the form for a tornado analysis: every tariff is moved by
+-delta and +delta with the others at their base prices, and all 2 * P price
+vectors are evaluated with a single matrix product.
+"""
+from dataclasses import dataclass
+from typing import (
+    Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+)
+
+import numpy as np
+
+from ru_smb_it_budget_planner.models.infra_model import InfraSpec
+from ru_smb_it_budget_planner.models.compiled import CompiledInfra, compile_infra
+from ru_smb_it_budget_planner.calculator.scenario_builder import (
+    PricingContext, DEFAULT_TARGET_PROFILE, CLOUD_PRICE_FIELDS
+)
+from ru_smb_it_budget_planner.calculator.cloud_calc import (
+    HOURS_PER_MONTH, WORKLOAD_EGRESS_GB
+)
+from ru_smb_it_budget_planner.calculator.energy_calc import calculate_monthly_kwh
+from ru_smb_it_budget_planner.calculator.on_prem_calc import server_monthly_amortization
+from ru_smb_it_budget_planner.tracing import traced
+
+LINEAR_SCENARIOS = ("as_is", "minimal_cloud", "hybrid")
+DEFAULT_DELTA = 0.2
+
+# Price kind -> (key field of the catalog row, price fields)
+PRICE_FIELDS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "electricity": ("region", ("tariff_rub_per_kwh",)),
+    "colocation": ("region", ("price_rub_per_u_per_month",)),
+    "cloud": ("code", CLOUD_PRICE_FIELDS),
+}
+
+# Price field -> tariff group of calculator.simulation
+TARIFF_GROUP_OF_FIELD = {
+    "tariff_rub_per_kwh": "electricity",
+    "price_rub_per_u_per_month": "colocation",
+    "vCPU_price_rub_per_hour": "cloud_vcpu",
+    "ram_price_rub_per_gb_hour": "cloud_ram",
+    "storage_price_rub_per_gb_month": "cloud_storage",
+    "egress_price_rub_per_gb": "cloud_egress",
+}
+
+_FIELD_LABELS = {
+    "tariff_rub_per_kwh": "электроэнергия",
+    "price_rub_per_u_per_month": "колокация",
+    "vCPU_price_rub_per_hour": "vCPU",
+    "ram_price_rub_per_gb_hour": "RAM",
+    "storage_price_rub_per_gb_month": "хранение",
+    "egress_price_rub_per_gb": "трафик",
+}
+
+
+class PriceParameter(NamedTuple):
+    kind: str   # Key of PRICE_FIELDS
+    key: str    # Region or profile code of the catalog row
+    field: str  # Price field of the row
+
+    @property
+    def group(self) -> str:
+        return TARIFF_GROUP_OF_FIELD[self.field]
+
+    @property
+    def label(self) -> str:
+        if self.kind == "cloud":
+            return f"{self.key}: {_FIELD_LABELS[self.field]}"
+        return f"{_FIELD_LABELS[self.field]}: {self.key}"
+
+
+def _lookup(pricing: PricingContext, kind: str) -> Callable[[str], Any]:
+    return {
+        "electricity": pricing.get_electricity_tariff,
+        "colocation": pricing.get_colocation_tariff,
+        "cloud": pricing.get_cloud_profile,
+    }[kind]
+
+
+class _Parameters:
+    """Numbers the parameters in order of first use."""
+
+    def __init__(self, pricing: PricingContext):
+        self.pricing = pricing
+        self.index: Dict[PriceParameter, int] = {}
+
+    def columns(self, kind: str, name: str) -> List[int]:
+        """Parameter positions of every price field of the row `name` resolves to."""
+        row = _lookup(self.pricing, kind)(name)
+        key_field, fields = PRICE_FIELDS[kind]
+        key = getattr(row, key_field)
+        return [self.index.setdefault(PriceParameter(kind, key, f), len(self.index))
+                for f in fields]
+
+    def ids(self, kind: str, names: Sequence[str], ids: np.ndarray) -> np.ndarray:
+        """Parameter positions per item, shape (items, fields of the kind)."""
+        table = np.array([self.columns(kind, name) for name in names], dtype=np.int64)
+        table = table.reshape(len(names), len(PRICE_FIELDS[kind][1]))
+        return np.asarray(table[ids])
+
+
+@dataclass
+class LinearCostForm:
+    """Monthly cost of scenario s under prices p: fixed[s] + coefficients[s] @ p."""
+    scenario_names: Tuple[str, ...]
+    parameters: Tuple[PriceParameter, ...]
+    fixed: np.ndarray         # (S,), RUB per month
+    coefficients: np.ndarray  # (S, P), RUB per month per unit of price
+    base_prices: np.ndarray   # (P,), prices of the catalog the form was compiled with
+
+    def price_vector(self, pricing: PricingContext) -> np.ndarray:
+        """Prices of the form's parameters in another catalog (same rows by key)."""
+        prices = np.empty(len(self.parameters))
+        missing: Dict[str, None] = {}
+        for i, p in enumerate(self.parameters):
+            row = _lookup(pricing, p.kind)(p.key)
+            if row is None:
+                missing[p.label] = None
+            else:
+                prices[i] = getattr(row, p.field)
+        if missing:
+            raise ValueError("В ценах отсутствуют данные:\n"
+                             + "\n".join(f"- {m}" for m in missing))
+        return prices
+
+    def monthly(self, prices: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Monthly costs for a price vector (P,) -> (S,) or a matrix of price
+        vectors (N, P) -> (N, S); base prices by default.
+        """
+        if prices is None:
+            prices = self.base_prices
+        prices = np.asarray(prices, dtype=np.float64)
+        return np.asarray(prices @ self.coefficients.T + self.fixed)
+
+    def yearly(self, prices: Optional[np.ndarray] = None) -> np.ndarray:
+        return self.monthly(prices) * 12
+
+    def terms(self, scenario_name: str) -> Dict[PriceParameter, float]:
+        """Non-zero coefficients of one scenario."""
+        row = self.coefficients[self.scenario_names.index(scenario_name)]
+        return {self.parameters[i]: float(row[i]) for i in np.flatnonzero(row).tolist()}
+
+
+@traced("compile_linear_form")
+def compile_linear_form(infra: Union[InfraSpec, CompiledInfra], pricing: PricingContext,
+                        scenario_names: Iterable[str] = LINEAR_SCENARIOS,
+                        profile_code: str = DEFAULT_TARGET_PROFILE) -> LinearCostForm:
+    names = tuple(scenario_names)
+    unknown = [n for n in names if n not in LINEAR_SCENARIOS]
+    if unknown:
+        raise ValueError(f"Сценарий не линеен по тарифам: {', '.join(unknown)} "
+                         f"(доступны: {', '.join(LINEAR_SCENARIOS)})")
+    c = compile_infra(infra)
+    pricing.require_coverage(c)
+
+    params = _Parameters(pricing)
+    energy_ids = params.ids("electricity", c.server_region_names, c.server_region)[:, 0]
+    colo_ids = params.ids("colocation", c.colo_region_names, c.colo_region)[:, 0]
+    cloud_ids = params.ids("cloud", c.cloud_profile_names, c.cloud_profile)
+    target = None
+    if pricing.get_cloud_profile(profile_code):
+        target = params.columns("cloud", profile_code)
+    n = len(params.index)
+
+    def coefficients(ids: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        return np.bincount(ids, weights=weights.astype(np.float64), minlength=n)
+
+    # as_is, split into what moving workloads scales down and what it keeps
+    amortization = float(
+        server_monthly_amortization(c.server_capex, c.server_age).sum()
+    )
+    licenses = float((c.license_cost / 12.0).sum())
+    on_prem = (coefficients(energy_ids, calculate_monthly_kwh(c.server_power))
+               + coefficients(colo_ids, c.colo_units))
+    cloud_units = np.column_stack([
+        c.cloud_vcpus * HOURS_PER_MONTH, c.cloud_ram * HOURS_PER_MONTH,
+        c.cloud_storage, c.cloud_egress,
+    ]).reshape(-1, 4)
+    cloud = coefficients(cloud_ids.ravel(), cloud_units.ravel())
+
+    total_vcpus = int(c.workload_vcpus.sum())
+
+    def moved(mask: np.ndarray) -> Tuple[float, np.ndarray]:
+        if target is None:
+            mask = np.zeros_like(mask)
+        moved_vcpus = int(c.workload_vcpus[mask].sum())
+        keep = 1.0 - (moved_vcpus / total_vcpus if total_vcpus else 0.0)
+        row = keep * on_prem + cloud
+        if target is not None:
+            row[target] += [moved_vcpus * HOURS_PER_MONTH,
+                            int(c.workload_ram[mask].sum()) * HOURS_PER_MONTH,
+                            int(c.workload_storage[mask].sum()),
+                            int(mask.sum()) * WORKLOAD_EGRESS_GB]
+        return keep * amortization + licenses, row
+
+    forms = {
+        "as_is": lambda: (amortization + licenses, on_prem + cloud),
+        "minimal_cloud": lambda: moved(c.minimal_cloud_mask()),
+        "hybrid": lambda: moved(c.hybrid_mask()),
+    }
+    rows = [forms[name]() for name in names]
+    form = LinearCostForm(
+        scenario_names=names,
+        parameters=tuple(params.index),
+        fixed=np.array([fixed for fixed, _ in rows], dtype=np.float64),
+        coefficients=np.array([row for _, row in rows],
+                              dtype=np.float64).reshape(len(names), n),
+        base_prices=np.zeros(n),
+    )
+    form.base_prices = form.price_vector(pricing)
+    return form
+
+
+@dataclass
+class SensitivityBar:
+    parameter: PriceParameter
+    base_price: float
+    low_yearly_rub: float   # Cost with the price at (1 - delta)
+    high_yearly_rub: float  # Cost with the price at (1 + delta)
+
+    @property
+    def swing(self) -> float:
+        return abs(self.high_yearly_rub - self.low_yearly_rub)
+
+
+@dataclass
+class SensitivityResult:
+    delta: float
+    scenario_names: Tuple[str, ...]
+    base_yearly_rub: Dict[str, float]
+    # Per scenario, largest swing first; untouched prices left out
+    bars: Dict[str, List[SensitivityBar]]
+
+
+def tornado(form: LinearCostForm, delta: float = DEFAULT_DELTA) -> SensitivityResult:
+    """
+    Moves every price by -delta and +delta in turn; one matrix product for all
+    of them.
+    """
+    if not 0 < delta <= 1:
+        raise ValueError(f"Отклонение цены должно быть в (0, 1], получено {delta}")
+    n = len(form.parameters)
+    prices = np.tile(form.base_prices, (2 * n, 1))
+    idx = np.arange(n)
+    prices[idx, idx] *= 1.0 - delta
+    prices[n + idx, idx] *= 1.0 + delta
+    costs = form.yearly(prices)  # (2P, S)
+    base = form.yearly()
+
+    bars: Dict[str, List[SensitivityBar]] = {}
+    for s, name in enumerate(form.scenario_names):
+        touched = np.flatnonzero(form.coefficients[s] * form.base_prices)
+        scenario_bars = [SensitivityBar(form.parameters[i], float(form.base_prices[i]),
+                                        float(costs[i, s]), float(costs[n + i, s]))
+                         for i in touched.tolist()]
+        bars[name] = sorted(scenario_bars, key=lambda bar: -bar.swing)
+    return SensitivityResult(
+        delta=delta,
+        scenario_names=form.scenario_names,
+        base_yearly_rub={name: float(base[s])
+                         for s, name in enumerate(form.scenario_names)},
+        bars=bars,
+    )
+
+
+@traced("sensitivity")
+def sensitivity(infra: Union[InfraSpec, CompiledInfra], pricing: PricingContext,
+                scenario_names: Iterable[str] = LINEAR_SCENARIOS,
+                delta: float = DEFAULT_DELTA) -> SensitivityResult:
+    return tornado(compile_linear_form(infra, pricing, scenario_names), delta)
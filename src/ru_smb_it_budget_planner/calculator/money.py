@@ -0,0 +1,88 @@
+"""
+Money kernel: amounts as int64 kopecks.
+
+Item costs are computed in float RUB, as before, and rounded to whole
+kopecks (half away from zero) once per item per month: per server, rack,
+cloud usage row, license and moved workload. Everything after that is
+integer arithmetic. Integer addition is associative, so totals do not
+depend on the order or grouping of the items: the per-spec functions, the
+batch engine and chunked or multi-process runs produce bit-identical
+numbers. Amounts derived from a total (on-prem costs scaled by the moved
+share) are rounded to kopecks where they are derived.
+
+ScenarioCost keeps RUB floats; each is a kopeck total divided by 100, so
+the same kopecks always give the same float.
+"""
+import math
+from typing import Union, overload
+
+import numpy as np
+
+KOPECKS_PER_RUB = 100
+
+# Every integer up to 2**53 is exact in float64, so float sums of kopecks below
+# that bound are exact integer sums (and independent of the summation order)
+_EXACT_FLOAT_LIMIT = 2 ** 53
+
+
+def round_half_away(values: np.ndarray) -> np.ndarray:
+    """
+    Nearest integers as int64, halves rounded away from zero; non-finite values
+    raise ValueError.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.abs(values, out=np.empty_like(values))
+    rounded += 0.5
+    np.floor(rounded, out=rounded)
+    if not np.isfinite(rounded).all():
+        raise ValueError("Сумма не является конечным числом")
+    return np.asarray(np.copysign(rounded, values, out=rounded), dtype=np.int64)
+
+
+def to_kopecks(rub: Union[np.ndarray, float]) -> np.ndarray:
+    """RUB amounts rounded to kopecks."""
+    return round_half_away(np.asarray(rub, dtype=np.float64) * KOPECKS_PER_RUB)
+
+
+def kopecks(rub: float) -> int:
+    """to_kopecks for one amount, without the array overhead (same float operations)."""
+    if not math.isfinite(rub):
+        raise ValueError("Сумма не является конечным числом")
+    return int(math.copysign(math.floor(abs(rub * KOPECKS_PER_RUB) + 0.5), rub))
+
+
+def scale_kopecks(kop: Union[np.ndarray, int],
+                  factor: Union[np.ndarray, float]) -> np.ndarray:
+    """kop * factor rounded to kopecks."""
+    return round_half_away(np.asarray(kop, dtype=np.float64) * factor)
+
+
+@overload
+def to_rub(kop: int) -> float: ...
+
+
+@overload
+def to_rub(kop: np.ndarray) -> np.ndarray: ...
+
+
+def to_rub(kop: Union[np.ndarray, int]) -> Union[np.ndarray, float]:
+    """Kopecks back in RUB: a float for one amount, an array for an array."""
+    if isinstance(kop, np.ndarray):
+        return kop / KOPECKS_PER_RUB
+    return int(kop) / KOPECKS_PER_RUB
+
+
+def total(kop: np.ndarray) -> int:
+    return int(np.asarray(kop, dtype=np.int64).sum())
+
+
+def group_sum(owner: np.ndarray, kop: np.ndarray, n: int) -> np.ndarray:
+    """Exact sums of kop per owner (0..n-1), int64."""
+    kop = np.asarray(kop, dtype=np.int64)
+    # Bounded by max * count: a sum of the absolute values could itself overflow
+    if kop.size == 0 or int(np.abs(kop).max()) * kop.size < _EXACT_FLOAT_LIMIT:
+        # bincount is much faster than np.add.at and exact below the limit
+        return np.bincount(owner, weights=kop, minlength=n).astype(np.int64)
+    out = np.zeros(n, dtype=np.int64)
+    np.add.at(out, owner, kop)
+    return out
@@ -1,23 +1,34 @@
+from typing import Union, overload
+
+import numpy as np
+
 from ru_smb_it_budget_planner.models.infra_model import OnPremServer, ColocationUnit
 from ru_smb_it_budget_planner.models.pricing_model import ElectricityTariff, ColocationTariff
 from ru_smb_it_budget_planner.calculator.energy_calc import calculate_monthly_kwh, calculate_monthly_energy_cost
 
+# Years a current server is still expected to serve (simplified lifetime)
+SERVER_REMAINING_YEARS = 3
+
 def calculate_monthly_amortization(capex: float, lifetime_years: int) -> float:
     if lifetime_years <= 0:
         return 0.0
     return capex / (lifetime_years * 12.0)
 
+@overload
+def server_monthly_amortization(capex: float, age_years: int) -> float: ...
+@overload
+def server_monthly_amortization(capex: np.ndarray,
+                                age_years: np.ndarray) -> np.ndarray: ...
+def server_monthly_amortization(
+    capex: Union[np.ndarray, float], age_years: Union[np.ndarray, int]
+) -> Union[np.ndarray, float]:
+    """Amortization of a current server over its age plus the remaining years."""
+    return capex / ((age_years + SERVER_REMAINING_YEARS) * 12.0)
+
 def calculate_server_total_cost(server: OnPremServer, tariff: ElectricityTariff) -> float:
-    amortization = calculate_monthly_amortization(server.capex_rub, server.age_years + 3) # Assuming 3 more years or total lifetime? 
-    # Prompt says: "lifetime_years" in HardwareProfile. But OnPremServer has "age_years".
-    # Let's assume a standard lifetime or use a default.
-    # Actually, the prompt says: "monthly_capex = capex_rub / (lifetime_years * 12)".
-    # But OnPremServer doesn't have lifetime_years, it has age_years.
-    # HardwareProfile has lifetime_years.
-    # For existing servers, we might use a standard lifetime (e.g. 5 years) or derived from profile.
-    # Let's assume 5 years for now if not specified, or pass it in.
-    lifetime = 5
-    amortization = calculate_monthly_amortization(server.capex_rub, lifetime)
+    # A fixed 5-year lifetime; the scenario calculators use
+    # server_monthly_amortization instead
+    amortization = calculate_monthly_amortization(server.capex_rub, 5)
     
     kwh = calculate_monthly_kwh(server.power_watts)
     energy_cost = calculate_monthly_energy_cost(kwh, tariff)
@@ -0,0 +1,309 @@
+"""
+Scenario evaluation pipeline.
+
+Scenarios and the intermediates they share are registered as nodes with named
+dependencies. A ScenarioRun evaluates nodes on demand and memoizes every value
+for the lifetime of the run, so as_is (and its per-category breakdown) is
+computed once no matter how many scenarios depend on it.
+
+Third-party scenarios plug in with the same decorator:
+
+    @register_node("all_cloud", depends_on=("as_is",), scenario=True)
+    def all_cloud(infra, pricing, as_is):
+        return calculate_moved_to_cloud("all_cloud", infra, pricing, as_is,
+                                        infra.workloads)
+
+Nodes receive the spec the run was created with. The built-in nodes work on
+the "compiled" node instead (see models.compiled), which is built once per run.
+
+A scenario's itemized rows (see calculator.ledger) come from the node named
+"ledger:<scenario>"; ScenarioRun.ledger collects them for several scenarios.
+Likewise "consolidation:<scenario>" packs the workloads the scenario keeps
+on-prem onto the servers (see calculator.consolidation).
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ru_smb_it_budget_planner.models.infra_model import InfraSpec
+from ru_smb_it_budget_planner.models.compiled import CompiledInfra, compile_infra
+from ru_smb_it_budget_planner.calculator.scenario_builder import (
+    PricingContext, ScenarioCost, calculate_as_is, calculate_moved_to_cloud,
+    as_is_item_costs, workload_cloud_costs, DEFAULT_TARGET_PROFILE
+)
+from ru_smb_it_budget_planner.calculator.placement import (
+    PlacementResult, solve_placement, calculate_optimal
+)
+from ru_smb_it_budget_planner.calculator.ledger import (
+    CostLedger, LEDGER_NODE_PREFIX, item_names, as_is_ledger, moved_to_cloud_ledger,
+    optimal_ledger
+)
+from ru_smb_it_budget_planner.calculator.consolidation import (
+    ConsolidationResult, CONSOLIDATION_NODE_PREFIX, consolidate
+)
+
+DEFAULT_SCENARIOS = ("as_is", "minimal_cloud", "hybrid")
+
+
+@dataclass(frozen=True)
+class PipelineNode:
+    name: str
+    func: Callable[..., Any]
+    depends_on: Tuple[str, ...] = ()
+    scenario: bool = False
+
+
+_REGISTRY: Dict[str, PipelineNode] = {}
+
+
+def register_node(
+    name: str, depends_on: Iterable[str] = (), scenario: bool = False,
+    replace: bool = False
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Registers func(infra, pricing, **dependencies) as a pipeline node.
+    Dependencies are passed as keyword arguments named after the nodes.
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        if name in _REGISTRY and not replace:
+            raise ValueError(f"Узел конвейера '{name}' уже зарегистрирован")
+        _REGISTRY[name] = PipelineNode(name, func, tuple(depends_on), scenario)
+        return func
+    return decorator
+
+
+def unregister_node(name: str) -> None:
+    _REGISTRY.pop(name, None)
+
+
+def get_node(name: str) -> PipelineNode:
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Неизвестный сценарий или узел конвейера: {name}") from None
+
+
+def available_scenarios() -> List[str]:
+    return [node.name for node in _REGISTRY.values() if node.scenario]
+
+
+class ScenarioRun:
+    """One evaluation of the pipeline for a spec and a pricing context."""
+
+    def __init__(self, infra: Union[InfraSpec, CompiledInfra], pricing: PricingContext,
+                 compiled: Optional[CompiledInfra] = None):
+        self.infra = infra
+        self.pricing = pricing
+        self._values: Dict[str, Any] = {}
+        if compiled is not None:  # Reused across runs that differ only in pricing
+            self._values["compiled"] = compiled
+        self._in_progress: List[str] = []
+
+    def get(self, name: str) -> Any:
+        if name in self._values:
+            return self._values[name]
+        if name in self._in_progress:
+            cycle = " -> ".join(self._in_progress + [name])
+            raise ValueError(f"Циклическая зависимость в конвейере: {cycle}")
+        node = get_node(name)
+        self._in_progress.append(name)
+        try:
+            deps = {dep: self.get(dep) for dep in node.depends_on}
+            value = node.func(self.infra, self.pricing, **deps)
+        finally:
+            self._in_progress.pop()
+        self._values[name] = value
+        return value
+
+    def scenario(self, name: str) -> ScenarioCost:
+        if not get_node(name).scenario:
+            raise ValueError(f"Узел конвейера '{name}' не является сценарием")
+        scenario: ScenarioCost = self.get(name)
+        return scenario
+
+    def scenarios(self, names: Iterable[str] = DEFAULT_SCENARIOS) -> List[ScenarioCost]:
+        return [self.scenario(name) for name in names]
+
+    def ledger(self, names: Iterable[str] = DEFAULT_SCENARIOS) -> CostLedger:
+        """Itemized rows of the given scenarios, in that order."""
+        parts = []
+        for name in names:
+            if not get_node(name).scenario:
+                raise ValueError(f"Узел конвейера '{name}' не является сценарием")
+            if LEDGER_NODE_PREFIX + name not in _REGISTRY:
+                raise ValueError(f"Для сценария '{name}' нет детализации по позициям")
+            parts.append(self.get(LEDGER_NODE_PREFIX + name))
+        return CostLedger.concat(parts)
+
+    def consolidation(self, name: str) -> ConsolidationResult:
+        """Servers needed by the workloads the scenario keeps on-prem."""
+        if CONSOLIDATION_NODE_PREFIX + name not in _REGISTRY:
+            raise ValueError(f"Для сценария '{name}' нет расчета консолидации серверов")
+        result: ConsolidationResult = self.get(CONSOLIDATION_NODE_PREFIX + name)
+        return result
+
+    def is_computed(self, name: str) -> bool:
+        return name in self._values
+
+
+def evaluate_scenarios(infra: Union[InfraSpec, CompiledInfra], pricing: PricingContext,
+                       names: Optional[Iterable[str]] = None) -> List[ScenarioCost]:
+    return ScenarioRun(infra, pricing).scenarios(names or DEFAULT_SCENARIOS)
+
+
+def build_ledger(infra: Union[InfraSpec, CompiledInfra], pricing: PricingContext,
+                 names: Optional[Iterable[str]] = None) -> CostLedger:
+    return ScenarioRun(infra, pricing).ledger(names or DEFAULT_SCENARIOS)
+
+
+# Built-in nodes
+
+@register_node("compiled")
+def _compiled(infra: Union[InfraSpec, CompiledInfra],
+              pricing: PricingContext) -> CompiledInfra:
+    return compile_infra(infra)
+
+
+@register_node("as_is", depends_on=("compiled",), scenario=True)
+def _as_is(infra: InfraSpec, pricing: PricingContext,
+           compiled: CompiledInfra) -> ScenarioCost:
+    return calculate_as_is(compiled, pricing)
+
+
+@register_node("minimal_cloud_candidates", depends_on=("compiled",))
+def _minimal_cloud_candidates(infra: InfraSpec, pricing: PricingContext,
+                              compiled: CompiledInfra) -> np.ndarray:
+    return compiled.minimal_cloud_mask()
+
+
+@register_node("hybrid_candidates", depends_on=("compiled",))
+def _hybrid_candidates(infra: InfraSpec, pricing: PricingContext,
+                       compiled: CompiledInfra) -> np.ndarray:
+    return compiled.hybrid_mask()
+
+
+@register_node("minimal_cloud",
+               depends_on=("compiled", "as_is", "minimal_cloud_candidates"),
+               scenario=True)
+def _minimal_cloud(infra: InfraSpec, pricing: PricingContext, compiled: CompiledInfra,
+                   as_is: ScenarioCost,
+                   minimal_cloud_candidates: np.ndarray) -> ScenarioCost:
+    return calculate_moved_to_cloud("minimal_cloud", compiled, pricing, as_is,
+                                    minimal_cloud_candidates)
+
+
+@register_node("hybrid", depends_on=("compiled", "as_is", "hybrid_candidates"),
+               scenario=True)
+def _hybrid(infra: InfraSpec, pricing: PricingContext, compiled: CompiledInfra,
+            as_is: ScenarioCost, hybrid_candidates: np.ndarray) -> ScenarioCost:
+    return calculate_moved_to_cloud("hybrid", compiled, pricing, as_is,
+                                    hybrid_candidates)
+
+
+@register_node("optimal_placement", depends_on=("compiled", "as_is"))
+def _optimal_placement(infra: InfraSpec, pricing: PricingContext,
+                       compiled: CompiledInfra,
+                       as_is: ScenarioCost) -> PlacementResult:
+    return solve_placement(compiled, pricing, as_is)
+
+
+@register_node("optimal", depends_on=("compiled", "as_is", "optimal_placement"),
+               scenario=True)
+def _optimal(infra: InfraSpec, pricing: PricingContext, compiled: CompiledInfra,
+             as_is: ScenarioCost, optimal_placement: PlacementResult) -> ScenarioCost:
+    return calculate_optimal(compiled, pricing, as_is, optimal_placement)
+
+
+# Ledger nodes
+
+@register_node("as_is_items", depends_on=("compiled", "as_is"))
+def _as_is_items(infra: InfraSpec, pricing: PricingContext, compiled: CompiledInfra,
+                 as_is: ScenarioCost) -> Dict[str, np.ndarray]:
+    return as_is_item_costs(compiled, pricing)
+
+
+@register_node("item_names", depends_on=("compiled",))
+def _item_names(infra: Union[InfraSpec, CompiledInfra], pricing: PricingContext,
+                compiled: CompiledInfra) -> Dict[str, Any]:
+    return item_names(infra, compiled)
+
+
+@register_node(LEDGER_NODE_PREFIX + "as_is", depends_on=("as_is_items", "item_names"))
+def _as_is_ledger(infra: InfraSpec, pricing: PricingContext,
+                  as_is_items: Dict[str, np.ndarray],
+                  item_names: Dict[str, Any]) -> CostLedger:
+    return as_is_ledger(as_is_items, item_names)
+
+
+def _moved_ledger(scenario_name: str, pricing: PricingContext, compiled: CompiledInfra,
+                  items: Dict[str, np.ndarray], mask: np.ndarray,
+                  names: Dict[str, Any]) -> CostLedger:
+    profile = pricing.get_cloud_profile(DEFAULT_TARGET_PROFILE)
+    costs = None if profile is None else workload_cloud_costs(compiled, profile)
+    return moved_to_cloud_ledger(scenario_name, compiled, items, mask, costs, names)
+
+
+@register_node(LEDGER_NODE_PREFIX + "minimal_cloud",
+               depends_on=("compiled", "as_is_items", "minimal_cloud_candidates",
+                           "item_names"))
+def _minimal_cloud_ledger(infra: InfraSpec, pricing: PricingContext,
+                          compiled: CompiledInfra, as_is_items: Dict[str, np.ndarray],
+                          minimal_cloud_candidates: np.ndarray,
+                          item_names: Dict[str, Any]) -> CostLedger:
+    return _moved_ledger("minimal_cloud", pricing, compiled, as_is_items,
+                         minimal_cloud_candidates, item_names)
+
+
+@register_node(LEDGER_NODE_PREFIX + "hybrid",
+               depends_on=("compiled", "as_is_items", "hybrid_candidates",
+                           "item_names"))
+def _hybrid_ledger(infra: InfraSpec, pricing: PricingContext, compiled: CompiledInfra,
+                   as_is_items: Dict[str, np.ndarray], hybrid_candidates: np.ndarray,
+                   item_names: Dict[str, Any]) -> CostLedger:
+    return _moved_ledger("hybrid", pricing, compiled, as_is_items, hybrid_candidates,
+                         item_names)
+
+
+@register_node(LEDGER_NODE_PREFIX + "optimal",
+               depends_on=("compiled", "as_is", "as_is_items", "optimal_placement",
+                           "item_names"))
+def _optimal_ledger(infra: InfraSpec, pricing: PricingContext, compiled: CompiledInfra,
+                    as_is: ScenarioCost, as_is_items: Dict[str, np.ndarray],
+                    optimal_placement: PlacementResult,
+                    item_names: Dict[str, Any]) -> CostLedger:
+    return optimal_ledger(compiled, as_is_items, as_is, optimal_placement, item_names)
+
+
+# Consolidation nodes
+
+@register_node(CONSOLIDATION_NODE_PREFIX + "as_is",
+               depends_on=("compiled", "as_is_items", "item_names"))
+def _as_is_consolidation(infra: InfraSpec, pricing: PricingContext,
+                         compiled: CompiledInfra, as_is_items: Dict[str, np.ndarray],
+                         item_names: Dict[str, Any]) -> ConsolidationResult:
+    return consolidate(compiled, pricing, None, "as_is", as_is_items,
+                       item_names.get("server"))
+
+
+@register_node(CONSOLIDATION_NODE_PREFIX + "minimal_cloud",
+               depends_on=("compiled", "as_is_items", "minimal_cloud_candidates",
+                           "item_names"))
+def _minimal_cloud_consolidation(infra: InfraSpec, pricing: PricingContext,
+                                 compiled: CompiledInfra,
+                                 as_is_items: Dict[str, np.ndarray],
+                                 minimal_cloud_candidates: np.ndarray,
+                                 item_names: Dict[str, Any]) -> ConsolidationResult:
+    return consolidate(compiled, pricing, minimal_cloud_candidates, "minimal_cloud",
+                       as_is_items, item_names.get("server"))
+
+
+@register_node(CONSOLIDATION_NODE_PREFIX + "hybrid",
+               depends_on=("compiled", "as_is_items", "hybrid_candidates",
+                           "item_names"))
+def _hybrid_consolidation(infra: InfraSpec, pricing: PricingContext,
+                          compiled: CompiledInfra, as_is_items: Dict[str, np.ndarray],
+                          hybrid_candidates: np.ndarray,
+                          item_names: Dict[str, Any]) -> ConsolidationResult:
+    return consolidate(compiled, pricing, hybrid_candidates, "hybrid", as_is_items,
+                       item_names.get("server"))
@@ -0,0 +1,381 @@
+"""
+Optimal per-workload placement.
+
+Every workload goes to one of:
+- "on_prem": the company's own hardware where it is now. Costs the vCPU share of
+  the current on-prem spend (amortization + electricity + colocation), the same
+  linear scaling the fixed scenarios use, so "everything on_prem" equals as_is;
+- "colocation": own hardware moved to a rented rack under the cheapest available
+  ColocationTariff (company region first). Costs the amortization share plus rack
+  rent at COLO_VCPUS_PER_UNIT vCPUs per unit; power is included in the rent;
+- "cloud:<code>": any CloudProfile, priced with calculate_workload_cloud_cost.
+
+Compliance: KII and special-category PD stay on own hardware, PD may only go to
+profiles marked pd_compliant. Own hardware (on_prem + colocation) is limited by
+the vCPU/RAM/storage of the on-prem servers.
+
+Without a binding capacity every workload simply takes its cheapest allowed
+option. Otherwise choosing which workloads keep own hardware is a multi-dimensional
+0/1 knapsack over the savings versus the best cloud option; it is solved by
+depth-first branch and bound with a Lagrangian bound (multipliers found by
+subgradient search at the root), so 300+ workloads stay interactive. The result
+carries the proven lower bound of the objective; it equals the objective when the
+search finished within the node limit.
+"""
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+from ru_smb_it_budget_planner.models.infra_model import InfraSpec, Workload
+from ru_smb_it_budget_planner.models.compiled import (
+    CompiledInfra, compile_infra, PD, PD_SPECIAL, KII
+)
+from ru_smb_it_budget_planner.models.pricing_model import CloudProfile, ColocationTariff
+from ru_smb_it_budget_planner.calculator.scenario_builder import (
+    PricingContext, ScenarioCost, calculate_as_is, workload_cloud_costs,
+    scenario_from_kopecks, scenario_kopecks,
+)
+from ru_smb_it_budget_planner.calculator.money import kopecks, scale_kopecks
+from ru_smb_it_budget_planner.tracing import traced
+
+ON_PREM = "on_prem"
+COLOCATION = "colocation"
+CLOUD_PREFIX = "cloud:"
+
+COLO_VCPUS_PER_UNIT = 16  # Typical 1U server
+DEFAULT_NODE_LIMIT = 200_000
+LAGRANGIAN_ITERATIONS = 200
+
+_EPS = 1e-9
+
+
+class WorkloadPlacement(BaseModel):
+    workload: str
+    placement: str
+    vcpus: int
+    monthly_cost_rub: float
+
+
+class PlacementResult(BaseModel):
+    placements: List[WorkloadPlacement]
+    objective_monthly_rub: float
+    lower_bound_monthly_rub: float
+    proven_optimal: bool
+    nodes_explored: int
+
+
+def allowed_cloud_profiles(workload: Workload,
+                           profiles: List[CloudProfile]) -> List[CloudProfile]:
+    if workload.kii_related or workload.contains_pd_special:
+        return []
+    if workload.contains_pd:
+        return [p for p in profiles if p.pd_compliant]
+    return list(profiles)
+
+
+def _allowed_matrix(compiled: CompiledInfra,
+                    profiles: Sequence[CloudProfile]) -> np.ndarray:
+    """allowed_cloud_profiles for every workload, shape (workloads, profiles)."""
+    flags = compiled.workload_flags[:, None]
+    pd_compliant = np.array([p.pd_compliant for p in profiles], dtype=bool)[None, :]
+    restricted = flags & (KII | PD_SPECIAL) != 0
+    return np.asarray(~restricted & ((flags & PD == 0) | pd_compliant), dtype=bool)
+
+
+def _colocation_tariff(compiled: CompiledInfra,
+                       pricing: PricingContext) -> Optional[ColocationTariff]:
+    tariff = pricing.get_colocation_tariff(compiled.company.region)
+    if tariff is None and pricing.colocation:
+        tariff = min(pricing.colocation, key=lambda t: t.price_rub_per_u_per_month)
+    return tariff
+
+
+def _lagrangian_multipliers(gains: List[float], weights: Sequence[Tuple[float, ...]],
+                            items: List[int], caps: Tuple[float, ...], lower: float,
+                            iterations: int) -> List[float]:
+    """
+    Subgradient search for multipliers mu >= 0 minimizing the Lagrangian bound
+    sum(mu_d * cap_d) + sum(max(0, gain_i - mu . w_i)), which is an upper bound
+    of the knapsack for any mu and reaches the LP bound at the optimum.
+    """
+    dims = range(len(caps))
+    mu = [0.0] * len(caps)
+    best_mu = list(mu)
+    best_value = float("inf")
+    theta = 2.0
+    for _ in range(iterations):
+        value = sum(mu[d] * caps[d] for d in dims)
+        used = [0.0] * len(caps)
+        for i in items:
+            reduced = gains[i] - sum(mu[d] * weights[i][d] for d in dims)
+            if reduced > 0:
+                value += reduced
+                for d in dims:
+                    used[d] += weights[i][d]
+        if value < best_value:
+            best_value, best_mu = value, list(mu)
+        else:
+            theta /= 1.5
+        grad = [caps[d] - used[d] for d in dims]
+        norm = sum(g * g for g in grad)
+        if norm == 0 or value - lower <= _EPS:
+            break
+        step = theta * (value - lower) / norm
+        mu = [max(0.0, mu[d] - step * grad[d]) for d in dims]
+    return best_mu
+
+
+def _fits(w: Sequence[float], rem: Sequence[float]) -> bool:
+    return all(w[d] <= rem[d] + _EPS for d in range(len(rem)))
+
+
+def _greedy_fill(gains: List[float], weights: Sequence[Tuple[float, ...]],
+                 items: List[int],
+                 caps: Tuple[float, ...]) -> Tuple[List[int], List[float]]:
+    """
+    Adaptive greedy: repeatedly adds the item with the best gain per unit of
+    size relative to the capacity that is still free, which keeps the
+    dimensions balanced.
+    """
+    dims = range(len(caps))
+    rem = list(caps)
+    chosen: List[int] = []
+    left = list(items)
+    while left:
+        best, best_score = -1, -1.0
+        for i in left:
+            if _fits(weights[i], rem):
+                size = sum(weights[i][d] / rem[d] for d in dims if rem[d] > _EPS)
+                size = size or _EPS
+                if gains[i] / size > best_score:
+                    best, best_score = i, gains[i] / size
+        if best < 0:
+            break
+        left.remove(best)
+        chosen.append(best)
+        rem = [rem[d] - weights[best][d] for d in dims]
+    return chosen, rem
+
+
+def _local_search(gains: List[float], weights: Sequence[Tuple[float, ...]],
+                  items: List[int], chosen: List[int], rem: List[float]) -> List[int]:
+    """Improves a feasible choice with 1-for-1 swaps and additions until none helps."""
+    dims = range(len(rem))
+    selected = set(chosen)
+    improved = True
+    while improved:
+        improved = False
+        left = (j for j in items if j not in selected)
+        for j in sorted(left, key=lambda j: gains[j], reverse=True):
+            if _fits(weights[j], rem):
+                selected.add(j)
+                rem = [rem[d] - weights[j][d] for d in dims]
+                improved = True
+                continue
+            for i in selected:
+                if gains[j] > gains[i] + _EPS and all(
+                        weights[j][d] - weights[i][d] <= rem[d] + _EPS for d in dims):
+                    selected.remove(i)
+                    selected.add(j)
+                    rem = [rem[d] - weights[j][d] + weights[i][d] for d in dims]
+                    improved = True
+                    break
+    return list(selected)
+
+
+def _knapsack(gains: List[float], weights: Sequence[Tuple[float, ...]],
+              caps: Tuple[float, ...],
+              node_limit: int) -> Tuple[List[int], float, float, int]:
+    """
+    Maximizes the sum of gains subject to per-dimension capacities.
+    Returns (chosen indexes, best gain, proven upper bound of the gain, nodes explored).
+    """
+    dims = range(len(caps))
+    # Items that can never fit are dropped up front
+    items = [
+        i for i in range(len(gains)) if all(weights[i][d] <= caps[d] for d in dims)
+    ]
+    if all(sum(weights[i][d] for i in items) <= caps[d] for d in dims):
+        total = sum(gains[i] for i in items)
+        return items, total, total, 0
+
+    def take(i: int, rem: Tuple[float, ...]) -> Tuple[float, ...]:
+        return tuple(rem[d] - weights[i][d] for d in dims)
+
+    # Incumbent: adaptive greedy improved by local search
+    best_chosen, rem_list = _greedy_fill(gains, weights, items, caps)
+    best_chosen = _local_search(gains, weights, items, best_chosen, rem_list)
+    best_gain = sum(gains[i] for i in best_chosen)
+
+    # Lagrangian bound with multipliers fixed at the root: for the items from
+    # position k on it is mu . rem + sum of positive reduced gains, an O(dims)
+    # lookup with suffix sums.
+    mu = _lagrangian_multipliers(gains, weights, items, caps, best_gain,
+                                 LAGRANGIAN_ITERATIONS)
+    reduced = {i: gains[i] - sum(mu[d] * weights[i][d] for d in dims) for i in items}
+    items.sort(key=lambda i: reduced[i], reverse=True)
+    n = len(items)
+    suffix = [0.0] * (n + 1)
+    for k in range(n - 1, -1, -1):
+        suffix[k] = suffix[k + 1] + max(0.0, reduced[items[k]])
+
+    def bound(k: int, gain: float, rem: Tuple[float, ...]) -> float:
+        return gain + sum(mu[d] * rem[d] for d in dims) + suffix[k]
+
+    # Depth-first branch and bound; paths are stored as linked tuples
+    stack: list = [(0, 0.0, caps, None)]
+    nodes = 0
+    upper = best_gain
+    while stack:
+        if nodes >= node_limit:
+            upper = max(best_gain, max(bound(k, g, r) for k, g, r, _ in stack))
+            break
+        k, gain, rem, path = stack.pop()
+        nodes += 1
+        if bound(k, gain, rem) <= best_gain + _EPS:
+            continue
+        if k == n:
+            if gain > best_gain:
+                best_gain = gain
+                best_chosen = []
+                while path is not None:
+                    best_chosen.append(path[0])
+                    path = path[1]
+            continue
+        i = items[k]
+        stack.append((k + 1, gain, rem, path))
+        if _fits(weights[i], rem):
+            stack.append((k + 1, gain + gains[i], take(i, rem), (i, path)))
+    else:
+        upper = best_gain
+    return best_chosen, best_gain, upper, nodes
+
+
+@traced("solve_placement")
+def solve_placement(infra: Union[InfraSpec, CompiledInfra], pricing: PricingContext,
+                    as_is: Optional[ScenarioCost] = None,
+                    node_limit: int = DEFAULT_NODE_LIMIT) -> PlacementResult:
+    c = compile_infra(infra)
+    if as_is is None:
+        as_is = calculate_as_is(c, pricing)
+    names = c.workload_names
+    vcpus = c.workload_vcpus.tolist()
+    ram, storage = c.workload_ram.tolist(), c.workload_storage.tolist()
+    total_vcpus = sum(vcpus)
+    if total_vcpus == 0:
+        return PlacementResult(placements=[], objective_monthly_rub=0.0,
+                               lower_bound_monthly_rub=0.0, proven_optimal=True,
+                               nodes_explored=0)
+
+    d = as_is.details
+    on_prem = d["hardware_amortization"] + d["electricity"] + d["colocation"]
+    on_prem_rate = on_prem / total_vcpus
+    amort_rate = d["hardware_amortization"] / total_vcpus
+    colo = _colocation_tariff(c, pricing)
+    caps = (float(c.server_vcpus.sum()), float(c.server_ram.sum()),
+            float(c.server_storage.sum()))
+    has_own = c.server_vcpus.size > 0
+
+    # Cheapest allowed cloud profile per workload (the first one on ties)
+    profiles = pricing.cloud_profiles
+    cloud_code: List[Optional[str]] = [None] * len(names)
+    cloud_cost: List[float] = [0.0] * len(names)
+    if len(profiles):
+        costs = np.column_stack([workload_cloud_costs(c, p) for p in profiles])
+        costs[~_allowed_matrix(c, profiles)] = np.inf
+        best = costs.argmin(axis=1)
+        best_cost = costs[np.arange(len(names)), best]
+        codes = [CLOUD_PREFIX + p.code for p in profiles]
+        cloud_code = [codes[j] if np.isfinite(cost) else None
+                      for j, cost in zip(best.tolist(), best_cost)]
+        cloud_cost = best_cost.tolist()
+
+    # Best own-hardware and best cloud option per workload; forced own-hardware
+    # workloads consume capacity first, the others start in the cloud
+    rem = list(caps)
+    choice: List[Tuple[str, float]] = []
+    # (workload, own-hardware option)
+    flexible: List[Tuple[int, Tuple[str, float]]] = []
+    gains: List[float] = []
+    weights: List[Tuple[float, ...]] = []
+    rows = zip(names, vcpus, cloud_code, cloud_cost)
+    for idx, (name, v, code, cost) in enumerate(rows):
+        own: Optional[Tuple[str, float]] = None
+        if has_own:
+            own = (ON_PREM, on_prem_rate * v)
+            if colo is not None:
+                colo_rate = colo.price_rub_per_u_per_month / COLO_VCPUS_PER_UNIT
+                colo_cost = (amort_rate + colo_rate) * v
+                if colo_cost < own[1]:
+                    own = (COLOCATION, colo_cost)
+        if code is None:
+            if own is None:
+                raise ValueError(f"Нет допустимого размещения для нагрузки '{name}'")
+            choice.append(own)
+            rem = [rem[0] - vcpus[idx], rem[1] - ram[idx], rem[2] - storage[idx]]
+            continue
+        choice.append((code, cost))
+        if own is not None and own[1] < cost:
+            flexible.append((idx, own))
+            gains.append(cost - own[1])
+            weights.append((float(vcpus[idx]), float(ram[idx]), float(storage[idx])))
+    if min(rem) < 0:
+        raise ValueError("Недостаточно собственных мощностей для нагрузок с ПДн/КИИ")
+
+    chosen, best_gain, upper_gain, nodes = _knapsack(gains, weights, tuple(rem),
+                                                     node_limit)
+    for j in chosen:
+        idx, own_option = flexible[j]
+        choice[idx] = own_option
+
+    placements = [
+        WorkloadPlacement(workload=name, placement=place, vcpus=v,
+                          monthly_cost_rub=cost)
+        for name, v, (place, cost) in zip(names, vcpus, choice)
+    ]
+    objective = sum(p.monthly_cost_rub for p in placements)
+    gap = upper_gain - best_gain
+    return PlacementResult(
+        placements=placements,
+        objective_monthly_rub=objective,
+        lower_bound_monthly_rub=objective - gap,
+        proven_optimal=gap <= _EPS,
+        nodes_explored=nodes,
+    )
+
+
+@traced("calculate_optimal")
+def calculate_optimal(infra: Union[InfraSpec, CompiledInfra], pricing: PricingContext,
+                      as_is: Optional[ScenarioCost] = None,
+                      placement: Optional[PlacementResult] = None) -> ScenarioCost:
+    c = compile_infra(infra)
+    if as_is is None:
+        as_is = calculate_as_is(c, pricing)
+    if placement is None:
+        placement = solve_placement(c, pricing, as_is)
+
+    total_vcpus = int(c.workload_vcpus.sum())
+    on_prem_vcpus = sum(p.vcpus for p in placement.placements if p.placement == ON_PREM)
+    colo_vcpus = sum(p.vcpus for p in placement.placements if p.placement == COLOCATION)
+    on_prem_share = on_prem_vcpus / total_vcpus if total_vcpus else 1.0
+    own_share = (on_prem_vcpus + colo_vcpus) / total_vcpus if total_vcpus else 1.0
+
+    # Kopecks, rounded per placement (see calculator.money)
+    details = scenario_kopecks(as_is)
+    cloud_kop = sum(kopecks(p.monthly_cost_rub) for p in placement.placements
+                    if p.placement.startswith(CLOUD_PREFIX))
+    # Rent of the new racks is what remains of the colocation placements after
+    # amortization
+    amort = as_is.details["hardware_amortization"]
+    amort_rate = amort / total_vcpus if total_vcpus else 0.0
+    colo_rent_kop = sum(kopecks(p.monthly_cost_rub - amort_rate * p.vcpus)
+                        for p in placement.placements if p.placement == COLOCATION)
+    details["hardware_amortization"] = int(
+        scale_kopecks(details["hardware_amortization"], own_share)
+    )
+    details["electricity"] = int(scale_kopecks(details["electricity"], on_prem_share))
+    details["colocation"] = (int(scale_kopecks(details["colocation"], on_prem_share))
+                             + colo_rent_kop)
+    details["cloud"] += cloud_kop
+    return scenario_from_kopecks("optimal", details)
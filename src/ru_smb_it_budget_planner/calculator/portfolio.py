@@ -0,0 +1,216 @@
+"""
+Portfolio roll-up: group-by analytics over many clients' scenario results.
+
+PortfolioAccumulator receives results chunk by chunk as arrays (yearly cost
+per client and scenario) and keeps only what the summary needs:
+- one group id per client, assigned through a dict keyed by the group values
+  (region, industry, size_class; regions are compared normalized, see
+  models.regions.normalize_region, and shown in their first spelling);
+- the yearly cost columns as int64 kopecks (see calculator.money), 8 bytes
+  per client and scenario;
+- a bounded heap with the top_k clients by savings (best scenario per
+  client, clients without any saving are left out).
+
+summary() reduces the columns per group with NumPy: exact integer sums (the
+same totals whatever the chunking or the order of the clients), counts with
+bincount, percentiles (linear interpolation, like numpy.percentile) from one
+lexsort by (group, value). Savings of a scenario are the as_is yearly cost
+minus the scenario's yearly cost, so positive values are savings.
+"""
+import heapq
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from ru_smb_it_budget_planner.models.infra_model import CompanyProfile
+from ru_smb_it_budget_planner.models.regions import normalize_region
+from ru_smb_it_budget_planner.calculator.money import group_sum, to_kopecks, to_rub
+
+GROUP_FIELDS = ("region", "industry", "size_class")
+DEFAULT_PERCENTILES = (50.0, 90.0)
+DEFAULT_TOP_K = 10
+MAX_ERRORS_KEPT = 100
+
+
+@dataclass
+class ClientSavings:
+    client: str
+    scenario: str
+    as_is_yearly_rub: float
+    savings_yearly_rub: float
+
+    @property
+    def savings_pct(self) -> float:
+        if not self.as_is_yearly_rub:
+            return 0.0
+        return self.savings_yearly_rub / self.as_is_yearly_rub * 100
+
+
+@dataclass
+class PortfolioSummary:
+    group_by: Tuple[str, ...]
+    scenario_names: Tuple[str, ...]
+    percentiles: Tuple[float, ...]
+    groups: List[Tuple[str, ...]]  # Group values in order of first appearance
+    clients: np.ndarray            # (groups,)
+    cost_sum: np.ndarray           # (groups, scenarios), RUB per year
+    cost_mean: np.ndarray
+    cost_percentiles: np.ndarray   # (groups, scenarios, percentiles)
+    savings_sum: np.ndarray
+    savings_mean: np.ndarray
+    savings_percentiles: np.ndarray
+    top_clients: List[ClientSavings]
+    processed: int = 0
+    failed: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def rows(self) -> Iterator[Tuple]:
+        """
+        (group values..., scenario, clients, cost sum, mean, percentiles...,
+        savings sum, mean, percentiles...)
+        """
+        for g, key in enumerate(self.groups):
+            for s, name in enumerate(self.scenario_names):
+                yield (*key, name, int(self.clients[g]),
+                       float(self.cost_sum[g, s]), float(self.cost_mean[g, s]),
+                       *self.cost_percentiles[g, s].tolist(),
+                       float(self.savings_sum[g, s]), float(self.savings_mean[g, s]),
+                       *self.savings_percentiles[g, s].tolist())
+
+
+def group_percentiles(groups: np.ndarray, values: np.ndarray, n_groups: int,
+                      percentiles: Sequence[float]) -> np.ndarray:
+    """
+    Percentiles of values within every group, shape (n_groups,
+    len(percentiles)); NaN for empty groups.
+    """
+    out = np.full((n_groups, len(percentiles)), np.nan)
+    if values.size == 0:
+        return out
+    ordered = values[np.lexsort((values, groups))]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    present = counts > 0
+    for j, q in enumerate(percentiles):
+        pos = starts[present] + (counts[present] - 1) * (q / 100.0)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, starts[present] + counts[present] - 1)
+        frac = pos - lo
+        out[present, j] = ordered[lo] + (ordered[hi] - ordered[lo]) * frac
+    return out
+
+
+class PortfolioAccumulator:
+    def __init__(self, scenario_names: Sequence[str],
+                 group_by: Sequence[str] = ("region",), top_k: int = DEFAULT_TOP_K):
+        unknown = [g for g in group_by if g not in GROUP_FIELDS]
+        if unknown:
+            raise ValueError(f"Неизвестное поле группировки: {', '.join(unknown)} "
+                             f"(доступны: {', '.join(GROUP_FIELDS)})")
+        if "as_is" not in scenario_names:
+            raise ValueError("Для расчета экономии нужен сценарий as_is")
+        self.scenario_names = tuple(scenario_names)
+        self.group_by = tuple(group_by)
+        self.top_k = top_k
+        self._as_is = self.scenario_names.index("as_is")
+        self._group_ids: Dict[Tuple[str, ...], int] = {}
+        self._groups: List[Tuple[str, ...]] = []
+        self._group_chunks: List[np.ndarray] = []
+        self._yearly_chunks: List[np.ndarray] = []
+        # Min-heap of (savings, -sequence, client, scenario index, as_is cost)
+        self._top: List[Tuple[float, int, str, int, float]] = []
+        self._seen = 0
+        self.failed = 0
+        self.errors: List[str] = []
+
+    def _group_id(self, company: CompanyProfile) -> int:
+        key = tuple(normalize_region(company.region) if f == "region"
+                    else getattr(company, f) for f in self.group_by)
+        gid = self._group_ids.get(key)
+        if gid is None:
+            gid = self._group_ids[key] = len(self._groups)
+            self._groups.append(tuple(getattr(company, f) for f in self.group_by))
+        return gid
+
+    def add(self, clients: Sequence[str], companies: Sequence[CompanyProfile],
+            yearly: np.ndarray) -> None:
+        """
+        yearly: total_yearly_rub per client (rows) and scenario (columns, in
+        scenario_names order).
+        """
+        yearly = to_kopecks(yearly).reshape(len(clients), len(self.scenario_names))
+        self._group_chunks.append(np.fromiter((self._group_id(c) for c in companies),
+                                              dtype=np.int64, count=len(companies)))
+        self._yearly_chunks.append(yearly)
+        self._push_top(clients, yearly)
+        self._seen += len(clients)
+
+    def add_error(self, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_ERRORS_KEPT:
+            self.errors.append(message)
+
+    def _push_top(self, clients: Sequence[str], yearly: np.ndarray) -> None:
+        if self.top_k <= 0 or not len(clients):
+            return
+        savings = to_rub(yearly[:, [self._as_is]] - yearly)
+        savings[:, self._as_is] = -np.inf  # Staying as is is not a saving
+        best = savings.argmax(axis=1)
+        best_savings = savings[np.arange(len(clients)), best]
+        candidates = np.arange(len(clients))
+        if len(clients) > self.top_k:
+            candidates = np.argpartition(-best_savings, self.top_k - 1)[:self.top_k]
+        for i in candidates.tolist():
+            if not best_savings[i] > 0:
+                continue
+            entry = (float(best_savings[i]), -(self._seen + i), clients[i],
+                     int(best[i]), to_rub(int(yearly[i, self._as_is])))
+            if len(self._top) < self.top_k:
+                heapq.heappush(self._top, entry)
+            elif entry > self._top[0]:
+                heapq.heapreplace(self._top, entry)
+
+    def summary(self,
+                percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> PortfolioSummary:
+        n_groups, n_scen = len(self._groups), len(self.scenario_names)
+        groups = (np.concatenate(self._group_chunks) if self._group_chunks
+                  else np.zeros(0, dtype=np.int64))
+        yearly = (np.concatenate(self._yearly_chunks) if self._yearly_chunks
+                  else np.zeros((0, n_scen), dtype=np.int64))
+        savings = yearly[:, [self._as_is]] - yearly
+
+        clients = np.bincount(groups, minlength=n_groups)
+        shape = (n_groups, n_scen)
+        cost_sum, savings_sum = np.zeros(shape), np.zeros(shape)
+        cost_pct = np.zeros(shape + (len(percentiles),))
+        savings_pct = np.zeros(shape + (len(percentiles),))
+        for s in range(n_scen):
+            cost_sum[:, s] = to_rub(group_sum(groups, yearly[:, s], n_groups))
+            savings_sum[:, s] = to_rub(group_sum(groups, savings[:, s], n_groups))
+            cost_pct[:, s] = group_percentiles(groups, to_rub(yearly[:, s]), n_groups,
+                                               percentiles)
+            savings_pct[:, s] = group_percentiles(groups, to_rub(savings[:, s]),
+                                                  n_groups, percentiles)
+        denominator = np.maximum(clients, 1)[:, None]
+
+        top = sorted(self._top, reverse=True)
+        return PortfolioSummary(
+            group_by=self.group_by,
+            scenario_names=self.scenario_names,
+            percentiles=tuple(percentiles),
+            groups=list(self._groups),
+            clients=clients,
+            cost_sum=cost_sum,
+            cost_mean=cost_sum / denominator,
+            cost_percentiles=cost_pct,
+            savings_sum=savings_sum,
+            savings_mean=savings_sum / denominator,
+            savings_percentiles=savings_pct,
+            top_clients=[ClientSavings(client=client, scenario=self.scenario_names[s],
+                                       as_is_yearly_rub=as_is, savings_yearly_rub=saved)
+                         for saved, _, client, s, as_is in top],
+            processed=self._seen + self.failed,
+            failed=self.failed,
+            errors=list(self.errors),
+        )
@@ -0,0 +1,35 @@
+"""
+Loading a PricingContext from pricing.yaml or a compiled catalog.
+
+Kept next to the calculators so that dsl.parser, which the cheap commands
+(validate) use, does not depend on them.
+"""
+from datetime import date
+from typing import Optional
+
+from ru_smb_it_budget_planner.models.pricing_model import (
+    ElectricityTariff, ColocationTariff, CloudProfile
+)
+from ru_smb_it_budget_planner.calculator.scenario_builder import PricingContext
+from ru_smb_it_budget_planner.dsl.parser import load_yaml
+from ru_smb_it_budget_planner.dsl.catalog import is_catalog, open_catalog
+from ru_smb_it_budget_planner.tracing import traced
+
+
+@traced("load_pricing_context")
+def load_pricing_context(file_path: str,
+                         as_of: Optional[date] = None) -> PricingContext:
+    """
+    Loads pricing.yaml or a catalog compiled with compile-pricing; as_of fixes
+    the prices to a date.
+    """
+    if is_catalog(file_path):
+        pricing = open_catalog(file_path)
+    else:
+        data = load_yaml(file_path)
+        pricing = PricingContext(
+            electricity=[ElectricityTariff(**t) for t in data.get('electricity', [])],
+            colocation=[ColocationTariff(**t) for t in data.get('colocation', [])],
+            cloud_profiles=[CloudProfile(**t) for t in data.get('cloud_profiles', [])]
+        )
+    return pricing if as_of is None else pricing.at(as_of)
@@ -0,0 +1,193 @@
+"""
+Multi-year monthly cost projection with NPV.
+
+Each scenario is expanded from its steady-state month into a month-by-month
+matrix over the horizon:
+- hardware follows real amortization schedules: every server is amortized over
+  the HardwareProfile lifetime (ProjectionParams.lifetime_years otherwise) from the
+  month it was bought, and is renewed at the end of its life at the same price
+  (or at the price of ProjectionParams.hardware). In "cash" mode the
+  purchase price of each renewal is paid in its month instead;
+- electricity, colocation, cloud and licenses grow with yearly indexation;
+- migration scenarios ramp from as_is to the target linearly over
+  migration_months;
+- NPV discounts each month at the end of the month;
+- with a start_date, every month is priced at the tariff versions in force on
+  its first day (the first month on start_date itself, see
+  PricingContext.at): scenarios are evaluated once per period between version
+  changes and indexation applies on top.
+
+The result is stored as one contiguous array of shape
+(companies, scenarios, categories, months); all months are computed at once
+with broadcasting.
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Literal, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+from ru_smb_it_budget_planner.models.infra_model import InfraSpec
+from ru_smb_it_budget_planner.models.compiled import CompiledInfra, compile_infra
+from ru_smb_it_budget_planner.models.pricing_model import HardwareProfile
+from ru_smb_it_budget_planner.calculator.scenario_builder import PricingContext
+from ru_smb_it_budget_planner.calculator.pipeline import ScenarioRun, DEFAULT_SCENARIOS
+from ru_smb_it_budget_planner.tracing import traced
+
+CATEGORIES = ("hardware_amortization", "electricity", "colocation", "cloud", "licenses")
+DEFAULT_LIFETIME_YEARS = 5  # Lifetime of a replacement server
+
+
+class ProjectionParams(BaseModel):
+    horizon_months: int = 60
+    discount_rate_yearly: float = 0.0
+    # Yearly price growth per category, e.g. {"electricity": 0.1}
+    indexation_yearly: Dict[str, float] = {}
+    migration_months: int = 0
+    lifetime_years: int = DEFAULT_LIFETIME_YEARS
+    # Replacement hardware; its lifetime and price override lifetime_years and the
+    # server's capex
+    hardware: Optional[HardwareProfile] = None
+    capex_mode: Literal["amortized", "cash"] = "amortized"
+    # Calendar start of the projection; None prices every month like the pricing context
+    start_date: Optional[date] = None
+
+
+@dataclass
+class Projection:
+    company_names: List[str]
+    scenario_names: List[str]
+    params: ProjectionParams
+    costs: np.ndarray  # (companies, scenarios, categories, months)
+
+    @property
+    def monthly_totals(self) -> np.ndarray:
+        """(companies, scenarios, months)"""
+        return np.asarray(self.costs.sum(axis=2))
+
+    def yearly_totals(self) -> np.ndarray:
+        """(companies, scenarios, years); a partial last year is summed as is."""
+        months = self.costs.shape[-1]
+        years = -(-months // 12)
+        padded = np.zeros(self.monthly_totals.shape[:2] + (years * 12,))
+        padded[..., :months] = self.monthly_totals
+        return np.asarray(padded.reshape(padded.shape[:2] + (years, 12)).sum(axis=-1))
+
+    def discount_factors(self) -> np.ndarray:
+        months = np.arange(1, self.costs.shape[-1] + 1)
+        return np.asarray((1.0 + self.params.discount_rate_yearly) ** (-months / 12.0))
+
+    def npv(self) -> np.ndarray:
+        """(companies, scenarios)"""
+        return np.asarray(self.monthly_totals @ self.discount_factors())
+
+
+def _hardware_schedule(owner: np.ndarray, capex: np.ndarray, age_years: np.ndarray,
+                       n_companies: int, params: ProjectionParams) -> np.ndarray:
+    """Hardware cost per company and month, shape (companies, months)."""
+    lifetime_months = 12 * (
+        params.hardware.lifetime_years if params.hardware else params.lifetime_years
+    )
+    months = np.arange(params.horizon_months)
+    out = np.zeros((n_companies, params.horizon_months))
+    if owner.size == 0 or lifetime_months <= 0:
+        return out
+
+    age = age_years[:, None] * 12 + months[None, :]  # (servers, months)
+    renewal_capex = capex
+    if params.hardware is not None:
+        renewal_capex = np.full_like(capex, params.hardware.capex_rub)
+    in_first_life = age < lifetime_months
+    if params.capex_mode == "cash":
+        # Existing servers are sunk; every renewal is paid in the month it happens
+        renewal_month = (age >= lifetime_months) & (age % lifetime_months == 0)
+        per_server = np.where(renewal_month, renewal_capex[:, None], 0.0)
+    else:
+        per_server = np.where(in_first_life, capex[:, None], renewal_capex[:, None])
+        per_server = per_server / lifetime_months
+    np.add.at(out, owner, per_server)
+    return out
+
+
+def _month_starts(start: date, months: int) -> List[date]:
+    """start, then the first day of each following month."""
+    first = start.year * 12 + start.month - 1
+    return [start] + [date((first + m) // 12, (first + m) % 12 + 1, 1)
+                      for m in range(1, months)]
+
+
+def _price_periods(
+    pricing: PricingContext, params: ProjectionParams
+) -> Tuple[List[PricingContext], np.ndarray]:
+    """
+    Pricing per period between tariff version changes and the period of every
+    month.
+    """
+    if params.start_date is None or params.horizon_months <= 0:
+        return [pricing], np.zeros(params.horizon_months, dtype=np.int64)
+    starts = _month_starts(params.start_date, params.horizon_months)
+    changes = pricing.price_changes(params.start_date, starts[-1])
+    dates = [params.start_date] + changes
+    periods = np.searchsorted(np.array(dates, dtype="M8[D]"),
+                              np.array(starts, dtype="M8[D]"), side="right") - 1
+    return [pricing.at(d) for d in dates], periods
+
+
+@traced("project")
+def project(infras: Sequence[Union[InfraSpec, CompiledInfra]], pricing: PricingContext,
+            params: Optional[ProjectionParams] = None,
+            scenario_names: Iterable[str] = DEFAULT_SCENARIOS) -> Projection:
+    params = params or ProjectionParams()
+    names = list(scenario_names)
+    n, s, k, h = len(infras), len(names), len(CATEGORIES), params.horizon_months
+
+    # Steady-state monthly values per company, scenario, category and price period
+    period_pricing, period = _price_periods(pricing, params)
+    p = len(period_pricing)
+    steady = np.zeros((n, s, k, p))
+    as_is = np.zeros((n, k, p))
+    compiled = [compile_infra(infra) for infra in infras]
+    for i, prices in enumerate(period_pricing):
+        for c, infra in enumerate(infras):
+            run = ScenarioRun(infra, prices, compiled[c])
+            base = run.scenario("as_is")
+            as_is[c, :, i] = [base.details.get(cat, 0.0) for cat in CATEGORIES]
+            for j, scenario in enumerate(run.scenarios(names)):
+                steady[c, j, :, i] = [scenario.details.get(cat, 0.0)
+                                      for cat in CATEGORIES]
+    # Values in force in every month
+    steady, as_is = steady[..., period], as_is[..., period]
+    owner = np.repeat(np.arange(n), [spec.server_capex.size for spec in compiled])
+    capex = np.concatenate([np.zeros(0)] + [spec.server_capex for spec in compiled])
+    age = np.concatenate([np.zeros(0, dtype=np.int64)]
+                         + [spec.server_age for spec in compiled])
+
+    months = np.arange(h)
+    if params.migration_months > 0:
+        ramp = np.minimum(1.0, (months + 1) / params.migration_months)
+    else:
+        ramp = np.ones(h)
+    index = np.stack([
+        (1.0 + params.indexation_yearly.get(cat, 0.0)) ** (months / 12.0)
+        for cat in CATEGORIES
+    ])  # (categories, months)
+
+    # Blend from as_is to the scenario's steady state along the ramp
+    blended = as_is[:, None] + ramp[None, None, None, :] * (steady - as_is[:, None])
+    costs = blended * index[None, None]
+
+    # Hardware: real schedule scaled by the share of hardware the scenario keeps
+    schedule = _hardware_schedule(owner, capex, age, n, params)
+    base_hw = np.broadcast_to(as_is[:, None, 0], (n, s, h))
+    keep = np.ones((n, s, h))
+    np.divide(steady[:, :, 0], base_hw, out=keep, where=base_hw != 0)
+    share = 1.0 - ramp[None, None, :] * (1.0 - keep)
+    costs[:, :, 0, :] = schedule[:, None, :] * share
+
+    return Projection(
+        company_names=[spec.company.name for spec in compiled],
+        scenario_names=names,
+        params=params,
+        costs=np.ascontiguousarray(costs),
+    )
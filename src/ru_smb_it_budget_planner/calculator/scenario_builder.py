@@ -1,9 +1,39 @@
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
-from ru_smb_it_budget_planner.models.infra_model import InfraSpec, Workload, OnPremServer, ColocationUnit
+from bisect import bisect_right
+from datetime import date
+from types import MappingProxyType
+from typing import (
+    List, Dict, Any, Optional, Mapping, Callable, NamedTuple, Sequence, Tuple, Union,
+    cast,
+)
+import numpy as np
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+from ru_smb_it_budget_planner.models.infra_model import InfraSpec, Workload
+from ru_smb_it_budget_planner.models.compiled import CompiledInfra, compile_infra
 from ru_smb_it_budget_planner.models.pricing_model import ElectricityTariff, ColocationTariff, CloudProfile
-from ru_smb_it_budget_planner.calculator.on_prem_calc import calculate_server_total_cost, calculate_colo_cost
-from ru_smb_it_budget_planner.calculator.cloud_calc import calculate_workload_cloud_cost
+from ru_smb_it_budget_planner.models.regions import (
+    normalize_region, normalize_code, federal_district, NATIONAL_DEFAULT
+)
+from ru_smb_it_budget_planner.calculator.cloud_calc import (
+    calculate_workload_cloud_cost, HOURS_PER_MONTH, WORKLOAD_EGRESS_GB
+)
+from ru_smb_it_budget_planner.calculator.energy_calc import calculate_monthly_kwh
+from ru_smb_it_budget_planner.calculator.on_prem_calc import server_monthly_amortization
+from ru_smb_it_budget_planner.calculator.money import (
+    kopecks, to_kopecks, scale_kopecks, to_rub, total
+)
+from ru_smb_it_budget_planner.tracing import traced, count
+
+DEFAULT_TARGET_PROFILE = "ru_cloud_gp"
+
+# CloudProfile rates in the column order used by the vectorized calculators
+CLOUD_PRICE_FIELDS = ("vCPU_price_rub_per_hour", "ram_price_rub_per_gb_hour",
+                      "storage_price_rub_per_gb_month", "egress_price_rub_per_gb")
+
+# Keys of ScenarioCost.details
+COST_CATEGORIES = ("hardware_amortization", "electricity", "colocation", "cloud",
+                   "licenses")
+# Categories scaled down with the share of workloads leaving own hardware
+ON_PREM_CATEGORIES = ("hardware_amortization", "electricity", "colocation")
 
 class ScenarioCost(BaseModel):
     scenario_name: str
@@ -14,211 +44,395 @@ class ScenarioCost(BaseModel):
     details: Dict[str, float] # Breakdown by category
 
 class PricingContext(BaseModel):
+    """
+    Pricing catalog with hash indexes built once at construction.
+
+    Region lookups are normalized (see models.regions.normalize_region) and fall
+    back from region to federal district to the national default ("Россия" / "*").
+    The context is frozen so the indexes cannot go stale. Lists may also be
+    lazy catalog tables (see dsl.catalog) that carry a prebuilt key_index.
+
+    Tariffs and profiles are versioned by valid_from: every key maps to its
+    versions sorted by start date, and a lookup bisects them for the version in
+    force on as_of (today when no date is given, so versions scheduled for a
+    later date do not apply before they start). A date before the
+    first version of a key counts as missing at that level, so the lookup falls
+    back as above. Rows with the same normalized key and start date (say
+    "Moscow" and "Москва") are not an error: the first one listed is used.
+    at() returns a view fixed to one date that shares the indexes, so
+    calculators need no date argument.
+    """
+    model_config = ConfigDict(frozen=True)
+
     electricity: List[ElectricityTariff]
     colocation: List[ColocationTariff]
     cloud_profiles: List[CloudProfile]
 
-    def get_electricity_tariff(self, region: str) -> Optional[ElectricityTariff]:
-        for t in self.electricity:
-            if t.region == region:
-                return t
-        return None
+    # One private attribute: every access to one goes through BaseModel.__getattr__
+    _indexes: "PricingIndexes" = PrivateAttr()
 
-    def get_colocation_tariff(self, region: str) -> Optional[ColocationTariff]:
-        for t in self.colocation:
-            if t.region == region:
-                return t
-        return None
+    def model_post_init(self, __context: Any) -> None:
+        self._indexes = PricingIndexes(
+            electricity=_build_index(self.electricity, "region", normalize_region),
+            colocation=_build_index(self.colocation, "region", normalize_region),
+            cloud_profiles=_build_index(self.cloud_profiles, "code", normalize_code),
+            as_of=None,
+        )
+
+    def model_copy(self, *, update: Optional[Mapping[str, Any]] = None,
+                   deep: bool = False) -> "PricingContext":
+        copy = super().model_copy(update=update, deep=deep)
+        copy.model_post_init(None)  # Rebuild indexes for the updated lists
+        copy._indexes = copy._indexes._replace(as_of=self.as_of)
+        return copy
+
+    def __getstate__(self) -> Dict[Any, Any]:
+        # Indexes are read-only proxies; they are rebuilt on unpickling
+        return {**super().__getstate__(), "__pydantic_private__": {"as_of": self.as_of}}
+
+    def __setstate__(self, state: Dict[Any, Any]) -> None:
+        as_of = (state.get("__pydantic_private__") or {}).get("as_of")
+        super().__setstate__({**state, "__pydantic_private__": {}})
+        self.model_post_init(None)
+        self._indexes = self._indexes._replace(as_of=as_of)
+
+    @property
+    def as_of(self) -> Optional[date]:
+        return self._indexes.as_of
+
+    def at(self, as_of: Optional[date]) -> "PricingContext":
+        """
+        The same catalog with lookups fixed to the prices in force on as_of
+        (None: today).
+        """
+        view = super().model_copy()
+        # The index mappings are shared
+        view._indexes = self._indexes._replace(as_of=as_of)
+        return view
+
+    def price_changes(self, after: date, until: date) -> List[date]:
+        """Sorted start dates of versions taking effect in (after, until]."""
+        changes = set()
+        for index in self._indexes[:3]:
+            for series in index.values():
+                lo = bisect_right(series.starts, after)
+                hi = bisect_right(series.starts, until)
+                changes.update(series.starts[lo:hi])
+        return sorted(changes)
+
+    def get_electricity_tariff(
+        self, region: str, as_of: Optional[date] = None
+    ) -> Optional[ElectricityTariff]:
+        indexes = self._indexes
+        pos = _lookup_region(indexes.electricity, region, as_of or indexes.as_of)
+        _count_lookup(pos)
+        return None if pos is None else self.electricity[pos]
+
+    def get_colocation_tariff(
+        self, region: str, as_of: Optional[date] = None
+    ) -> Optional[ColocationTariff]:
+        indexes = self._indexes
+        pos = _lookup_region(indexes.colocation, region, as_of or indexes.as_of)
+        _count_lookup(pos)
+        return None if pos is None else self.colocation[pos]
+
+    def get_cloud_profile(self, code: str,
+                          as_of: Optional[date] = None) -> Optional[CloudProfile]:
+        indexes = self._indexes
+        pos = _version(indexes.cloud_profiles.get(normalize_code(code)),
+                       as_of or indexes.as_of)
+        _count_lookup(pos)
+        return None if pos is None else self.cloud_profiles[pos]
 
-    def get_cloud_profile(self, code: str) -> Optional[CloudProfile]:
-        for p in self.cloud_profiles:
-            if p.code == code:
-                return p
+    def missing_keys(self, infra: Union[InfraSpec, CompiledInfra]) -> List[str]:
+        """Human-readable tariffs/profiles the spec needs but the catalog lacks."""
+        c = compile_infra(infra)
+        missing = [f"тариф электроэнергии для региона '{region}'"
+                   for region in c.server_region_names
+                   if self.get_electricity_tariff(region) is None]
+        missing += [f"тариф колокации для региона '{region}'"
+                    for region in c.colo_region_names
+                    if self.get_colocation_tariff(region) is None]
+        missing += [f"облачный профиль '{code}'" for code in c.cloud_profile_names
+                    if self.get_cloud_profile(code) is None]
+        if missing and self.as_of is not None:
+            missing = [f"{m} на {self.as_of.isoformat()}" for m in missing]
+        return missing
+
+    def require_coverage(self, infra: Union[InfraSpec, CompiledInfra]) -> None:
+        missing = self.missing_keys(infra)
+        if missing:
+            raise ValueError(
+                "В ценах отсутствуют данные:\n" + "\n".join(f"- {m}" for m in missing)
+            )
+
+
+class TariffSeries(NamedTuple):
+    """Versions of one key: ascending start dates and the matching row positions."""
+    starts: List[date]
+    positions: List[int]
+
+
+class PricingIndexes(NamedTuple):
+    electricity: Mapping[str, TariffSeries]
+    colocation: Mapping[str, TariffSeries]
+    cloud_profiles: Mapping[str, TariffSeries]
+    as_of: Optional[date]  # Date lookups default to; None: today
+
+
+def _build_index(rows: Sequence[Any], field: str,
+                 normalize: Callable[[str], str]) -> Mapping[str, TariffSeries]:
+    # Catalog tables index their file without building rows
+    key_index = getattr(rows, "key_index", None)
+    if key_index is not None:
+        return cast(Mapping[str, TariffSeries], key_index)
+    versions: Dict[str, List[Tuple[date, int]]] = {}
+    for pos, row in enumerate(rows):
+        key = normalize(getattr(row, field))
+        versions.setdefault(key, []).append((row.valid_from or date.min, pos))
+
+    index: Dict[str, TariffSeries] = {}
+    for key, series in versions.items():
+        series.sort()
+        starts: List[date] = []
+        positions: List[int] = []
+        for start, pos in series:
+            if not starts or start != starts[-1]:  # The first listed row wins
+                starts.append(start)
+                positions.append(pos)
+        index[key] = TariffSeries(starts, positions)
+    return MappingProxyType(index)
+
+
+def _count_lookup(pos: Optional[int]) -> None:
+    count("tariff_lookups")
+    if pos is None:
+        count("tariff_misses")
+
+
+def _version(series: Optional[TariffSeries], as_of: Optional[date]) -> Optional[int]:
+    """Position of the version in force on as_of (today for None)."""
+    if series is None:
         return None
+    if as_of is None:
+        if series.starts[-1] == date.min:  # A single undated version, the usual case
+            return series.positions[-1]
+        as_of = date.today()
+    i = bisect_right(series.starts, as_of)
+    return series.positions[i - 1] if i else None
 
-def calculate_as_is(infra: InfraSpec, pricing: PricingContext) -> ScenarioCost:
-    total_monthly = 0.0
-    capex_amortized = 0.0
-    opex = 0.0
-    details = {
-        "hardware_amortization": 0.0,
-        "electricity": 0.0,
-        "colocation": 0.0,
-        "cloud": 0.0,
-        "licenses": 0.0
-    }
 
-    # On-prem servers
-    for server in infra.current_deployment.on_prem_servers:
-        tariff = pricing.get_electricity_tariff(server.region)
-        if not tariff:
-            # Fallback or error? For now fallback to 0 cost or default
-            # In real app, should raise warning
-            continue
-            
-        # We need to split amortization and energy for details
-        # Re-implementing breakdown here for clarity
-        # Amortization
-        amort = server.capex_rub / ((server.age_years + 3) * 12.0) # Simplified lifetime
-        details["hardware_amortization"] += amort
-        capex_amortized += amort
-        
-        # Energy
-        kwh = (server.power_watts / 1000.0) * 730
-        energy = kwh * tariff.tariff_rub_per_kwh
-        details["electricity"] += energy
-        opex += energy
+def _lookup_region(index: Mapping[str, TariffSeries], region: str,
+                   as_of: Optional[date]) -> Optional[int]:
+    key = normalize_region(region)
+    pos = _version(index.get(key), as_of)
+    if pos is None:
+        district = federal_district(key)
+        if district is not None:
+            pos = _version(index.get(district), as_of)
+    if pos is None:
+        pos = _version(index.get(NATIONAL_DEFAULT), as_of)
+    return pos
+
+def _prices(names: Sequence[str], lookup: Callable[[str], Any],
+            fields: Sequence[str]) -> np.ndarray:
+    """
+    Price columns for interned names, shape (len(names), len(fields)); NaN if
+    missing.
+    """
+    out = np.full((len(names), len(fields)), np.nan)
+    for i, name in enumerate(names):
+        row = lookup(name)
+        if row is not None:
+            out[i] = [getattr(row, f) for f in fields]
+    return out
+
+
+def workload_cloud_costs(compiled: CompiledInfra, profile: CloudProfile) -> np.ndarray:
+    """calculate_workload_cloud_cost for every workload."""
+    hourly = (compiled.workload_vcpus * profile.vCPU_price_rub_per_hour
+              + compiled.workload_ram * profile.ram_price_rub_per_gb_hour)
+    compute = hourly * HOURS_PER_MONTH
+    storage = compiled.workload_storage * profile.storage_price_rub_per_gb_month
+    return compute + storage + WORKLOAD_EGRESS_GB * profile.egress_price_rub_per_gb
+
+
+def as_is_item_costs(c: CompiledInfra,
+                     pricing: PricingContext) -> Dict[str, np.ndarray]:
+    """
+    Monthly cost of every current item, keyed by category: per server for
+    hardware_amortization and electricity, per colocation unit, per cloud
+    usage row and per license.
+    """
+    # On-prem servers: amortization over a simplified lifetime, energy at the
+    # regional tariff
+    tariffs = _prices(c.server_region_names, pricing.get_electricity_tariff,
+                      ("tariff_rub_per_kwh",))[:, 0]
+    amortization = server_monthly_amortization(c.server_capex, c.server_age)
+    energy = calculate_monthly_kwh(c.server_power) * tariffs[c.server_region]
 
     # Colocation
-    for unit in infra.current_deployment.colocation_units:
-        tariff = pricing.get_colocation_tariff(unit.dc_region)
-        if tariff:
-            cost = unit.units * tariff.price_rub_per_u_per_month
-            details["colocation"] += cost
-            opex += cost
+    rents = _prices(c.colo_region_names, pricing.get_colocation_tariff,
+                    ("price_rub_per_u_per_month",))[:, 0]
+    colocation = c.colo_units * rents[c.colo_region]
 
     # Cloud
-    for usage in infra.current_deployment.cloud_usage:
-        profile = pricing.get_cloud_profile(usage.provider_profile)
-        if profile:
-            # Re-calc based on usage
-            cost = (usage.vcpus * profile.vCPU_price_rub_per_hour + 
-                    usage.ram_gb * profile.ram_price_rub_per_gb_hour) * 730 + \
-                   usage.storage_gb * profile.storage_price_rub_per_gb_month + \
-                   usage.egress_gb * profile.egress_price_rub_per_gb
-            details["cloud"] += cost
-            opex += cost
+    rates = _prices(c.cloud_profile_names, pricing.get_cloud_profile,
+                    CLOUD_PRICE_FIELDS)[c.cloud_profile]
+    cloud = ((c.cloud_vcpus * rates[:, 0] + c.cloud_ram * rates[:, 1]) * HOURS_PER_MONTH
+             + c.cloud_storage * rates[:, 2] + c.cloud_egress * rates[:, 3])
 
     # Licenses
-    for lic in infra.licenses:
-        monthly = lic.cost_rub_per_year / 12.0
-        details["licenses"] += monthly
-        opex += monthly
+    licenses = c.license_cost / 12.0
+
+    return {
+        "hardware_amortization": amortization,
+        "electricity": energy,
+        "colocation": colocation,
+        "cloud": cloud,
+        "licenses": licenses,
+    }
 
-    total_monthly = capex_amortized + opex
-    
+def scenario_from_kopecks(scenario_name: str,
+                          details: Mapping[str, int]) -> ScenarioCost:
+    """
+    Builds a ScenarioCost from monthly category totals in kopecks (see
+    calculator.money).
+    """
+    capex = details["hardware_amortization"]
+    opex = (details["electricity"] + details["colocation"] + details["cloud"]
+            + details["licenses"])
+    monthly = capex + opex
     return ScenarioCost(
-        scenario_name="as_is",
-        total_monthly_rub=total_monthly,
-        total_yearly_rub=total_monthly * 12,
-        capex_yearly_amortized=capex_amortized * 12,
-        opex_monthly=opex,
-        details=details
+        scenario_name=scenario_name,
+        total_monthly_rub=to_rub(monthly),
+        total_yearly_rub=to_rub(monthly * 12),
+        capex_yearly_amortized=to_rub(capex * 12),
+        opex_monthly=to_rub(opex),
+        details={cat: to_rub(details[cat]) for cat in COST_CATEGORIES},
     )
 
-def calculate_minimal_cloud(infra: InfraSpec, pricing: PricingContext) -> ScenarioCost:
-    # Logic: Move stateless web to cloud.
-    # We need to simulate the new state.
-    # For simplicity, we'll iterate workloads and assign costs.
-    # But wait, "as_is" was based on "current_deployment".
-    # "minimal_cloud" should be based on "workloads".
-    # If we only have "current_deployment", we don't know which server runs which workload unless we map them.
-    # The prompt says: "workloads" list exists.
-    # And "current_deployment" describes hardware.
-    # This implies a gap: we need to map workloads to hardware to know what we can remove if we move to cloud.
-    # OR, we assume "as_is" cost is fixed by hardware, and "cloud" cost is calculated from workloads.
-    # If we move a workload to cloud, can we decommission a server?
-    # That's hard to know without mapping.
-    # 
-    # Simplified approach for this tool:
-    # 1. Calculate "As Is" based on hardware (as done above).
-    # 2. Calculate "Cloud" cost for moved workloads.
-    # 3. Estimate savings:
-    #    If we move X% of vCPU/RAM to cloud, we assume we can reduce on-prem hardware by X% (linear scaling).
-    #    This is an approximation.
-    
-    as_is = calculate_as_is(infra, pricing)
-    
-    total_vcpus = sum(w.vcpus for w in infra.workloads)
+def scenario_kopecks(scenario: ScenarioCost) -> Dict[str, int]:
+    """
+    Category totals of a scenario back in kopecks (exact: they were whole
+    kopecks).
+    """
+    return {cat: kopecks(scenario.details[cat]) for cat in COST_CATEGORIES}
+
+@traced("calculate_as_is")
+def calculate_as_is(infra: Union[InfraSpec, CompiledInfra],
+                    pricing: PricingContext) -> ScenarioCost:
+    c = compile_infra(infra)
+
+    # Missing tariffs are reported up front instead of silently dropping items
+    pricing.require_coverage(c)
+    count("items_processed", c.server_region.size + c.colo_region.size
+          + c.cloud_profile.size + c.license_cost.size)
+
+    # Rounded to kopecks per item; the integer sums do not depend on the order
+    items = as_is_item_costs(c, pricing)
+    details = {cat: total(to_kopecks(items[cat])) for cat in COST_CATEGORIES}
+    return scenario_from_kopecks("as_is", details)
+
+def minimal_cloud_candidates(infra: InfraSpec) -> List[Workload]:
+    # Stateless web without PD/KII
+    return [
+        w for w in infra.workloads
+        if (w.type == "web") and (not w.contains_pd) and (not w.kii_related)
+    ]
+
+def hybrid_candidates(infra: InfraSpec) -> List[Workload]:
+    # Everything that is legally allowed.
+    # Assuming PD/KII must stay on-prem for this scenario logic (conservative)
+    return [
+        w for w in infra.workloads
+        if not (w.contains_pd or w.kii_related or w.contains_pd_special)
+    ]
+
+@traced("calculate_moved_to_cloud")
+def calculate_moved_to_cloud(
+    scenario_name: str,
+    infra: Union[InfraSpec, CompiledInfra],
+    pricing: PricingContext,
+    as_is: ScenarioCost,
+    candidates: Union[np.ndarray, Sequence[Workload]],
+    profile_code: str = DEFAULT_TARGET_PROFILE,
+) -> ScenarioCost:
+    """
+    Moves the candidate workloads to a cloud profile and scales on-prem costs
+    down by the share of moved vCPUs (linear scaling, perfect consolidation).
+    Candidates are a boolean mask over the workloads or the Workload models.
+    """
+    c = compile_infra(infra)
+    total_vcpus = int(c.workload_vcpus.sum())
     moved_vcpus = 0
-    cloud_cost_increase = 0.0
-    
-    # Identify candidates
-    for w in infra.workloads:
-        can_move = (w.type == "web") and (not w.contains_pd) and (not w.kii_related)
-        if can_move:
-            # Move to cloud
-            # Pick a default profile, e.g. 'ru_cloud_gp'
-            profile = pricing.get_cloud_profile('ru_cloud_gp')
-            if profile:
-                cost = calculate_workload_cloud_cost(w, profile)
-                cloud_cost_increase += cost
+    cloud_increase = 0  # Kopecks, rounded per moved workload
+
+    profile = pricing.get_cloud_profile(profile_code)
+    if profile:
+        if isinstance(candidates, np.ndarray):
+            count("items_processed", int(candidates.sum()))
+            moved_vcpus = int(c.workload_vcpus[candidates].sum())
+            costs = workload_cloud_costs(c, profile)[candidates]
+            cloud_increase = total(to_kopecks(costs))
+        else:
+            count("items_processed", len(candidates))
+            for w in candidates:
+                cloud_increase += kopecks(calculate_workload_cloud_cost(w, profile))
                 moved_vcpus += w.vcpus
-    
+
+    return scenario_from_moved(scenario_name, as_is, total_vcpus, moved_vcpus,
+                               cloud_increase)
+
+def scenario_from_moved(scenario_name: str, as_is: ScenarioCost, total_vcpus: int,
+                        moved_vcpus: int, cloud_increase_kop: int) -> ScenarioCost:
+    """
+    Builds a migration scenario from as_is and the totals of the moved
+    workloads (their cloud cost in kopecks).
+    """
     if total_vcpus == 0:
-        reduction_factor = 0
+        reduction_factor = 0.0
     else:
         reduction_factor = moved_vcpus / total_vcpus
 
-    # Apply reduction to on-prem costs (amortization, electricity, colo)
-    # This assumes perfect consolidation.
-    
-    new_details = as_is.details.copy()
-    
+    details = scenario_kopecks(as_is)
+
     # Reduce on-prem
-    for cat in ["hardware_amortization", "electricity", "colocation"]:
-        new_details[cat] = new_details[cat] * (1.0 - reduction_factor)
-        
+    for cat in ON_PREM_CATEGORIES:
+        details[cat] = int(scale_kopecks(details[cat], 1.0 - reduction_factor))
+
     # Add cloud cost
-    new_details["cloud"] += cloud_cost_increase
-    
-    new_opex = new_details["electricity"] + new_details["colocation"] + new_details["cloud"] + new_details["licenses"]
-    new_capex_monthly = new_details["hardware_amortization"]
-    new_total = new_opex + new_capex_monthly
-    
-    return ScenarioCost(
-        scenario_name="minimal_cloud",
-        total_monthly_rub=new_total,
-        total_yearly_rub=new_total * 12,
-        capex_yearly_amortized=new_capex_monthly * 12,
-        opex_monthly=new_opex,
-        details=new_details
-    )
+    details["cloud"] += cloud_increase_kop
 
-def calculate_hybrid(infra: InfraSpec, pricing: PricingContext) -> ScenarioCost:
-    # Similar to minimal, but maybe move more?
-    # Or maybe "hybrid" means move everything EXCEPT PD/KII?
-    # Let's define "minimal" as just WEB.
-    # "Hybrid" as everything that is NOT PD/KII.
-    
-    as_is = calculate_as_is(infra, pricing)
-    
-    total_vcpus = sum(w.vcpus for w in infra.workloads)
-    moved_vcpus = 0
-    cloud_cost_increase = 0.0
-    
-    for w in infra.workloads:
-        # Move everything that is legally allowed
-        # Assuming PD/KII must stay on-prem for this scenario logic (conservative)
-        must_stay = w.contains_pd or w.kii_related or w.contains_pd_special
-        if not must_stay:
-            profile = pricing.get_cloud_profile('ru_cloud_gp')
-            if profile:
-                cost = calculate_workload_cloud_cost(w, profile)
-                cloud_cost_increase += cost
-                moved_vcpus += w.vcpus
+    return scenario_from_kopecks(scenario_name, details)
 
-    if total_vcpus == 0:
-        reduction_factor = 0
-    else:
-        reduction_factor = moved_vcpus / total_vcpus
+@traced("calculate_minimal_cloud")
+def calculate_minimal_cloud(infra: Union[InfraSpec, CompiledInfra],
+                            pricing: PricingContext,
+                            as_is: Optional[ScenarioCost] = None) -> ScenarioCost:
+    # Logic: Move stateless web to cloud.
+    # "as_is" is based on "current_deployment", "minimal_cloud" on "workloads".
+    # If we only have "current_deployment", we don't know which server runs which
+    # workload unless we map them.
+    #
+    # Simplified approach for this tool:
+    # 1. Calculate "As Is" based on hardware (or reuse the one passed in).
+    # 2. Calculate "Cloud" cost for moved workloads.
+    # 3. Estimate savings:
+    #    If we move X% of vCPU/RAM to cloud, we assume we can reduce on-prem
+    #    hardware by X% (linear scaling).
+    #    This is an approximation.
+    c = compile_infra(infra)
+    if as_is is None:
+        as_is = calculate_as_is(c, pricing)
+    return calculate_moved_to_cloud("minimal_cloud", c, pricing, as_is,
+                                    c.minimal_cloud_mask())
 
-    new_details = as_is.details.copy()
-    
-    for cat in ["hardware_amortization", "electricity", "colocation"]:
-        new_details[cat] = new_details[cat] * (1.0 - reduction_factor)
-        
-    new_details["cloud"] += cloud_cost_increase
-    
-    new_opex = new_details["electricity"] + new_details["colocation"] + new_details["cloud"] + new_details["licenses"]
-    new_capex_monthly = new_details["hardware_amortization"]
-    new_total = new_opex + new_capex_monthly
-    
-    return ScenarioCost(
-        scenario_name="hybrid",
-        total_monthly_rub=new_total,
-        total_yearly_rub=new_total * 12,
-        capex_yearly_amortized=new_capex_monthly * 12,
-        opex_monthly=new_opex,
-        details=new_details
-    )
+@traced("calculate_hybrid")
+def calculate_hybrid(infra: Union[InfraSpec, CompiledInfra], pricing: PricingContext,
+                     as_is: Optional[ScenarioCost] = None) -> ScenarioCost:
+    # Similar to minimal, but move everything that is NOT PD/KII.
+    c = compile_infra(infra)
+    if as_is is None:
+        as_is = calculate_as_is(c, pricing)
+    return calculate_moved_to_cloud("hybrid", c, pricing, as_is, c.hybrid_mask())
@@ -0,0 +1,177 @@
+"""
+Monte Carlo simulation of tariff uncertainty.
+
+Every scenario cost is linear in the tariffs, so a scenario is reduced once to a
+fixed part (amortization, licenses) plus one cost component per tariff group
+(electricity, colocation and the four cloud rates). A draw samples one price
+factor per group and all scenarios are evaluated for all draws with a single
+matrix product. Factors apply to every tariff of the group at once, i.e. they
+model country-wide price shocks ("electricity +15%, cloud vCPU x2").
+
+The decomposition is read off the scenarios' linear form (see
+calculator.linear_form), so only as_is, minimal_cloud and hybrid can be
+simulated: optimal re-places workloads when prices change, and a fixed
+decomposition would bias every draw.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel, model_validator
+
+from ru_smb_it_budget_planner.models.infra_model import InfraSpec
+from ru_smb_it_budget_planner.calculator.scenario_builder import PricingContext
+from ru_smb_it_budget_planner.calculator.pipeline import DEFAULT_SCENARIOS
+from ru_smb_it_budget_planner.calculator.linear_form import compile_linear_form
+from ru_smb_it_budget_planner.tracing import traced
+
+TARIFF_GROUPS = ("electricity", "colocation", "cloud_vcpu", "cloud_ram",
+                 "cloud_storage", "cloud_egress")
+
+DEFAULT_PERCENTILES = (5, 50, 95)
+
+
+class FactorRange(BaseModel):
+    """Multiplicative price factor: uniform on [low, high], triangular with a mode."""
+    low: float = 1.0
+    high: float = 1.0
+    mode: Optional[float] = None
+
+    @model_validator(mode="after")
+    def _check_bounds(self) -> "FactorRange":
+        if self.low < 0 or self.high < self.low:
+            raise ValueError("Некорректный диапазон множителя: "
+                             f"{self.low}..{self.high}")
+        if self.mode is not None and not (self.low <= self.mode <= self.high):
+            raise ValueError(f"Мода {self.mode} вне диапазона {self.low}..{self.high}")
+        return self
+
+    @classmethod
+    def parse(cls, text: str) -> "FactorRange":
+        """Parses "low:high" (uniform), "low:mode:high" (triangular) or one factor."""
+        try:
+            parts = [float(p) for p in text.split(":")]
+        except ValueError:
+            raise ValueError(f"Некорректный множитель: '{text}'") from None
+        if len(parts) == 1:
+            return cls(low=parts[0], high=parts[0])
+        if len(parts) == 2:
+            return cls(low=parts[0], high=parts[1])
+        if len(parts) == 3:
+            return cls(low=parts[0], mode=parts[1], high=parts[2])
+        raise ValueError(f"Некорректный множитель: '{text}'")
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        if self.high == self.low:
+            return np.full(size, self.low)
+        if self.mode is not None:
+            return rng.triangular(self.low, self.mode, self.high, size)
+        return rng.uniform(self.low, self.high, size)
+
+
+class TariffUncertainty(BaseModel):
+    electricity: FactorRange = FactorRange()
+    colocation: FactorRange = FactorRange()
+    cloud_vcpu: FactorRange = FactorRange()
+    cloud_ram: FactorRange = FactorRange()
+    cloud_storage: FactorRange = FactorRange()
+    cloud_egress: FactorRange = FactorRange()
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """Factor matrix of shape (size, len(TARIFF_GROUPS))."""
+        return np.column_stack(
+            [getattr(self, g).sample(rng, size) for g in TARIFF_GROUPS]
+        )
+
+
+class SimulationResult(BaseModel):
+    draws: int
+    scenario_names: List[str]
+    mean_yearly_rub: Dict[str, float]
+    # scenario -> {"p5": ..., "p50": ...}
+    percentiles_yearly_rub: Dict[str, Dict[str, float]]
+    probability_cheapest: Dict[str, float]
+
+
+def scenario_components(
+    infra: InfraSpec, pricing: PricingContext,
+    scenario_names: Iterable[str] = DEFAULT_SCENARIOS
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decomposes monthly scenario costs into fixed[s] + components[s] @ factors.
+    Returns (fixed, components) with shapes (S,) and (S, len(TARIFF_GROUPS)).
+    """
+    # Raises for scenarios that are not linear in the tariffs
+    form = compile_linear_form(infra, pricing, scenario_names)
+    columns = [TARIFF_GROUPS.index(p.group) for p in form.parameters]
+    groups = np.eye(len(TARIFF_GROUPS))[columns].reshape(-1, len(TARIFF_GROUPS))
+    return form.fixed, (form.coefficients * form.base_prices) @ groups
+
+
+def _simulate_chunk(fixed: np.ndarray, components: np.ndarray,
+                    uncertainty: TariffUncertainty, seed: np.random.SeedSequence,
+                    draws: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    factors = uncertainty.sample(rng, draws)
+    # (S, G) @ (G, D) -> (S, D) monthly costs
+    return np.asarray((fixed[:, None] + components @ factors.T) * 12)
+
+
+def simulate_costs(fixed: np.ndarray, components: np.ndarray,
+                   uncertainty: TariffUncertainty, draws: int = 100_000,
+                   seed: Optional[int] = None, workers: int = 1) -> np.ndarray:
+    """
+    Yearly cost samples with shape (S, draws). workers > 1 splits draws over
+    processes.
+    """
+    if draws <= 0:
+        raise ValueError("Число испытаний должно быть положительным")
+    seed_seq = np.random.SeedSequence(seed)
+    if workers <= 1:
+        return _simulate_chunk(fixed, components, uncertainty, seed_seq, draws)
+
+    sizes = [
+        draws // workers + (1 if i < draws % workers else 0) for i in range(workers)
+    ]
+    sizes = [s for s in sizes if s]
+    seeds = seed_seq.spawn(len(sizes))
+    with ProcessPoolExecutor(max_workers=len(sizes)) as pool:
+        chunks = list(
+            pool.map(_simulate_chunk, [fixed] * len(sizes), [components] * len(sizes),
+                     [uncertainty] * len(sizes), seeds, sizes)
+        )
+    return np.concatenate(chunks, axis=1)
+
+
+def summarize(samples: np.ndarray, scenario_names: List[str],
+              percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> SimulationResult:
+    percentiles = list(percentiles)
+    values = np.percentile(samples, percentiles, axis=1)  # (P, S)
+    cheapest = np.bincount(np.argmin(samples, axis=0),
+                           minlength=len(scenario_names)) / samples.shape[1]
+    means = samples.mean(axis=1)
+    return SimulationResult(
+        draws=samples.shape[1],
+        scenario_names=scenario_names,
+        mean_yearly_rub={
+            name: float(means[i]) for i, name in enumerate(scenario_names)
+        },
+        percentiles_yearly_rub={
+            name: {f"p{p:g}": float(values[j, i]) for j, p in enumerate(percentiles)}
+            for i, name in enumerate(scenario_names)
+        },
+        probability_cheapest={
+            name: float(cheapest[i]) for i, name in enumerate(scenario_names)
+        },
+    )
+
+
+@traced("simulate")
+def simulate(infra: InfraSpec, pricing: PricingContext, uncertainty: TariffUncertainty,
+             draws: int = 100_000, seed: Optional[int] = None, workers: int = 1,
+             scenario_names: Iterable[str] = DEFAULT_SCENARIOS,
+             percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> SimulationResult:
+    names = list(scenario_names)
+    fixed, components = scenario_components(infra, pricing, names)
+    samples = simulate_costs(fixed, components, uncertainty, draws, seed, workers)
+    return summarize(samples, names, percentiles)
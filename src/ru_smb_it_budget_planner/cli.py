@@ -1,57 +1,164 @@
+"""
+Command-line interface.
+
+Commands import what they need inside their bodies so that startup stays
+cheap: `--help` and `validate` never load the calculators, numpy or rich
+(see tests/test_cli_startup.py for the budget).
+"""
+import os
+import sys
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar
 import click
-import yaml
-from pathlib import Path
-from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
-from ru_smb_it_budget_planner.models.pricing_model import ElectricityTariff, ColocationTariff, CloudProfile
-from ru_smb_it_budget_planner.calculator.scenario_builder import (
-    PricingContext, calculate_as_is, calculate_minimal_cloud, calculate_hybrid
-)
-from ru_smb_it_budget_planner.reporting.tables import print_scenario_comparison, print_cost_breakdown
-from ru_smb_it_budget_planner.reporting.owner_report_ru import generate_owner_report
-
-def load_pricing_context(file_path: str) -> PricingContext:
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f)
-    
-    return PricingContext(
-        electricity=[ElectricityTariff(**t) for t in data.get('electricity', [])],
-        colocation=[ColocationTariff(**t) for t in data.get('colocation', [])],
-        cloud_profiles=[CloudProfile(**t) for t in data.get('cloud_profiles', [])]
-    )
+
+if TYPE_CHECKING:
+    from datetime import date, datetime
+    from ru_smb_it_budget_planner.tracing import Tracer
+
+SCENARIO_HELP = ("Scenario to evaluate (repeatable) "
+                 "[default: as_is, minimal_cloud, hybrid]")
+OUTPUT_FORMATS = ("auto", "rich", "text", "markdown", "csv")
+
+F = TypeVar("F", bound=Callable[..., Any])
 
 @click.group()
-def cli():
+@click.option('--profile', is_flag=True,
+              help="Print per-stage timings and counters to stderr")
+@click.option('--trace-out', type=click.Path(dir_okay=False),
+              help="Write a Chrome trace of the run "
+                   "(open in chrome://tracing or ui.perfetto.dev)")
+@click.pass_context
+def cli(ctx, profile, trace_out):
     """IT Budget Planner for Russian SMBs"""
-    pass
+    if profile or trace_out:
+        from ru_smb_it_budget_planner import tracing
+        tracer = tracing.enable()
+        ctx.call_on_close(lambda: _finish_trace(tracer, profile, trace_out))
+
+def _finish_trace(tracer: "Tracer", profile: bool, trace_out: Optional[str]) -> None:
+    from ru_smb_it_budget_planner import tracing
+    tracing.disable()
+    if trace_out:
+        tracer.write_chrome_trace(trace_out)
+        click.secho(f"Трассировка сохранена в {trace_out}", fg="green", err=True)
+    if profile:
+        from ru_smb_it_budget_planner.reporting.tables import print_trace_summary
+        print_trace_summary(tracer)
 
 @cli.command()
-@click.argument('infra_file', type=click.Path(exists=True))
-def validate(infra_file):
-    """Validate infrastructure YAML"""
+@click.argument('paths', nargs=-1, required=True)
+@click.option('--workers', '-j', default=os.cpu_count() or 1, show_default=True,
+              help="Worker processes")
+@click.option('--cache', 'cache_file', default=None, type=click.Path(dir_okay=False),
+              help="Results cache "
+                   "[default: ~/.cache/ru-smb-it-budget-planner/validate.json]")
+@click.option('--no-cache', is_flag=True,
+              help="Validate every file, without reading or writing the cache")
+def validate(paths, workers, cache_file, no_cache):
+    """Validate infrastructure specs (files, directories or glob patterns)"""
+    from ru_smb_it_budget_planner.runner.validate import (
+        validate_files, default_cache_path
+    )
+    cache_path = None if no_cache else cache_file or default_cache_path()
     try:
-        parse_infra_spec(infra_file)
-        click.secho("Конфигурация корректна!", fg="green")
+        report = validate_files(paths, cache_path=cache_path, workers=workers)
     except Exception as e:
-        click.secho(str(e), fg="red")
+        click.secho(f"Ошибка: {e}", fg="red")
+        exit(1)
+    if not report.results:
+        click.secho("Файлы спецификаций не найдены", fg="red")
+        exit(1)
+    failed = report.failed
+    if len(report.results) == 1:
+        if failed:
+            click.secho(failed[0].error, fg="red")
+            exit(1)
+        click.secho("Конфигурация корректна!", fg="green")
+        return
+    for result in failed:
+        click.secho(f"{result.path}:", fg="red", bold=True)
+        click.secho(result.error, fg="red")
+    click.secho(f"Проверено файлов: {len(report.results)}, с ошибками: {len(failed)}, "
+                f"из кэша: {report.cached}", fg="red" if failed else "green")
+    if failed:
         exit(1)
 
+def _as_of_option() -> Callable[[F], F]:
+    return click.option('--as-of', type=click.DateTime(formats=["%Y-%m-%d"]),
+                        default=None,
+                        help="Use the prices in force on this date (YYYY-MM-DD) "
+                             "[default: today]")
+
+def _as_of_date(as_of: Optional["datetime"]) -> Optional["date"]:
+    return as_of.date() if as_of is not None else None
+
+def _output_format(fmt: str, output: str) -> str:
+    """
+    Resolves --format auto: rich tables on an interactive terminal, plain text
+    otherwise.
+    """
+    if fmt == "auto":
+        return "rich" if output == '-' and sys.stdout.isatty() else "text"
+    if fmt == "rich" and output != '-':
+        raise ValueError("Формат rich выводится только в терминал; "
+                         "для файла выберите text, markdown или csv")
+    return fmt
+
 @cli.command()
 @click.argument('infra_file', type=click.Path(exists=True))
 @click.argument('pricing_file', type=click.Path(exists=True))
-def plan(infra_file, pricing_file):
+@click.option('--scenario', '-s', 'scenario_names', multiple=True, help=SCENARIO_HELP)
+@click.option('--format', 'fmt', type=click.Choice(OUTPUT_FORMATS), default="auto",
+              show_default=True,
+              help="Table format; auto uses rich tables on a terminal and plain text "
+                   "otherwise")
+@click.option('--output', '-o', default='-', type=click.Path(allow_dash=True),
+              help="Output file (default: stdout)")
+@click.option('--page-size', type=click.IntRange(min=1), default=None,
+              help="Repeat table headers every N rows (text, markdown)")
+@click.option('--ledger', 'ledger_file', default=None, type=click.Path(),
+              help="Also write the itemized cost ledger (.csv, .jsonl or .parquet)")
+@_as_of_option()
+def plan(infra_file, pricing_file, scenario_names, fmt, output, page_size, ledger_file,
+         as_of):
     """Calculate and compare budget scenarios"""
+    from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
+    from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+    from ru_smb_it_budget_planner.calculator.pipeline import (
+        ScenarioRun, DEFAULT_SCENARIOS
+    )
     try:
+        fmt = _output_format(fmt, output)
         infra = parse_infra_spec(infra_file)
-        pricing = load_pricing_context(pricing_file)
+        pricing = load_pricing_context(pricing_file, _as_of_date(as_of))
+        
+        run = ScenarioRun(infra, pricing)
+        scenarios = run.scenarios(scenario_names or DEFAULT_SCENARIOS)
         
-        scenarios = [
-            calculate_as_is(infra, pricing),
-            calculate_minimal_cloud(infra, pricing),
-            calculate_hybrid(infra, pricing)
-        ]
+        if ledger_file:
+            from ru_smb_it_budget_planner.reporting.ledger_export import export_ledger
+            rows = export_ledger(run.ledger(scenario_names or DEFAULT_SCENARIOS),
+                                 ledger_file)
+            click.secho(f"Реестр затрат ({rows} строк) сохранен в {ledger_file}",
+                        fg="green", err=True)
         
-        print_scenario_comparison(scenarios)
-        print_cost_breakdown(scenarios)
+        if fmt == "rich":
+            from ru_smb_it_budget_planner.reporting.tables import (
+                print_scenario_comparison, print_cost_breakdown
+            )
+            print_scenario_comparison(scenarios)
+            print_cost_breakdown(scenarios)
+        else:
+            from ru_smb_it_budget_planner.reporting.streaming import (
+                write_scenario_comparison, write_cost_breakdown, write_scenario_details
+            )
+            with click.open_file(output, 'w', encoding='utf-8') as out:
+                if fmt == "csv":
+                    write_scenario_details(scenarios, out, fmt)
+                else:
+                    write_scenario_comparison(scenarios, out, fmt, page_size)
+                    out.write("\n")
+                    write_cost_breakdown(scenarios, out, fmt, page_size)
         
     except Exception as e:
         click.secho(f"Ошибка: {e}", fg="red")
@@ -61,31 +168,384 @@ def plan(infra_file, pricing_file):
 @click.argument('infra_file', type=click.Path(exists=True))
 @click.argument('pricing_file', type=click.Path(exists=True))
 @click.option('--output', '-o', type=click.Path(), help="Output file for report")
-def report(infra_file, pricing_file, output):
+@click.option('--scenario', '-s', 'scenario_names', multiple=True, help=SCENARIO_HELP)
+def report(infra_file, pricing_file, output, scenario_names):
     """Generate detailed report for owner"""
+    from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
+    from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+    from ru_smb_it_budget_planner.calculator.pipeline import evaluate_scenarios
+    from ru_smb_it_budget_planner.reporting.owner_report_ru import (
+        generate_owner_report, write_owner_report
+    )
     try:
         infra = parse_infra_spec(infra_file)
         pricing = load_pricing_context(pricing_file)
         
-        scenarios = [
-            calculate_as_is(infra, pricing),
-            calculate_minimal_cloud(infra, pricing),
-            calculate_hybrid(infra, pricing)
-        ]
-        
-        text = generate_owner_report(scenarios)
+        scenarios = evaluate_scenarios(infra, pricing, scenario_names)
         
         if output:
             with open(output, 'w', encoding='utf-8') as f:
-                f.write(text)
+                write_owner_report(scenarios, f)
             click.secho(f"Отчет сохранен в {output}", fg="green")
         else:
-            click.echo(text)
+            click.echo(generate_owner_report(scenarios))
             
     except Exception as e:
         click.secho(f"Ошибка: {e}", fg="red")
         exit(1)
 
+@cli.command('plan-batch')
+@click.argument('input_file', type=click.Path(exists=True, allow_dash=True))
+@click.argument('pricing_file', type=click.Path(exists=True))
+@click.option('--output', '-o', default='-', type=click.Path(allow_dash=True),
+              help="Results JSONL (default: stdout)")
+@click.option('--errors', 'errors_file', default=None, type=click.Path(allow_dash=True),
+              help="Error JSONL (default: stderr)")
+@click.option('--workers', '-j', default=os.cpu_count() or 1, show_default=True,
+              help="Worker processes")
+@click.option('--chunk-size', type=int, default=None,
+              help="Records per task [default: 64]")
+@click.option('--unordered', is_flag=True,
+              help="Write results as they complete (records carry ids)")
+@click.option('--scenario', '-s', 'scenario_names', multiple=True, help=SCENARIO_HELP)
+@_as_of_option()
+def plan_batch(input_file, pricing_file, output, errors_file, workers, chunk_size,
+               unordered, scenario_names, as_of):
+    """Plan every spec of a JSONL file in parallel"""
+    from ru_smb_it_budget_planner.runner.batch import run_batch, DEFAULT_CHUNK_SIZE
+    try:
+        errors_stream = (click.open_file(errors_file, 'w', encoding='utf-8')
+                         if errors_file
+                         else nullcontext(click.get_text_stream('stderr')))
+        with click.open_file(input_file, 'r', encoding='utf-8') as lines, \
+                click.open_file(output, 'w', encoding='utf-8') as out, \
+                errors_stream as errors:
+            stats = run_batch(lines, pricing_file, out, errors, workers=workers,
+                              chunk_size=chunk_size or DEFAULT_CHUNK_SIZE,
+                              ordered=not unordered, scenario_names=scenario_names,
+                              as_of=_as_of_date(as_of))
+        color = "yellow" if stats.failed else "green"
+        click.secho(f"Обработано записей: {stats.processed}, с ошибками: "
+                    f"{stats.failed}", fg=color, err=True)
+
+    except Exception as e:
+        click.secho(f"Ошибка: {e}", fg="red")
+        exit(1)
+
+@cli.command()
+@click.argument('source', type=click.Path(exists=True))
+@click.argument('pricing_file', type=click.Path(exists=True))
+@click.option('--group-by', '-g', multiple=True,
+              type=click.Choice(("region", "industry", "size_class")),
+              help="Company profile field to group by (repeatable) [default: region]")
+@click.option('--top', 'top_k', default=10, show_default=True,
+              help="Clients to list by savings")
+@click.option('--percentile', '-p', 'percentiles', multiple=True,
+              type=click.FloatRange(0, 100),
+              help="Percentile of yearly cost and savings (repeatable) "
+                   "[default: 50, 90]")
+@click.option('--scenario', '-s', 'scenario_names', multiple=True, help=SCENARIO_HELP)
+@click.option('--format', 'fmt', type=click.Choice(("text", "markdown", "csv")),
+              default="text", show_default=True, help="Table format")
+@click.option('--output', '-o', default='-', type=click.Path(allow_dash=True),
+              help="Output file (default: stdout)")
+@_as_of_option()
+def portfolio(source, pricing_file, group_by, top_k, percentiles, scenario_names, fmt,
+              output, as_of):
+    """Roll up costs and savings across client specs (directory or JSONL)"""
+    from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+    from ru_smb_it_budget_planner.calculator.pipeline import DEFAULT_SCENARIOS
+    from ru_smb_it_budget_planner.calculator.portfolio import DEFAULT_PERCENTILES
+    from ru_smb_it_budget_planner.runner.portfolio import iter_specs, run_portfolio
+    from ru_smb_it_budget_planner.reporting.streaming import (
+        write_portfolio_groups, write_top_clients
+    )
+    try:
+        pricing = load_pricing_context(pricing_file, _as_of_date(as_of))
+        summary = run_portfolio(iter_specs(source), pricing,
+                                scenario_names or DEFAULT_SCENARIOS,
+                                group_by or ("region",), top_k,
+                                percentiles or DEFAULT_PERCENTILES)
+        with click.open_file(output, 'w', encoding='utf-8') as out:
+            write_portfolio_groups(summary, out, fmt)
+            if summary.top_clients and fmt != "csv":
+                out.write("\n")
+                write_top_clients(summary, out, fmt)
+        for error in summary.errors:
+            click.secho(f"- {error}", fg="yellow", err=True)
+        color = "yellow" if summary.failed else "green"
+        click.secho(f"Клиентов обработано: {summary.processed}, "
+                    f"с ошибками: {summary.failed}", fg=color, err=True)
+
+    except Exception as e:
+        click.secho(f"Ошибка: {e}", fg="red")
+        exit(1)
+
+@cli.command()
+@click.argument('pricing_file', type=click.Path(exists=True))
+@click.option('--host', default="127.0.0.1", show_default=True,
+              help="Address to listen on")
+@click.option('--port', '-p', default=8080, show_default=True, help="Port to listen on")
+@click.option('--max-batch', default=64, show_default=True,
+              help="Most requests evaluated in one pass")
+@click.option('--max-wait-ms', default=2.0, show_default=True,
+              help="How long a batch waits for more requests")
+def serve(pricing_file, host, port, max_batch, max_wait_ms):
+    """Serve plans over HTTP/JSON with warm pricing (SIGHUP or POST /reload reloads)"""
+    from ru_smb_it_budget_planner.runner.server import serve as run_server
+    try:
+        click.secho(f"Сервис расчета слушает http://{host}:{port}", fg="green",
+                    err=True)
+        run_server(pricing_file, host, port, max_batch, max_wait_ms)
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        click.secho(f"Ошибка: {e}", fg="red")
+        exit(1)
+
+@cli.command()
+@click.argument('infra_file', type=click.Path(exists=True))
+@click.argument('pricing_file', type=click.Path(exists=True))
+@click.option('--interval', default=0.25, show_default=True,
+              help="Polling interval in seconds")
+@click.option('--scenario', '-s', 'scenario_names', multiple=True, help=SCENARIO_HELP)
+def watch(infra_file, pricing_file, interval, scenario_names):
+    """Re-plan on every change of the spec, recalculating only edited items"""
+    from rich.console import Console
+    from ru_smb_it_budget_planner.calculator.pipeline import DEFAULT_SCENARIOS
+    from ru_smb_it_budget_planner.runner.watch import Watcher
+    from ru_smb_it_budget_planner.reporting.tables import (
+        print_scenario_comparison, print_cost_breakdown
+    )
+
+    console = Console()
+
+    def on_refresh(refresh):
+        console.clear()
+        print_scenario_comparison(refresh.scenarios)
+        print_cost_breakdown(refresh.scenarios)
+        what = ("цены перезагружены" if refresh.pricing_reloaded
+                else f"изменено элементов: {refresh.stats.changed}")
+        click.secho(f"Пересчитано за {refresh.elapsed_ms:.1f} мс ({what}). Ctrl+C для "
+                    "выхода.", fg="green")
+
+    def on_error(error):
+        click.secho(f"Ошибка: {error}", fg="red")
+
+    try:
+        Watcher(infra_file, pricing_file, scenario_names or DEFAULT_SCENARIOS).run(
+            on_refresh, on_error, interval
+        )
+    except KeyboardInterrupt:
+        pass
+
+@cli.command('compile-pricing')
+@click.argument('source', type=click.Path(exists=True))
+@click.argument('output', type=click.Path())
+def compile_pricing(source, output):
+    """Compile pricing YAML (a file or a directory of layers) into a binary catalog"""
+    from ru_smb_it_budget_planner.dsl.catalog import compile_catalog
+    try:
+        counts = compile_catalog(source, output)
+        click.secho(f"Каталог цен записан в {output}", fg="green")
+        click.echo(f"Тарифы электроэнергии: {counts['electricity']}, "
+                   f"колокации: {counts['colocation']}, "
+                   f"облачные профили: {counts['cloud_profiles']}")
+    except Exception as e:
+        click.secho(f"Ошибка: {e}", fg="red")
+        exit(1)
+
+@cli.command()
+@click.argument('infra_file', type=click.Path(exists=True))
+@click.argument('pricing_file', type=click.Path(exists=True))
+def optimize(infra_file, pricing_file):
+    """Find the cheapest compliant placement for every workload"""
+    from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
+    from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+    from ru_smb_it_budget_planner.calculator.pipeline import ScenarioRun
+    from ru_smb_it_budget_planner.reporting.tables import (
+        print_scenario_comparison, print_placement
+    )
+    try:
+        infra = parse_infra_spec(infra_file)
+        pricing = load_pricing_context(pricing_file)
+
+        run = ScenarioRun(infra, pricing)
+        print_placement(run.get("optimal_placement"))
+        print_scenario_comparison(run.scenarios(("as_is", "optimal")))
+
+    except Exception as e:
+        click.secho(f"Ошибка: {e}", fg="red")
+        exit(1)
+
+@cli.command()
+@click.argument('infra_file', type=click.Path(exists=True))
+@click.argument('pricing_file', type=click.Path(exists=True))
+@click.option('--scenario', '-s', 'scenario_name', default="hybrid", show_default=True,
+              type=click.Choice(("as_is", "minimal_cloud", "hybrid")),
+              help="Scenario whose on-prem workloads are packed")
+@_as_of_option()
+def consolidate(infra_file, pricing_file, scenario_name, as_of):
+    """Pack on-prem workloads onto servers and list servers to decommission"""
+    from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
+    from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+    from ru_smb_it_budget_planner.calculator.pipeline import ScenarioRun
+    from ru_smb_it_budget_planner.reporting.tables import print_consolidation
+    try:
+        infra = parse_infra_spec(infra_file)
+        pricing = load_pricing_context(pricing_file, _as_of_date(as_of))
+
+        print_consolidation(ScenarioRun(infra, pricing).consolidation(scenario_name))
+
+    except Exception as e:
+        click.secho(f"Ошибка: {e}", fg="red")
+        exit(1)
+
+@cli.command()
+@click.argument('infra_file', type=click.Path(exists=True))
+@click.argument('pricing_file', type=click.Path(exists=True))
+@click.option('--months', default=60, show_default=True,
+              help="Projection horizon in months")
+@click.option('--discount-rate', default=0.0, show_default=True,
+              help="Yearly discount rate for NPV, e.g. 0.16")
+@click.option('--indexation', default=0.0, show_default=True,
+              help="Yearly price indexation for all tariffs")
+@click.option('--electricity-indexation', type=float, default=None,
+              help="Override indexation for electricity")
+@click.option('--migration-months', default=0, show_default=True,
+              help="Ramp-up length of migrations")
+@click.option('--lifetime-years', default=5, show_default=True,
+              help="Server lifetime for amortization")
+@click.option('--renewal-capex', type=float, default=None,
+              help="Price of a replacement server (RUB)")
+@click.option('--cash', is_flag=True,
+              help="Show renewals as cash outflows instead of amortization")
+@click.option('--scenario', '-s', 'scenario_names', multiple=True, help=SCENARIO_HELP)
+@click.option('--as-of', type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Start date (YYYY-MM-DD); tariff versions apply from the month "
+                   "they take effect")
+def project(infra_file, pricing_file, months, discount_rate, indexation,
+            electricity_indexation, migration_months, lifetime_years, renewal_capex,
+            cash, scenario_names, as_of):
+    """Project monthly costs over several years with NPV"""
+    from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
+    from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+    from ru_smb_it_budget_planner.models.pricing_model import HardwareProfile
+    from ru_smb_it_budget_planner.calculator.pipeline import DEFAULT_SCENARIOS
+    from ru_smb_it_budget_planner.calculator.projection import (
+        ProjectionParams, project as run_projection
+    )
+    from ru_smb_it_budget_planner.reporting.tables import print_projection
+    try:
+        infra = parse_infra_spec(infra_file)
+        pricing = load_pricing_context(pricing_file)
+
+        indexation_yearly = {
+            cat: indexation
+            for cat in ("electricity", "colocation", "cloud", "licenses")
+        }
+        if electricity_indexation is not None:
+            indexation_yearly["electricity"] = electricity_indexation
+        hardware = None
+        if renewal_capex is not None:
+            hardware = HardwareProfile(capex_rub=renewal_capex,
+                                       lifetime_years=lifetime_years, power_watts=0)
+        params = ProjectionParams(
+            horizon_months=months,
+            discount_rate_yearly=discount_rate,
+            indexation_yearly=indexation_yearly,
+            migration_months=migration_months,
+            lifetime_years=lifetime_years,
+            hardware=hardware,
+            capex_mode="cash" if cash else "amortized",
+            start_date=_as_of_date(as_of),
+        )
+
+        projection = run_projection([infra], pricing, params,
+                                    scenario_names or DEFAULT_SCENARIOS)
+        print_projection(projection)
+
+    except Exception as e:
+        click.secho(f"Ошибка: {e}", fg="red")
+        exit(1)
+
+def _factor_option(name: str, what: str) -> Callable[[F], F]:
+    return click.option(f'--{name}', default=None, metavar="LOW:HIGH",
+                        help=f"Factor for {what}: 'low:high', 'low:mode:high' "
+                             "or a number")
+
+@cli.command()
+@click.argument('infra_file', type=click.Path(exists=True))
+@click.argument('pricing_file', type=click.Path(exists=True))
+@click.option('--draws', '-n', default=100_000, show_default=True,
+              help="Number of Monte Carlo draws")
+@click.option('--seed', type=int, default=None,
+              help="Random seed for reproducible runs")
+@click.option('--workers', '-j', default=1, show_default=True, help="Worker processes")
+@_factor_option('electricity', "electricity tariffs")
+@_factor_option('colocation', "colocation prices")
+@_factor_option('cloud-vcpu', "cloud vCPU prices")
+@_factor_option('cloud-ram', "cloud RAM prices")
+@_factor_option('cloud-storage', "cloud storage prices")
+@_factor_option('cloud-egress', "egress traffic prices")
+@click.option('--scenario', '-s', 'scenario_names', multiple=True, help=SCENARIO_HELP)
+def simulate(infra_file, pricing_file, draws, seed, workers, scenario_names, **factors):
+    """Simulate tariff uncertainty (Monte Carlo)"""
+    from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
+    from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+    from ru_smb_it_budget_planner.calculator.pipeline import DEFAULT_SCENARIOS
+    from ru_smb_it_budget_planner.calculator.simulation import (
+        FactorRange, TariffUncertainty, simulate as run_simulation
+    )
+    from ru_smb_it_budget_planner.reporting.tables import print_simulation_summary
+    try:
+        infra = parse_infra_spec(infra_file)
+        pricing = load_pricing_context(pricing_file)
+        uncertainty = TariffUncertainty(**{
+            group: FactorRange.parse(text)
+            for group, text in factors.items() if text is not None
+        })
+
+        result = run_simulation(infra, pricing, uncertainty, draws=draws, seed=seed,
+                                workers=workers,
+                                scenario_names=scenario_names or DEFAULT_SCENARIOS)
+        print_simulation_summary(result)
+
+    except Exception as e:
+        click.secho(f"Ошибка: {e}", fg="red")
+        exit(1)
+
+@cli.command()
+@click.argument('infra_file', type=click.Path(exists=True))
+@click.argument('pricing_file', type=click.Path(exists=True))
+@click.option('--delta', default=0.2, show_default=True,
+              type=click.FloatRange(0, 1, min_open=True),
+              help="Relative price change in both directions, e.g. 0.2 for ±20%")
+@click.option('--top', default=10, show_default=True, type=click.IntRange(min=1),
+              help="Prices to list per scenario, largest swing first")
+@click.option('--scenario', '-s', 'scenario_names', multiple=True, help=SCENARIO_HELP)
+@_as_of_option()
+def sensitivity(infra_file, pricing_file, delta, top, scenario_names, as_of):
+    """Rank prices by their effect on scenario costs (tornado analysis)"""
+    from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
+    from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+    from ru_smb_it_budget_planner.calculator.pipeline import DEFAULT_SCENARIOS
+    from ru_smb_it_budget_planner.calculator.linear_form import (
+        sensitivity as run_sensitivity
+    )
+    from ru_smb_it_budget_planner.reporting.tables import print_sensitivity
+    try:
+        infra = parse_infra_spec(infra_file)
+        pricing = load_pricing_context(pricing_file, _as_of_date(as_of))
+
+        result = run_sensitivity(infra, pricing, scenario_names or DEFAULT_SCENARIOS,
+                                 delta)
+        print_sensitivity(result, top)
+
+    except Exception as e:
+        click.secho(f"Ошибка: {e}", fg="red")
+        exit(1)
+
 @cli.command()
 def init_sample():
     """Generate sample configuration files"""
@@ -0,0 +1,352 @@
+"""
+Compiled binary pricing catalog.
+
+compile_catalog merges pricing YAML files (a directory is read in file name
+order; later files override earlier ones) into one versioned binary file:
+
+    header      magic, format version, section offsets
+    strings     interned UTF-8 strings: (count + 1) uint64 offsets + blob
+    electricity fixed-width rows (see the *_DTYPE definitions below)
+    colocation
+    cloud_profiles
+    indexes     per table, (key, valid_from, row) entries sorted by key and
+                date (INDEX_DTYPE)
+
+Entries with the same normalized key (region or profile code) and the same
+valid_from are layered: fields given in a later file replace the earlier
+values, so an override file may carry just the changed price. Entries with
+another valid_from are kept as further versions of the key.
+
+open_catalog maps the file with mmap and returns a PricingContext whose lists
+are CatalogTable views. Opening reads nothing per row: a lookup bisects the
+stored index for its key (CatalogIndex), and a row is turned into a pydantic
+model only when it is first accessed.
+"""
+import mmap
+import os
+import struct
+from datetime import date
+from typing import (
+    Any, Callable, Dict, Generic, Iterable, Iterator, List, Mapping, Optional,
+    Sequence, Tuple, Type, TypeVar, Union,
+)
+
+import numpy as np
+from pydantic import BaseModel, ValidationError
+
+from ru_smb_it_budget_planner.models.pricing_model import (
+    ElectricityTariff, ColocationTariff, CloudProfile
+)
+from ru_smb_it_budget_planner.models.regions import normalize_region, normalize_code
+from ru_smb_it_budget_planner.calculator.scenario_builder import (
+    PricingContext, TariffSeries
+)
+from ru_smb_it_budget_planner.dsl.parser import load_yaml
+
+MAGIC = b"RUPRICE\x00"
+FORMAT_VERSION = 3
+
+# magic, version, reserved, then (offset, count) for strings, each table and each
+# table's index
+_HEADER = struct.Struct("<8sII" + "QQ" * 7)
+_NO_STRING = 0xFFFFFFFF
+_ALIGN = 8
+
+ELECTRICITY_DTYPE = np.dtype([
+    ("region", "<u4"), ("key", "<u4"), ("tariff_rub_per_kwh", "<f8"),
+    ("updated_at", "<u4"), ("comment", "<u4"), ("valid_from", "<M8[D]"),
+])
+COLOCATION_DTYPE = np.dtype([
+    ("region", "<u4"), ("key", "<u4"), ("price_rub_per_u_per_month", "<f8"),
+    ("included_power_watts", "<i8"), ("included_bandwidth_mbps", "<i8"),
+    ("valid_from", "<M8[D]"),
+])
+CLOUD_PROFILE_DTYPE = np.dtype([
+    ("code", "<u4"), ("key", "<u4"), ("vCPU_price_rub_per_hour", "<f8"),
+    ("ram_price_rub_per_gb_hour", "<f8"), ("storage_price_rub_per_gb_month", "<f8"),
+    ("egress_price_rub_per_gb", "<f8"), ("pd_compliant", "u1"),
+    ("valid_from", "<M8[D]"),
+])
+
+# Undated rows are stored with date.min so that they sort first
+INDEX_DTYPE = np.dtype([("key", "<u4"), ("valid_from", "<M8[D]"), ("row", "<u4")])
+
+# Section name -> (model, row dtype, key field, key normalizer)
+_SECTIONS: Dict[str, Tuple[Type[BaseModel], np.dtype, str, Callable[[str], str]]] = {
+    "electricity": (ElectricityTariff, ELECTRICITY_DTYPE, "region", normalize_region),
+    "colocation": (ColocationTariff, COLOCATION_DTYPE, "region", normalize_region),
+    "cloud_profiles": (CloudProfile, CLOUD_PROFILE_DTYPE, "code", normalize_code),
+}
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def is_catalog(file_path: str) -> bool:
+    try:
+        with open(file_path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+# Compilation
+
+def pricing_sources(path: str) -> List[str]:
+    """A single file, or every *.yaml / *.yml file of a directory in name order."""
+    if not os.path.isdir(path):
+        return [path]
+    names = sorted(n for n in os.listdir(path) if n.endswith((".yaml", ".yml")))
+    if not names:
+        raise ValueError(f"В каталоге {path} нет файлов цен (*.yaml)")
+    return [os.path.join(path, n) for n in names]
+
+
+def merge_pricing_files(paths: Iterable[str]) -> Dict[str, List[BaseModel]]:
+    """Layers the files in order and validates the merged entries."""
+    merged: Dict[str, Dict[Tuple[str, str], Dict[str, Any]]] = {
+        name: {} for name in _SECTIONS
+    }
+    for path in paths:
+        data = load_yaml(path) or {}
+        for name, (_, _, key_field, normalize) in _SECTIONS.items():
+            for entry in data.get(name) or []:
+                if key_field not in entry:
+                    raise ValueError(f"{path}: в разделе {name} у записи нет поля "
+                                     f"'{key_field}'")
+                # The first layer's spelling of the key is kept
+                version = (normalize(str(entry[key_field])),
+                           str(entry.get("valid_from") or ""))
+                layer = merged[name].setdefault(version, {key_field: entry[key_field]})
+                layer.update((k, v) for k, v in entry.items() if k != key_field)
+
+    result: Dict[str, List[BaseModel]] = {}
+    for name, (model, _, _, _) in _SECTIONS.items():
+        try:
+            result[name] = [model.model_validate(entry)
+                            for entry in merged[name].values()]
+        except ValidationError as e:
+            raise ValueError(f"Ошибка в разделе {name}: {e}") from None
+    return result
+
+
+class _StringPool:
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NO_STRING
+        return self.ids.setdefault(value, len(self.ids))
+
+    def encode(self) -> bytes:
+        blobs = [s.encode("utf-8") for s in self.ids]
+        offsets = np.zeros(len(blobs) + 1, dtype="<u8")
+        np.cumsum([len(b) for b in blobs], out=offsets[1:])
+        return offsets.tobytes() + b"".join(blobs)
+
+
+def _encode_rows(name: str, rows: List[BaseModel], pool: _StringPool) -> bytes:
+    _, dtype, key_field, normalize = _SECTIONS[name]
+    table = np.zeros(len(rows), dtype=dtype)
+    for field in dtype.names or ():  # Table dtypes are all structured
+        if field == "key":
+            table[field] = [pool.add(normalize(getattr(row, key_field)))
+                            for row in rows]
+        elif dtype[field] == np.dtype("<u4"):
+            table[field] = [pool.add(getattr(row, field)) for row in rows]
+        else:
+            table[field] = [getattr(row, field) for row in rows]
+    return table.tobytes()
+
+
+def _encode_index(name: str, rows: Sequence[Any], pool: _StringPool) -> bytes:
+    _, _, key_field, normalize = _SECTIONS[name]
+    entries = sorted((normalize(getattr(row, key_field)),
+                      row.valid_from or date.min, pos)
+                     for pos, row in enumerate(rows))
+    index = np.zeros(len(entries), dtype=INDEX_DTYPE)
+    index["key"] = [pool.add(key) for key, _, _ in entries]
+    index["valid_from"] = [start for _, start, _ in entries]
+    index["row"] = [pos for _, _, pos in entries]
+    return index.tobytes()
+
+
+def _pad(buf: bytearray) -> None:
+    buf.extend(b"\x00" * (-len(buf) % _ALIGN))
+
+
+def compile_catalog(source: str, output: str) -> Dict[str, int]:
+    """Compiles a pricing file or directory; returns the row count per section."""
+    sections = merge_pricing_files(pricing_sources(source))
+    pool = _StringPool()
+    tables = {name: _encode_rows(name, rows, pool) for name, rows in sections.items()}
+    indexes = {name: _encode_index(name, rows, pool)
+               for name, rows in sections.items()}
+
+    body = bytearray(b"\x00" * _HEADER.size)
+    _pad(body)
+    layout = [len(body), len(pool.ids)]
+    body.extend(pool.encode())
+    for name, rows in sections.items():
+        _pad(body)
+        layout += [len(body), len(rows)]
+        body.extend(tables[name])
+    for name, rows in sections.items():
+        _pad(body)
+        layout += [len(body), len(rows)]
+        body.extend(indexes[name])
+    body[:_HEADER.size] = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, *layout)
+
+    tmp = output + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(body)
+    os.replace(tmp, output)
+    return {name: len(rows) for name, rows in sections.items()}
+
+
+# Loading
+
+class _Strings:
+    def __init__(self, buf: Any, offset: int, count: int):
+        self._offsets = np.frombuffer(buf, dtype="<u8", count=count + 1, offset=offset)
+        self._blob_start = offset + self._offsets.nbytes
+        self._buf = buf
+        self._cache: Dict[int, str] = {}
+
+    def get(self, sid: int) -> Optional[str]:
+        if sid == _NO_STRING:
+            return None
+        value = self._cache.get(sid)
+        if value is None:
+            start = self._blob_start + int(self._offsets[sid])
+            end = self._blob_start + int(self._offsets[sid + 1])
+            value = self._cache[sid] = bytes(self._buf[start:end]).decode("utf-8")
+        return value
+
+    def key(self, sid: int) -> str:
+        value = self.get(sid)
+        if value is None:
+            raise ValueError("В каталоге цен у записи нет ключа")
+        return value
+
+
+class CatalogIndex(Mapping[str, TariffSeries]):
+    """
+    PricingContext index over a table's stored (key, valid_from, row) entries.
+    A key's series is found by bisecting the mapped entries and built on first
+    lookup, so only the keys actually priced are ever decoded.
+    """
+
+    def __init__(self, entries: np.ndarray, strings: _Strings):
+        self._keys = entries["key"]
+        self._starts = entries["valid_from"]
+        self._rows = entries["row"]
+        self._strings = strings
+        self._series: Dict[str, Optional[TariffSeries]] = {}  # Misses too
+
+    def _bisect(self, key: str, lo: int, right: bool) -> int:
+        hi = len(self._keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe = self._strings.key(int(self._keys[mid]))
+            if probe < key or (right and probe == key):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __getitem__(self, key: str) -> TariffSeries:
+        if key not in self._series:
+            lo = self._bisect(key, 0, right=False)
+            hi = self._bisect(key, lo, right=True)
+            self._series[key] = TariffSeries(
+                self._starts[lo:hi].tolist(), self._rows[lo:hi].tolist()
+            ) if hi > lo else None
+        series = self._series[key]
+        if series is None:
+            raise KeyError(key)
+        return series
+
+    def _first_entries(self) -> np.ndarray:
+        # Keys are interned, so equal keys have equal string ids
+        return np.flatnonzero(np.diff(self._keys.astype(np.int64), prepend=-1))
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._strings.key(int(self._keys[i])) for i in self._first_entries())
+
+    def __len__(self) -> int:
+        return len(self._first_entries())
+
+
+class CatalogTable(Sequence[M], Generic[M]):
+    """Read-only list view over a fixed-width table; rows are built on first access."""
+
+    def __init__(self, model: Type[M], rows: np.ndarray, strings: _Strings,
+                 key_index: CatalogIndex):
+        self._model = model
+        self._rows = rows
+        self._strings = strings
+        self._cache: List[Optional[M]] = [None] * len(rows)
+        # Used by PricingContext instead of building its own index
+        self.key_index = key_index
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, pos: Union[int, slice]) -> Any:
+        if isinstance(pos, slice):
+            return [self[i] for i in range(*pos.indices(len(self)))]
+        row = self._cache[pos]
+        if row is None:
+            row = self._cache[pos] = self._materialize(pos)
+        return row
+
+    def __iter__(self) -> Iterator[M]:
+        return (self[i] for i in range(len(self)))
+
+    def __reduce__(self) -> Any:
+        # mmap views cannot be pickled; ship the rows instead
+        return list, (list(self),)
+
+    def _materialize(self, pos: int) -> M:
+        record = self._rows[pos]
+        values: Dict[str, Any] = {}
+        for field in self._rows.dtype.names or ():
+            if field == "key":
+                continue
+            kind = self._rows.dtype[field]
+            if kind == np.dtype("<u4"):
+                values[field] = self._strings.get(int(record[field]))
+            elif kind == np.dtype("u1"):
+                values[field] = bool(record[field])
+            else:
+                values[field] = record[field].item()  # A NaT valid_from becomes None
+        return self._model.model_construct(**values)
+
+
+def open_catalog(file_path: str) -> PricingContext:
+    with open(file_path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(buf) < _HEADER.size:
+        raise ValueError(f"Файл {file_path} не является каталогом цен")
+    magic, version, _, *layout = _HEADER.unpack_from(buf)
+    if magic != MAGIC:
+        raise ValueError(f"Файл {file_path} не является каталогом цен")
+    if version != FORMAT_VERSION:
+        raise ValueError(
+            f"Каталог цен {file_path} имеет версию формата {version}, "
+            f"ожидается {FORMAT_VERSION}; пересоберите его командой compile-pricing"
+        )
+
+    strings = _Strings(buf, layout[0], layout[1])
+    tables: Dict[str, CatalogTable] = {}
+    for i, (name, (model, dtype, _, _)) in enumerate(_SECTIONS.items(), start=1):
+        offset, count = layout[2 * i], layout[2 * i + 1]
+        rows = np.frombuffer(buf, dtype=dtype, count=count, offset=offset)
+        offset = layout[2 * (i + len(_SECTIONS))]
+        entries = np.frombuffer(buf, dtype=INDEX_DTYPE, count=count, offset=offset)
+        tables[name] = CatalogTable(model, rows, strings,
+                                    CatalogIndex(entries, strings))
+    return PricingContext.model_construct(electricity=tables["electricity"],
+                                          colocation=tables["colocation"],
+                                          cloud_profiles=tables["cloud_profiles"])
@@ -1,38 +1,79 @@
 import yaml
-from typing import Dict, Any
-from pydantic import ValidationError
+from typing import Dict, Any, Union
+from pydantic import TypeAdapter, ValidationError
 from ru_smb_it_budget_planner.models.infra_model import InfraSpec
-from ru_smb_it_budget_planner.models.pricing_model import (
-    ElectricityTariff, ColocationTariff, CloudProfile, HardwareProfile
-)
+from ru_smb_it_budget_planner.tracing import traced
 
+# libyaml-backed loader is an order of magnitude faster on large specs
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_infra_adapter: TypeAdapter[InfraSpec] = TypeAdapter(InfraSpec)
+
+def _safe_load(stream: Any) -> Any:
+    # YamlLoader is a SafeLoader (libyaml or pure Python), which linters cannot see
+    return yaml.load(stream, Loader=YamlLoader)  # noqa: S506  # nosec B506
+
+@traced("load_yaml")
 def load_yaml(file_path: str) -> Dict[str, Any]:
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+        with open(file_path, 'rb') as f:
+            return _safe_load(f)
     except FileNotFoundError:
         raise FileNotFoundError(f"Файл не найден: {file_path}")
     except yaml.YAMLError as e:
         raise ValueError(f"Ошибка чтения YAML: {e}")
 
-def parse_infra_spec(file_path: str) -> InfraSpec:
-    data = load_yaml(file_path)
+def format_validation_error(e: ValidationError) -> str:
+    error_messages = []
+    for error in e.errors():
+        loc = " -> ".join(str(x) for x in error['loc'])
+        msg = error['msg']
+        # Simple translation map for common errors
+        if "Field required" in msg:
+            msg = "Обязательное поле отсутствует"
+        elif "Input should be a valid" in msg:
+            msg = "Неверный формат данных"
+        elif error['type'] == "json_invalid":
+            msg = f"Ошибка чтения JSON: {error.get('ctx', {}).get('error', msg)}"
+
+        error_messages.append(f"Поле '{loc}': {msg}" if loc else msg)
+
+    return "Ошибка валидации конфигурации инфраструктуры:\n" + "\n".join(error_messages)
+
+@traced("validate_infra_spec")
+def validate_infra_spec(data: Any) -> InfraSpec:
     try:
-        return InfraSpec(**data)
+        return _infra_adapter.validate_python(data)
     except ValidationError as e:
-        error_messages = []
-        for error in e.errors():
-            loc = " -> ".join(str(x) for x in error['loc'])
-            msg = error['msg']
-            # Simple translation map for common errors
-            if "Field required" in msg:
-                msg = "Обязательное поле отсутствует"
-            elif "Input should be a valid" in msg:
-                msg = "Неверный формат данных"
-            
-            error_messages.append(f"Поле '{loc}': {msg}")
-        
-        raise ValueError("Ошибка валидации конфигурации инфраструктуры:\n" + "\n".join(error_messages))
+        raise ValueError(format_validation_error(e)) from None
+
+@traced("validate_infra_spec_json")
+def validate_infra_spec_json(data: Union[str, bytes]) -> InfraSpec:
+    """Validates a JSON document directly, without building an intermediate dict."""
+    try:
+        return _infra_adapter.validate_json(data)
+    except ValidationError as e:
+        raise ValueError(format_validation_error(e)) from None
+
+@traced("parse_infra_spec")
+def parse_infra_spec(file_path: str) -> InfraSpec:
+    if file_path.lower().endswith(".json"):
+        try:
+            with open(file_path, 'rb') as f:
+                return validate_infra_spec_json(f.read())
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Файл не найден: {file_path}")
+    return validate_infra_spec(load_yaml(file_path))
+
+def parse_infra_spec_content(content: bytes, file_path: str) -> InfraSpec:
+    """parse_infra_spec for content already read from file_path (by its extension)."""
+    if file_path.lower().endswith(".json"):
+        return validate_infra_spec_json(content)
+    try:
+        data = _safe_load(content)
+    except yaml.YAMLError as e:
+        raise ValueError(f"Ошибка чтения YAML: {e}") from None
+    return validate_infra_spec(data)
 
 def parse_pricing_config(file_path: str) -> Dict[str, Any]:
     # This function expects a specific structure for pricing.yaml
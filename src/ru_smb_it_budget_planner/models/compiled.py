@@ -0,0 +1,182 @@
+"""
+Compact struct-of-arrays form of an InfraSpec used by the calculators.
+
+Pydantic models stay at the boundaries (input validation, reports); the
+calculators read typed NumPy columns instead:
+- numeric fields become int32/float64 arrays (int64 when a value does not fit);
+- workload type, IOPS profile and availability become uint8 codes into
+  WORKLOAD_TYPES / IOPS_PROFILES / AVAILABILITY;
+- the PD / special PD / KII flags become one uint8 bitmask per workload;
+- region names and cloud profile codes are interned per section: the *_names
+  tuples hold every distinct spelling in order of first appearance and the
+  item columns hold uint16 ids into them, so tariffs are resolved once per
+  distinct name instead of once per item.
+
+Item names are kept only for workloads (placements report them); server
+names, backups and license metadata are not used by any calculator.
+"""
+from dataclasses import dataclass, fields
+from operator import attrgetter
+from typing import Any, Dict, List, Tuple, Union, get_args
+
+import numpy as np
+
+from ru_smb_it_budget_planner.models.infra_model import (
+    InfraSpec, CompanyProfile, Workload
+)
+
+_FIELDS = Workload.model_fields
+WORKLOAD_TYPES: Tuple[str, ...] = get_args(_FIELDS["type"].annotation)
+IOPS_PROFILES: Tuple[str, ...] = get_args(_FIELDS["iops_profile"].annotation)
+AVAILABILITY: Tuple[str, ...] = get_args(_FIELDS["availability"].annotation)
+WEB = WORKLOAD_TYPES.index("web")
+
+# Workload flag bits
+PD = 1
+PD_SPECIAL = 2
+KII = 4
+
+_INT32 = np.iinfo(np.int32)
+
+
+@dataclass
+class CompiledInfra:
+    company: CompanyProfile
+    # On-prem servers
+    server_region_names: Tuple[str, ...]
+    server_region: np.ndarray
+    server_vcpus: np.ndarray
+    server_ram: np.ndarray
+    server_storage: np.ndarray
+    server_power: np.ndarray
+    server_age: np.ndarray
+    server_capex: np.ndarray
+    # Colocation units
+    colo_region_names: Tuple[str, ...]
+    colo_region: np.ndarray
+    colo_units: np.ndarray
+    colo_power: np.ndarray
+    colo_bandwidth: np.ndarray
+    # Cloud usage rows
+    cloud_profile_names: Tuple[str, ...]
+    cloud_profile: np.ndarray
+    cloud_vcpus: np.ndarray
+    cloud_ram: np.ndarray
+    cloud_storage: np.ndarray
+    cloud_egress: np.ndarray
+    # Workloads
+    workload_names: List[str]
+    workload_type: np.ndarray
+    workload_vcpus: np.ndarray
+    workload_ram: np.ndarray
+    workload_storage: np.ndarray
+    workload_iops: np.ndarray
+    workload_availability: np.ndarray
+    workload_flags: np.ndarray
+    # Licenses
+    license_cost: np.ndarray
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the columns, interned names included."""
+        total = 0
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, np.ndarray):
+                total += value.nbytes
+            elif isinstance(value, (tuple, list)):
+                total += sum(len(s.encode("utf-8")) for s in value)
+        return total
+
+    def minimal_cloud_mask(self) -> np.ndarray:
+        """
+        Stateless web workloads without PD/KII (see
+        scenario_builder.minimal_cloud_candidates).
+        """
+        mask = (self.workload_type == WEB) & (self.workload_flags & (PD | KII) == 0)
+        return np.asarray(mask)
+
+    def hybrid_mask(self) -> np.ndarray:
+        """Workloads with no PD/KII flag (see scenario_builder.hybrid_candidates)."""
+        return np.asarray(self.workload_flags == 0)
+
+
+def _ints(items: List[Any], field: str) -> np.ndarray:
+    values = np.fromiter(map(attrgetter(field), items), dtype=np.int64,
+                         count=len(items))
+    if values.size and (values.min() < _INT32.min or values.max() > _INT32.max):
+        return values
+    return values.astype(np.int32)
+
+
+def _floats(items: List[Any], field: str) -> np.ndarray:
+    return np.fromiter(map(attrgetter(field), items), dtype=np.float64,
+                       count=len(items))
+
+
+def _flag(items: List[Any], field: str, bit: int) -> np.ndarray:
+    values = np.fromiter(map(attrgetter(field), items), dtype=bool, count=len(items))
+    return np.asarray(values.astype(np.uint8) * np.uint8(bit))
+
+
+def _codes(items: List[Any], field: str, names: Tuple[str, ...]) -> np.ndarray:
+    code = {name: i for i, name in enumerate(names)}
+    return np.fromiter(map(code.__getitem__, map(attrgetter(field), items)),
+                       dtype=np.uint8, count=len(items))
+
+
+def _intern(items: List[Any], field: str) -> Tuple[Tuple[str, ...], np.ndarray]:
+    ids: Dict[str, int] = {}
+    column = [ids.setdefault(name, len(ids)) for name in map(attrgetter(field), items)]
+    dtype = np.uint16 if len(ids) <= np.iinfo(np.uint16).max + 1 else np.uint32
+    return tuple(ids), np.asarray(column, dtype=dtype)
+
+
+def compile_infra(infra: Union[InfraSpec, CompiledInfra]) -> CompiledInfra:
+    """Builds the compiled form of a validated spec (compiled specs pass through)."""
+    if isinstance(infra, CompiledInfra):
+        return infra
+    deployment = infra.current_deployment
+    servers = deployment.on_prem_servers
+    colo = deployment.colocation_units
+    cloud = deployment.cloud_usage
+    workloads = infra.workloads
+
+    server_region_names, server_region = _intern(servers, "region")
+    colo_region_names, colo_region = _intern(colo, "dc_region")
+    cloud_profile_names, cloud_profile = _intern(cloud, "provider_profile")
+    flags = (_flag(workloads, "contains_pd", PD)
+             | _flag(workloads, "contains_pd_special", PD_SPECIAL)
+             | _flag(workloads, "kii_related", KII))
+
+    return CompiledInfra(
+        company=infra.company_profile,
+        server_region_names=server_region_names,
+        server_region=server_region,
+        server_vcpus=_ints(servers, "vcpus"),
+        server_ram=_ints(servers, "ram_gb"),
+        server_storage=_ints(servers, "storage_gb"),
+        server_power=_ints(servers, "power_watts"),
+        server_age=_ints(servers, "age_years"),
+        server_capex=_floats(servers, "capex_rub"),
+        colo_region_names=colo_region_names,
+        colo_region=colo_region,
+        colo_units=_ints(colo, "units"),
+        colo_power=_ints(colo, "power_watts"),
+        colo_bandwidth=_ints(colo, "bandwidth_mbps"),
+        cloud_profile_names=cloud_profile_names,
+        cloud_profile=cloud_profile,
+        cloud_vcpus=_ints(cloud, "vcpus"),
+        cloud_ram=_ints(cloud, "ram_gb"),
+        cloud_storage=_ints(cloud, "storage_gb"),
+        cloud_egress=_ints(cloud, "egress_gb"),
+        workload_names=list(map(attrgetter("name"), workloads)),
+        workload_type=_codes(workloads, "type", WORKLOAD_TYPES),
+        workload_vcpus=_ints(workloads, "vcpus"),
+        workload_ram=_ints(workloads, "ram_gb"),
+        workload_storage=_ints(workloads, "storage_gb"),
+        workload_iops=_codes(workloads, "iops_profile", IOPS_PROFILES),
+        workload_availability=_codes(workloads, "availability", AVAILABILITY),
+        workload_flags=flags,
+        license_cost=_floats(infra.licenses, "cost_rub_per_year"),
+    )
@@ -1,3 +1,4 @@
+from datetime import date
 from typing import Optional
 from pydantic import BaseModel
 
@@ -6,12 +7,14 @@ class ElectricityTariff(BaseModel):
     tariff_rub_per_kwh: float
     updated_at: str
     comment: Optional[str] = None
+    valid_from: Optional[date] = None  # First day the price applies; None: always
 
 class ColocationTariff(BaseModel):
     region: str
     price_rub_per_u_per_month: float
     included_power_watts: int
     included_bandwidth_mbps: int
+    valid_from: Optional[date] = None
 
 class CloudProfile(BaseModel):
     code: str
@@ -19,6 +22,8 @@ class CloudProfile(BaseModel):
     ram_price_rub_per_gb_hour: float
     storage_price_rub_per_gb_month: float
     egress_price_rub_per_gb: float
+    pd_compliant: bool = False  # Certified for personal data (152-FZ)
+    valid_from: Optional[date] = None
 
 class HardwareProfile(BaseModel):
     capex_rub: float
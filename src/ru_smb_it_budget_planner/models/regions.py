@@ -0,0 +1,139 @@
+"""
+Region name and profile code normalization, and the region -> federal district
+map used for tariff lookups with fallback (region -> federal district ->
+national default).
+"""
+import re
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+
+NATIONAL_DEFAULT = "*"
+
+_NATIONAL_ALIASES = ("*", "россия", "рф", "российская федерация", "default", "russia")
+
+_ABBREVIATIONS = (
+    (r"\bобл\b\.?", "область"),
+    (r"\bресп\b\.?", "республика"),
+    (r"\bао\b", "автономный округ"),
+)
+
+_PREFIXES = ("г. ", "г ", "город ", "гор. ")
+
+# Common latin spellings seen in customer files
+_ALIASES = {
+    "moscow": "москва",
+    "moscow region": "московская область",
+    "st. petersburg": "санкт-петербург",
+    "st petersburg": "санкт-петербург",
+    "saint petersburg": "санкт-петербург",
+    "спб": "санкт-петербург",
+    "петербург": "санкт-петербург",
+    "tatarstan": "татарстан",
+    "республика татарстан": "татарстан",
+    "kazan": "татарстан",
+    "novosibirsk": "новосибирская область",
+    "yekaterinburg": "свердловская область",
+}
+
+_DISTRICT_NAMES = {
+    "цфо": "центральный федеральный округ",
+    "сзфо": "северо-западный федеральный округ",
+    "юфо": "южный федеральный округ",
+    "скфо": "северо-кавказский федеральный округ",
+    "пфо": "приволжский федеральный округ",
+    "уфо": "уральский федеральный округ",
+    "сфо": "сибирский федеральный округ",
+    "дфо": "дальневосточный федеральный округ",
+}
+
+_DISTRICT_REGIONS = {
+    "цфо": (
+        "москва", "московская область", "белгородская область", "брянская область",
+        "владимирская область", "воронежская область", "ивановская область",
+        "калужская область", "костромская область", "курская область",
+        "липецкая область", "орловская область", "рязанская область",
+        "смоленская область", "тамбовская область", "тверская область",
+        "тульская область", "ярославская область",
+    ),
+    "сзфо": (
+        "санкт-петербург", "ленинградская область", "республика карелия",
+        "республика коми", "архангельская область", "ненецкий автономный округ",
+        "вологодская область", "калининградская область", "мурманская область",
+        "новгородская область", "псковская область",
+    ),
+    "юфо": (
+        "республика адыгея", "республика калмыкия", "краснодарский край",
+        "астраханская область", "волгоградская область", "ростовская область",
+        "республика крым", "севастополь",
+    ),
+    "скфо": (
+        "республика дагестан", "республика ингушетия",
+        "кабардино-балкарская республика", "карачаево-черкесская республика",
+        "республика северная осетия - алания", "чеченская республика",
+        "ставропольский край",
+    ),
+    "пфо": (
+        "республика башкортостан", "республика марий эл", "республика мордовия",
+        "татарстан", "удмуртская республика", "чувашская республика", "пермский край",
+        "кировская область", "нижегородская область", "оренбургская область",
+        "пензенская область", "самарская область", "саратовская область",
+        "ульяновская область",
+    ),
+    "уфо": (
+        "курганская область", "свердловская область", "тюменская область",
+        "челябинская область", "ханты-мансийский автономный округ - югра",
+        "ямало-ненецкий автономный округ",
+    ),
+    "сфо": (
+        "республика алтай", "республика тыва", "республика хакасия", "алтайский край",
+        "красноярский край", "иркутская область", "кемеровская область",
+        "новосибирская область", "омская область", "томская область",
+    ),
+    "дфо": (
+        "республика бурятия", "республика саха (якутия)", "забайкальский край",
+        "камчатский край", "приморский край", "хабаровский край", "амурская область",
+        "магаданская область", "сахалинская область", "еврейская автономная область",
+        "чукотский автономный округ",
+    ),
+}
+
+REGION_DISTRICTS: Mapping[str, str] = MappingProxyType({
+    region: district
+    for district, regions in _DISTRICT_REGIONS.items()
+    for region in regions
+})
+
+_DISTRICT_BY_NAME: Dict[str, str] = {
+    name: code for code, name in _DISTRICT_NAMES.items()
+}
+
+
+def normalize_region(name: str) -> str:
+    """
+    Canonical lookup key for a region name: case-insensitive, "ё" == "е",
+    without "г." / "город" prefixes, with common abbreviations expanded.
+    Federal districts map to their short code ("цфо"), the whole country to "*".
+    """
+    key = " ".join(name.casefold().replace("ё", "е").split())
+    for prefix in _PREFIXES:
+        if key.startswith(prefix):
+            key = key[len(prefix):].strip()
+            break
+    for pattern, replacement in _ABBREVIATIONS:
+        key = re.sub(pattern, replacement, key)
+    key = _ALIASES.get(key, key)
+    if key in _NATIONAL_ALIASES:
+        return NATIONAL_DEFAULT
+    return _DISTRICT_BY_NAME.get(key, key)
+
+
+def normalize_code(code: str) -> str:
+    """Canonical lookup key for a cloud profile code: case-insensitive, trimmed."""
+    return code.strip().casefold()
+
+
+def federal_district(region_key: str) -> Optional[str]:
+    """Federal district code for a normalized region key, None if unknown."""
+    if region_key in _DISTRICT_NAMES:
+        return None
+    return REGION_DISTRICTS.get(region_key)
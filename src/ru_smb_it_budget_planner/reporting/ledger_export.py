@@ -0,0 +1,114 @@
+"""
+Bulk export of cost ledgers (see calculator.ledger).
+
+Rows are produced column by column in chunks of CHUNK_ROWS: codes are mapped
+to names with NumPy lookups and each chunk is written with one call, so no
+per-row dicts are built and memory stays bounded by the chunk size. Parquet
+keeps the ledger columnar (dictionary-encoded names) and needs pyarrow, which
+is optional.
+"""
+import csv
+import json
+import os
+from typing import Iterator, List, Optional, TextIO
+
+import numpy as np
+
+from ru_smb_it_budget_planner.calculator.ledger import CostLedger, ITEM_KINDS
+from ru_smb_it_budget_planner.calculator.scenario_builder import COST_CATEGORIES
+from ru_smb_it_budget_planner.tracing import traced
+
+LEDGER_COLUMNS = ("scenario", "item_kind", "item_index", "item", "category",
+                  "amount_rub_monthly")
+LEDGER_FORMATS = ("csv", "jsonl", "parquet")
+CHUNK_ROWS = 65_536
+
+_JSONL_ROW = ('{{"scenario": {}, "item_kind": {}, "item_index": {}, "item": {}, '
+              '"category": {}, "amount_rub_monthly": {}}}\n')
+
+
+def _chunks(ledger: CostLedger, encode: bool = False) -> Iterator[List[list]]:
+    """Lists of column values per chunk; with encode, strings are JSON-encoded."""
+    def table(values: List[str]) -> np.ndarray:
+        if encode:
+            values = [json.dumps(v, ensure_ascii=False) for v in values]
+        return np.array(values, dtype=object)
+
+    scenarios = table(list(ledger.scenario_names))
+    kinds = table(list(ITEM_KINDS))
+    categories = table(list(COST_CATEGORIES))
+    names, codes = ledger.item_dictionary()
+    items = table(names)
+    for start in range(0, len(ledger), CHUNK_ROWS):
+        rows = slice(start, start + CHUNK_ROWS)
+        yield [
+            scenarios[ledger.scenario[rows]].tolist(),
+            kinds[ledger.kind[rows]].tolist(),
+            ledger.item[rows].tolist(),
+            items[codes[rows]].tolist(),
+            categories[ledger.category[rows]].tolist(),
+            ledger.amount[rows].tolist(),
+        ]
+
+
+@traced("write_ledger_csv")
+def write_ledger_csv(ledger: CostLedger, out: TextIO) -> int:
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(LEDGER_COLUMNS)
+    for columns in _chunks(ledger):
+        writer.writerows(zip(*columns))
+    return len(ledger)
+
+
+@traced("write_ledger_jsonl")
+def write_ledger_jsonl(ledger: CostLedger, out: TextIO) -> int:
+    for columns in _chunks(ledger, encode=True):
+        out.write("".join(map(_JSONL_ROW.format, *columns)))
+    return len(ledger)
+
+
+@traced("write_ledger_parquet")
+def write_ledger_parquet(ledger: CostLedger, path: str) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Для экспорта в Parquet установите pyarrow: "
+                         "pip install pyarrow") from None
+
+    def dictionary(codes: np.ndarray, values: List[str]) -> "pa.DictionaryArray":
+        return pa.DictionaryArray.from_arrays(pa.array(codes.astype(np.int32)),
+                                              pa.array(values, pa.string()))
+
+    names, codes = ledger.item_dictionary()
+    table = pa.table({
+        "scenario": dictionary(ledger.scenario, list(ledger.scenario_names)),
+        "item_kind": dictionary(ledger.kind, list(ITEM_KINDS)),
+        "item_index": pa.array(ledger.item),
+        "item": dictionary(codes, names),
+        "category": dictionary(ledger.category, list(COST_CATEGORIES)),
+        "amount_rub_monthly": pa.array(ledger.amount),
+    })
+    pq.write_table(table, path)
+    return len(ledger)
+
+
+def ledger_format(path: str, fmt: Optional[str] = None) -> str:
+    """Explicit format or the one implied by the file extension."""
+    if fmt is None:
+        fmt = os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in LEDGER_FORMATS:
+        raise ValueError(f"Неизвестный формат реестра затрат: '{fmt}' "
+                         f"(доступны: {', '.join(LEDGER_FORMATS)})")
+    return fmt
+
+
+def export_ledger(ledger: CostLedger, path: str, fmt: Optional[str] = None) -> int:
+    """Writes the ledger to path as CSV, JSONL or Parquet; returns the row count."""
+    fmt = ledger_format(path, fmt)
+    if fmt == "parquet":
+        return write_ledger_parquet(ledger, path)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            return write_ledger_csv(ledger, f)
+        return write_ledger_jsonl(ledger, f)
@@ -0,0 +1,246 @@
+"""
+Streaming renderers for large scenario sets.
+
+The rich tables in reporting.tables build the whole table in memory and are
+meant for a handful of scenarios on an interactive terminal. The writers here
+emit every row as soon as it is given, in plain text (fixed-width columns),
+Markdown or CSV, so memory stays constant in the number of rows and output
+can go to a file, a pipe or stdout. With page_size set, text and Markdown
+tables repeat their header every page_size rows. The owner report has a
+streaming counterpart as well (owner_report_ru.write_owner_report).
+"""
+import abc
+import csv
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, TextIO, Type
+
+from ru_smb_it_budget_planner.calculator.scenario_builder import (
+    ScenarioCost, COST_CATEGORIES as CATEGORIES
+)
+from ru_smb_it_budget_planner.calculator.portfolio import PortfolioSummary
+from ru_smb_it_budget_planner.tracing import traced
+
+FORMATS = ("text", "markdown", "csv")
+
+
+@dataclass(frozen=True)
+class Column:
+    title: str
+    width: int = 16
+    numeric: bool = True
+
+
+class TableWriter(abc.ABC):
+    """Writes rows one at a time; subclasses define the line format."""
+
+    def __init__(self, out: TextIO, columns: Sequence[Column],
+                 title: Optional[str] = None, page_size: Optional[int] = None):
+        if page_size is not None and page_size <= 0:
+            raise ValueError("Размер страницы должен быть положительным")
+        self.out = out
+        self.columns = list(columns)
+        self.title = title
+        self.page_size = page_size
+        self.rows = 0
+
+    def write_row(self, values: Sequence[Any]) -> None:
+        if self.rows == 0 or (self.page_size and self.rows % self.page_size == 0):
+            page = self.rows // self.page_size + 1 if self.page_size else 1
+            self._write_header(page=page)
+        self._write_cells([self._format(col, value)
+                           for col, value in zip(self.columns, values)])
+        self.rows += 1
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> int:
+        for row in rows:
+            self.write_row(row)
+        return self.rows
+
+    def _format(self, column: Column, value: Any) -> str:
+        if column.numeric and isinstance(value, float):
+            return f"{value:,.2f}"
+        if column.numeric and isinstance(value, int):
+            return f"{value:,}"
+        return str(value)
+
+    @abc.abstractmethod
+    def _write_header(self, page: int) -> None:
+        ...
+
+    @abc.abstractmethod
+    def _write_cells(self, cells: List[str]) -> None:
+        ...
+
+
+class TextTableWriter(TableWriter):
+    """Fixed-width columns; a value wider than its column pushes the rest right."""
+
+    def __init__(self, out: TextIO, columns: Sequence[Column],
+                 title: Optional[str] = None, page_size: Optional[int] = None):
+        super().__init__(out, columns, title, page_size)
+        self._widths = [max(col.width, len(col.title)) for col in self.columns]
+
+    def _write_header(self, page: int) -> None:
+        if page > 1:
+            self.out.write("\n")
+        if self.title:
+            self.out.write(f"{self.title} (стр. {page})\n" if self.page_size
+                           else f"{self.title}\n")
+        self._write_cells([col.title for col in self.columns])
+        self.out.write("  ".join("-" * width for width in self._widths) + "\n")
+
+    def _write_cells(self, cells: List[str]) -> None:
+        parts = []
+        for col, width, cell in zip(self.columns, self._widths, cells):
+            parts.append(cell.rjust(width) if col.numeric else cell.ljust(width))
+        self.out.write("  ".join(parts).rstrip() + "\n")
+
+
+class MarkdownTableWriter(TableWriter):
+    def _write_header(self, page: int) -> None:
+        if page > 1:
+            self.out.write("\n")
+        elif self.title:
+            self.out.write(f"### {self.title}\n\n")
+        self._write_cells([col.title for col in self.columns])
+        rule = "|".join("---:" if col.numeric else "---" for col in self.columns)
+        self.out.write("|" + rule + "|\n")
+
+    def _write_cells(self, cells: List[str]) -> None:
+        escaped = (cell.replace("|", "\\|") for cell in cells)
+        self.out.write("| " + " | ".join(escaped) + " |\n")
+
+
+class CsvTableWriter(TableWriter):
+    """Machine-readable: plain numbers, a single header, no pagination or title."""
+
+    def __init__(self, out: TextIO, columns: Sequence[Column],
+                 title: Optional[str] = None, page_size: Optional[int] = None):
+        super().__init__(out, columns, title, None)
+        self._csv = csv.writer(out, lineterminator="\n")
+
+    def _format(self, column: Column, value: Any) -> str:
+        if column.numeric and isinstance(value, float):
+            return f"{value:.2f}"
+        return str(value)
+
+    def _write_header(self, page: int) -> None:
+        self._csv.writerow([col.title for col in self.columns])
+
+    def _write_cells(self, cells: List[str]) -> None:
+        self._csv.writerow(cells)
+
+
+_WRITERS: Dict[str, Type[TableWriter]] = {
+    "text": TextTableWriter,
+    "markdown": MarkdownTableWriter,
+    "csv": CsvTableWriter,
+}
+
+
+def table_writer(fmt: str, out: TextIO, columns: Sequence[Column],
+                 title: Optional[str] = None,
+                 page_size: Optional[int] = None) -> TableWriter:
+    try:
+        writer = _WRITERS[fmt]
+    except KeyError:
+        raise ValueError(f"Неизвестный формат вывода: {fmt} "
+                         f"(доступны: {', '.join(FORMATS)})") from None
+    return writer(out, columns, title, page_size)
+
+
+@traced("write_scenario_comparison")
+def write_scenario_comparison(scenarios: Iterable[ScenarioCost], out: TextIO,
+                              fmt: str = "text",
+                              page_size: Optional[int] = None) -> int:
+    """Same columns as print_scenario_comparison; returns the number of rows written."""
+    columns = [
+        Column("Сценарий", 24, numeric=False),
+        Column("OPEX / мес"),
+        Column("CAPEX (аморт) / мес"),
+        Column("Итого / мес"),
+        Column("Итого / год", 18),
+    ]
+    writer = table_writer(fmt, out, columns, "Сравнение сценариев бюджета (RUB)",
+                          page_size)
+    return writer.write_rows(
+        (s.scenario_name, s.opex_monthly, s.capex_yearly_amortized / 12,
+         s.total_monthly_rub, s.total_yearly_rub)
+        for s in scenarios
+    )
+
+
+@traced("write_cost_breakdown")
+def write_cost_breakdown(scenarios: Iterable[ScenarioCost], out: TextIO,
+                         fmt: str = "text", page_size: Optional[int] = None) -> int:
+    """
+    Category breakdown with one row per scenario (print_cost_breakdown has a
+    column per scenario, which does not scale to many scenarios).
+    """
+    columns = ([Column("Сценарий", 24, numeric=False)]
+               + [Column(cat, 22) for cat in CATEGORIES])
+    writer = table_writer(fmt, out, columns, "Детализация расходов (RUB/мес)",
+                          page_size)
+    return writer.write_rows(
+        [s.scenario_name] + [s.details.get(cat, 0.0) for cat in CATEGORIES]
+        for s in scenarios
+    )
+
+
+@traced("write_scenario_details")
+def write_scenario_details(scenarios: Iterable[ScenarioCost], out: TextIO,
+                           fmt: str = "csv", page_size: Optional[int] = None) -> int:
+    """
+    Totals and the category breakdown in one table (one row per scenario),
+    e.g. for CSV.
+    """
+    columns = [
+        Column("scenario", 24, numeric=False),
+        Column("opex_monthly"),
+        Column("capex_yearly_amortized"),
+        Column("total_monthly_rub"),
+        Column("total_yearly_rub", 18),
+    ] + [Column(cat, 22) for cat in CATEGORIES]
+    writer = table_writer(fmt, out, columns, None, page_size)
+    return writer.write_rows(
+        [s.scenario_name, s.opex_monthly, s.capex_yearly_amortized,
+         s.total_monthly_rub, s.total_yearly_rub]
+        + [s.details.get(cat, 0.0) for cat in CATEGORIES]
+        for s in scenarios
+    )
+
+
+def _percentile_title(q: float) -> str:
+    return f"P{q:g}"
+
+
+@traced("write_portfolio_groups")
+def write_portfolio_groups(summary: PortfolioSummary, out: TextIO, fmt: str = "text",
+                           page_size: Optional[int] = None) -> int:
+    """
+    One row per group and scenario: yearly cost and savings against as_is
+    (RUB/год).
+    """
+    columns = [Column(f, 16, numeric=False) for f in summary.group_by]
+    columns += [Column("Сценарий", 14, numeric=False), Column("Клиентов", 9),
+                Column("Сумма / год", 18), Column("Среднее / год")]
+    columns += [Column(_percentile_title(q)) for q in summary.percentiles]
+    columns += [Column("Экономия, сумма", 18), Column("Экономия, среднее")]
+    columns += [Column(f"Экономия {_percentile_title(q)}") for q in summary.percentiles]
+    writer = table_writer(fmt, out, columns,
+                          "Портфель клиентов: итоги по группам (RUB/год)", page_size)
+    return writer.write_rows(summary.rows())
+
+
+@traced("write_top_clients")
+def write_top_clients(summary: PortfolioSummary, out: TextIO, fmt: str = "text",
+                      page_size: Optional[int] = None) -> int:
+    columns = [Column("Клиент", 28, numeric=False),
+               Column("Сценарий", 14, numeric=False), Column("As Is / год", 18),
+               Column("Экономия / год", 18), Column("Экономия, %", 12)]
+    title = f"Клиенты с наибольшей экономией (топ {len(summary.top_clients)})"
+    writer = table_writer(fmt, out, columns, title, page_size)
+    return writer.write_rows(
+        (c.client, c.scenario, c.as_is_yearly_rub, c.savings_yearly_rub, c.savings_pct)
+        for c in summary.top_clients
+    )
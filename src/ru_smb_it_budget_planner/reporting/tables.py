@@ -1,8 +1,18 @@
-from typing import List
+from typing import TYPE_CHECKING, List
 from rich.table import Table
 from rich.console import Console
 from ru_smb_it_budget_planner.calculator.scenario_builder import ScenarioCost
+from ru_smb_it_budget_planner.tracing import Tracer, traced
 
+if TYPE_CHECKING:
+    # Annotations only: printing a plan must not load every calculator
+    from ru_smb_it_budget_planner.calculator.simulation import SimulationResult
+    from ru_smb_it_budget_planner.calculator.linear_form import SensitivityResult
+    from ru_smb_it_budget_planner.calculator.placement import PlacementResult
+    from ru_smb_it_budget_planner.calculator.consolidation import ConsolidationResult
+    from ru_smb_it_budget_planner.calculator.projection import Projection
+
+@traced("print_scenario_comparison")
 def print_scenario_comparison(scenarios: List[ScenarioCost]):
     console = Console()
     table = Table(title="Сравнение сценариев бюджета (RUB)")
@@ -24,6 +34,7 @@ def print_scenario_comparison(scenarios: List[ScenarioCost]):
 
     console.print(table)
 
+@traced("print_cost_breakdown")
 def print_cost_breakdown(scenarios: List[ScenarioCost]):
     console = Console()
     table = Table(title="Детализация расходов (RUB/мес)")
@@ -42,3 +53,147 @@ def print_cost_breakdown(scenarios: List[ScenarioCost]):
         table.add_row(*row_data)
 
     console.print(table)
+
+@traced("print_simulation_summary")
+def print_simulation_summary(result: "SimulationResult") -> None:
+    console = Console()
+    table = Table(title=f"Неопределенность тарифов: {result.draws:,} испытаний "
+                        "(RUB/год)")
+
+    table.add_column("Сценарий", style="cyan", no_wrap=True)
+    table.add_column("Среднее", justify="right")
+    percentile_keys = list(next(iter(result.percentiles_yearly_rub.values()), {}))
+    for key in percentile_keys:
+        table.add_column(key.upper(), justify="right")
+    table.add_column("P(самый дешевый)", justify="right", style="bold green")
+
+    for name in result.scenario_names:
+        row = [name, f"{result.mean_yearly_rub[name]:,.0f}"]
+        percentiles = result.percentiles_yearly_rub[name]
+        row += [f"{percentiles[key]:,.0f}" for key in percentile_keys]
+        row.append(f"{result.probability_cheapest[name]:.1%}")
+        table.add_row(*row)
+
+    console.print(table)
+
+@traced("print_sensitivity")
+def print_sensitivity(result: "SensitivityResult", top: int = 10) -> None:
+    console = Console()
+    for name in result.scenario_names:
+        table = Table(title=f"Чувствительность {name} к ценам ±{result.delta:.0%} "
+                            f"(база {result.base_yearly_rub[name]:,.0f} RUB/год)")
+        table.add_column("Цена", style="cyan", no_wrap=True)
+        table.add_column("Базовое значение", justify="right")
+        table.add_column(f"-{result.delta:.0%}, RUB/год", justify="right")
+        table.add_column(f"+{result.delta:.0%}, RUB/год", justify="right")
+        table.add_column("Размах", justify="right", style="bold green")
+
+        for bar in result.bars[name][:top]:
+            table.add_row(bar.parameter.label, f"{bar.base_price:,.4g}",
+                          f"{bar.low_yearly_rub:,.0f}", f"{bar.high_yearly_rub:,.0f}",
+                          f"{bar.swing:,.0f}")
+        console.print(table)
+
+@traced("print_placement")
+def print_placement(result: "PlacementResult") -> None:
+    console = Console()
+    table = Table(title="Оптимальное размещение нагрузок (RUB/мес)")
+
+    table.add_column("Нагрузка", style="cyan")
+    table.add_column("Размещение")
+    table.add_column("vCPU", justify="right")
+    table.add_column("Стоимость / мес", justify="right", style="green")
+
+    for p in result.placements:
+        table.add_row(p.workload, p.placement, str(p.vcpus),
+                      f"{p.monthly_cost_rub:,.2f}")
+
+    console.print(table)
+    status = "доказан оптимум" if result.proven_optimal else "лимит перебора исчерпан"
+    console.print(
+        f"Итого нагрузки: {result.objective_monthly_rub:,.2f} RUB/мес; "
+        f"нижняя граница: {result.lower_bound_monthly_rub:,.2f} "
+        f"({status}, узлов: {result.nodes_explored:,})"
+    )
+
+@traced("print_consolidation")
+def print_consolidation(result: "ConsolidationResult") -> None:
+    console = Console()
+    table = Table(title=f"Консолидация серверов: {result.scenario} (RUB/мес)")
+
+    table.add_column("Сервер", style="cyan")
+    table.add_column("Регион")
+    table.add_column("Нагрузок", justify="right")
+    table.add_column("vCPU", justify="right")
+    table.add_column("RAM, ГБ", justify="right")
+    table.add_column("Диск, ГБ", justify="right")
+    table.add_column("Амортизация", justify="right")
+    table.add_column("Электроэнергия", justify="right")
+    table.add_column("Решение")
+
+    for s in result.servers:
+        table.add_row(
+            s.server, s.region, str(s.workloads),
+            f"{s.vcpus_used}/{s.vcpus}", f"{s.ram_used_gb}/{s.ram_gb}",
+            f"{s.storage_used_gb}/{s.storage_gb}",
+            f"{s.amortization_rub_monthly:,.2f}", f"{s.electricity_rub_monthly:,.2f}",
+            "оставить" if s.keep else "[green]вывести[/green]",
+        )
+
+    console.print(table)
+    console.print(
+        f"Можно вывести из эксплуатации серверов: "
+        f"{len(result.decommissioned)} из {len(result.servers)}; "
+        f"экономия амортизации {result.amortization_savings_rub_monthly:,.2f} RUB/мес, "
+        f"электроэнергии {result.electricity_savings_rub_monthly:,.2f} RUB/мес"
+    )
+    if result.unplaced:
+        unplaced = ", ".join(result.unplaced)
+        console.print(f"[yellow]Не помещаются ни на один сервер: {unplaced}[/yellow]")
+
+@traced("print_projection")
+def print_projection(projection: "Projection", company: int = 0) -> None:
+    console = Console()
+    months = projection.params.horizon_months
+    table = Table(title=f"Прогноз расходов на {months} мес. (RUB)")
+
+    yearly = projection.yearly_totals()[company]
+    npv = projection.npv()[company]
+
+    table.add_column("Сценарий", style="cyan", no_wrap=True)
+    for year in range(yearly.shape[1]):
+        table.add_column(f"Год {year + 1}", justify="right")
+    table.add_column("Итого", justify="right", style="green")
+    table.add_column("NPV", justify="right", style="bold green")
+
+    for j, name in enumerate(projection.scenario_names):
+        row = [name] + [f"{v:,.0f}" for v in yearly[j]]
+        row += [f"{yearly[j].sum():,.0f}", f"{npv[j]:,.0f}"]
+        table.add_row(*row)
+
+    console.print(table)
+
+def print_trace_summary(tracer: Tracer) -> None:
+    # Goes to stderr so that profiling does not mix with the command output
+    console = Console(stderr=True)
+    table = Table(title="Профиль выполнения")
+
+    table.add_column("Этап", style="cyan", no_wrap=True)
+    table.add_column("Вызовов", justify="right")
+    table.add_column("Всего, мс", justify="right", style="green")
+    table.add_column("Среднее, мс", justify="right")
+    table.add_column("Макс., мс", justify="right")
+
+    for s in tracer.summary():
+        table.add_row(s.name, f"{s.calls:,}", f"{s.total_ms:,.2f}",
+                      f"{s.mean_ms:,.3f}", f"{s.max_ms:,.3f}")
+
+    console.print(table)
+
+    if tracer.counters:
+        counters = Table(title="Счетчики")
+        counters.add_column("Счетчик", style="cyan", no_wrap=True)
+        counters.add_column("Значение", justify="right")
+        for name, value in sorted(tracer.counters.items()):
+            counters.add_row(name, f"{value:,}")
+        console.print(counters)
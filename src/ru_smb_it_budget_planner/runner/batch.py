@@ -0,0 +1,142 @@
+"""
+Streaming batch planning over JSONL.
+
+Every input line is either an InfraSpec object or {"id": ..., "spec": {...}}.
+Lines are read lazily, grouped into chunks and fanned out to a process pool
+whose workers load the pricing context once at start-up. At most
+MAX_CHUNKS_IN_FLIGHT_PER_WORKER chunks per worker are pending at any time, so
+memory stays constant regardless of the input size.
+
+Results are written as JSONL, in input order by default or as soon as they are
+ready with ordered=False (each record carries its id). Failed records go to a
+separate error stream and do not stop the run.
+"""
+import json
+from collections import deque
+from datetime import date
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import (
+    Any, Deque, Iterable, Iterator, List, Optional, Sequence, Set, TextIO, Tuple
+)
+
+from pydantic import BaseModel
+
+from ru_smb_it_budget_planner.dsl.parser import validate_infra_spec
+from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+from ru_smb_it_budget_planner.calculator.scenario_builder import PricingContext
+from ru_smb_it_budget_planner.calculator.pipeline import (
+    evaluate_scenarios, DEFAULT_SCENARIOS
+)
+
+DEFAULT_CHUNK_SIZE = 64
+MAX_CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+# (line number, raw line)
+Record = Tuple[int, str]
+# (is error, serialized JSON line)
+Outcome = Tuple[bool, str]
+
+
+class BatchStats(BaseModel):
+    processed: int = 0
+    failed: int = 0
+
+
+_worker_pricing: Optional[PricingContext] = None
+_worker_scenarios: Tuple[str, ...] = DEFAULT_SCENARIOS
+
+
+def _init_worker(pricing_file: str, scenario_names: Tuple[str, ...],
+                 as_of: Optional[date]) -> None:
+    global _worker_pricing, _worker_scenarios
+    _worker_pricing = load_pricing_context(pricing_file, as_of)
+    _worker_scenarios = scenario_names
+
+
+def plan_record(line_no: int, line: str, pricing: PricingContext,
+                scenario_names: Sequence[str] = DEFAULT_SCENARIOS) -> Outcome:
+    record_id: Any = line_no
+    try:
+        data = json.loads(line)
+        if isinstance(data, dict) and "spec" in data:
+            record_id = data.get("id", line_no)
+            data = data["spec"]
+        infra = validate_infra_spec(data)
+        scenarios = evaluate_scenarios(infra, pricing, scenario_names)
+        result = {"id": record_id, "scenarios": [s.model_dump() for s in scenarios]}
+        return False, json.dumps(result, ensure_ascii=False)
+    except Exception as e:
+        error = {"id": record_id, "line": line_no, "error": str(e)}
+        return True, json.dumps(error, ensure_ascii=False)
+
+
+def _plan_chunk(chunk: List[Record]) -> List[Outcome]:
+    if _worker_pricing is None:
+        raise RuntimeError("Процесс-обработчик не инициализирован")
+    return [plan_record(line_no, line, _worker_pricing, _worker_scenarios)
+            for line_no, line in chunk]
+
+
+def read_records(lines: Iterable[str]) -> Iterator[Record]:
+    for line_no, line in enumerate(lines, start=1):
+        if line.strip():
+            yield line_no, line
+
+
+def _chunks(records: Iterator[Record], size: int) -> Iterator[List[Record]]:
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _write(outcomes: List[Outcome], out: TextIO, errors: TextIO,
+           stats: BatchStats) -> None:
+    for is_error, text in outcomes:
+        stats.processed += 1
+        if is_error:
+            stats.failed += 1
+            errors.write(text + "\n")
+        else:
+            out.write(text + "\n")
+
+
+def run_batch(lines: Iterable[str], pricing_file: str, out: TextIO, errors: TextIO,
+              workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              ordered: bool = True, scenario_names: Sequence[str] = DEFAULT_SCENARIOS,
+              as_of: Optional[date] = None) -> BatchStats:
+    stats = BatchStats()
+    chunks = _chunks(read_records(lines), chunk_size)
+    names = tuple(scenario_names)
+
+    if workers <= 1:
+        pricing = load_pricing_context(pricing_file, as_of)
+        for chunk in chunks:
+            _write([plan_record(n, line, pricing, names) for n, line in chunk], out,
+                   errors, stats)
+        return stats
+
+    max_in_flight = workers * MAX_CHUNKS_IN_FLIGHT_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(pricing_file, names, as_of)) as pool:
+        if ordered:
+            queue: Deque[Future] = deque()
+            for chunk in chunks:
+                queue.append(pool.submit(_plan_chunk, chunk))
+                if len(queue) >= max_in_flight:
+                    _write(queue.popleft().result(), out, errors, stats)
+            while queue:
+                _write(queue.popleft().result(), out, errors, stats)
+        else:
+            pending: Set[Future] = set()
+            for chunk in chunks:
+                pending.add(pool.submit(_plan_chunk, chunk))
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        _write(future.result(), out, errors, stats)
+            for future in wait(pending).done:
+                _write(future.result(), out, errors, stats)
+    return stats
@@ -0,0 +1,136 @@
+"""
+Portfolio runs: evaluate every client spec of a directory or JSONL file and
+roll the results up with calculator.portfolio.
+
+A directory contributes its *.yaml, *.yml and *.json files (recursively, in
+sorted order, the client id is the path relative to the directory). A JSONL
+file holds one spec per line, plain or as {"id": ..., "spec": {...}} like
+plan-batch (the client id is the "id" or the line number).
+
+Specs are validated and evaluated in chunks of chunk_size. When every
+requested scenario is one the vectorized batch engine knows, a chunk goes
+through calculate_batch in one pass; otherwise each spec runs through the
+pipeline. Only the yearly totals are kept, so no ScenarioCost objects
+outlive their chunk. A spec that fails (unreadable, invalid, missing
+tariffs) is counted and reported without stopping the run.
+"""
+import json
+import os
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from ru_smb_it_budget_planner.models.infra_model import InfraSpec
+from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec, validate_infra_spec
+from ru_smb_it_budget_planner.calculator.scenario_builder import PricingContext
+from ru_smb_it_budget_planner.calculator.pipeline import (
+    evaluate_scenarios, DEFAULT_SCENARIOS
+)
+from ru_smb_it_budget_planner.calculator.batch_engine import (
+    calculate_batch, SCENARIO_NAMES as BATCH_SCENARIOS
+)
+from ru_smb_it_budget_planner.calculator.portfolio import (
+    PortfolioAccumulator, PortfolioSummary, DEFAULT_PERCENTILES, DEFAULT_TOP_K
+)
+from ru_smb_it_budget_planner.runner.batch import read_records
+from ru_smb_it_budget_planner.tracing import traced
+
+DEFAULT_CHUNK_SIZE = 256
+SPEC_EXTENSIONS = (".yaml", ".yml", ".json")
+
+# (client id, loader returning the validated spec)
+SpecSource = Tuple[str, Callable[[], InfraSpec]]
+
+
+def _raise(error: Exception) -> InfraSpec:
+    raise error
+
+
+def _jsonl_spec(line_no: int, line: str) -> SpecSource:
+    client = str(line_no)
+    try:
+        data: Any = json.loads(line)
+    except ValueError as e:
+        return client, partial(_raise, ValueError(f"Ошибка чтения JSON: {e}"))
+    if isinstance(data, dict) and "spec" in data:
+        client = str(data.get("id", line_no))
+        data = data["spec"]
+    return client, partial(validate_infra_spec, data)
+
+
+def iter_specs(source: str) -> Iterator[SpecSource]:
+    """Client ids with spec loaders for a directory of specs or a JSONL file."""
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            paths += [os.path.join(root, f) for f in files
+                      if f.lower().endswith(SPEC_EXTENSIONS)]
+        for path in sorted(paths):
+            yield os.path.relpath(path, source), partial(parse_infra_spec, path)
+        return
+    with open(source, encoding="utf-8") as lines:
+        for line_no, line in read_records(lines):
+            yield _jsonl_spec(line_no, line)
+
+
+def _yearly_totals(specs: List[InfraSpec], pricing: PricingContext,
+                   names: Sequence[str]) -> np.ndarray:
+    if set(names) <= set(BATCH_SCENARIOS):
+        result = calculate_batch(specs, pricing)
+        return np.column_stack([result[name]["total_yearly_rub"] for name in names])
+    return np.array([
+        [s.total_yearly_rub for s in evaluate_scenarios(spec, pricing, names)]
+        for spec in specs
+    ])
+
+
+def _evaluate_chunk(chunk: List[SpecSource], pricing: PricingContext,
+                    names: Sequence[str], acc: PortfolioAccumulator) -> None:
+    clients: List[str] = []
+    specs: List[InfraSpec] = []
+    for client, load in chunk:
+        try:
+            specs.append(load())
+            clients.append(client)
+        except Exception as e:
+            acc.add_error(f"{client}: {e}")
+    if not specs:
+        return
+    try:
+        yearly = _yearly_totals(specs, pricing, names)
+    except Exception:
+        # One spec spoils the vectorized chunk; evaluate one by one to isolate it
+        for client, spec in zip(clients, specs):
+            try:
+                pricing.require_coverage(spec)
+                acc.add([client], [spec.company_profile],
+                        _yearly_totals([spec], pricing, names))
+            except Exception as e:
+                acc.add_error(f"{client}: {e}")
+        return
+    acc.add(clients, [spec.company_profile for spec in specs], yearly)
+
+
+@traced("run_portfolio")
+def run_portfolio(specs: Iterable[SpecSource], pricing: PricingContext,
+                  scenario_names: Sequence[str] = DEFAULT_SCENARIOS,
+                  group_by: Sequence[str] = ("region",), top_k: int = DEFAULT_TOP_K,
+                  percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> PortfolioSummary:
+    """
+    Rolls up specs (see iter_specs) per group. as_is is always evaluated, since
+    savings are measured against it.
+    """
+    names = tuple(scenario_names)
+    if "as_is" not in names:
+        names = ("as_is",) + names
+    acc = PortfolioAccumulator(names, group_by, top_k)
+    sources = iter(specs)
+    while True:
+        chunk = list(islice(sources, chunk_size))
+        if not chunk:
+            break
+        _evaluate_chunk(chunk, pricing, names, acc)
+    return acc.summary(percentiles)
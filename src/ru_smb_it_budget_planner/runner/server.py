@@ -0,0 +1,324 @@
+"""
+Long-running HTTP/JSON planning service.
+
+The pricing context is loaded once and kept warm. Concurrent /plan requests
+are queued and evaluated together: the batcher takes whatever arrived while
+the previous batch was running (up to max_batch, waiting at most max_wait_ms
+for more) and prices it in one batch_engine pass in a worker thread.
+
+    POST /plan     body: InfraSpec JSON, optional ?scenario=...&scenario=...
+                   -> {"scenarios": [ScenarioCost, ...], "pricing_version": N}
+                   (N is the version of the pricing the batch was priced with)
+    POST /reload   re-reads the pricing file (SIGHUP does the same)
+    GET  /health   pricing version and batching counters
+
+Reloading swaps the context between batches; a batch that is already running
+finishes on the context it started with, so no request is dropped.
+
+Only a minimal HTTP/1.1 subset is implemented (Content-Length bodies,
+keep-alive); the service is meant to listen on localhost behind the portal.
+"""
+import asyncio
+import json
+import signal
+import time
+from dataclasses import dataclass
+from typing import (
+    Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+)
+from urllib.parse import parse_qs, urlsplit
+
+import click
+
+from ru_smb_it_budget_planner.models.infra_model import InfraSpec
+from ru_smb_it_budget_planner.dsl.parser import validate_infra_spec_json
+from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+from ru_smb_it_budget_planner.calculator.scenario_builder import (
+    PricingContext, ScenarioCost
+)
+from ru_smb_it_budget_planner.calculator.pipeline import (
+    evaluate_scenarios, get_node, DEFAULT_SCENARIOS
+)
+from ru_smb_it_budget_planner.calculator.batch_engine import (
+    SCENARIO_NAMES, calculate_batch, to_scenario_costs
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_WAIT_MS = 2.0
+MAX_BODY_BYTES = 32 * 1024 * 1024
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 422: "Unprocessable Entity",
+            500: "Internal Server Error"}
+
+PlanOutcome = Union[List[ScenarioCost], Exception]
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def plan_many(requests: Sequence[Tuple[InfraSpec, Sequence[str]]],
+              pricing: PricingContext) -> List[PlanOutcome]:
+    """
+    Evaluates many specs against one pricing context.
+    Specs that ask only for the built-in scenarios go through a single
+    batch_engine pass; the rest (and any spec of a batch that fails) are
+    evaluated one by one so that each request gets its own error.
+    """
+    outcomes: List[Optional[PlanOutcome]] = [None] * len(requests)
+    batchable = [
+        i for i, (_, names) in enumerate(requests) if set(names) <= set(SCENARIO_NAMES)
+    ]
+    if batchable:
+        try:
+            rows = calculate_batch([requests[i][0] for i in batchable], pricing)
+        except Exception:
+            rows = None
+        if rows is not None:
+            for i, row in zip(batchable, rows):
+                by_name = {s.scenario_name: s for s in to_scenario_costs(row)}
+                outcomes[i] = [by_name[name] for name in requests[i][1]]
+
+    for i, (infra, names) in enumerate(requests):
+        if outcomes[i] is None:
+            try:
+                outcomes[i] = evaluate_scenarios(infra, pricing, names)
+            except Exception as e:
+                outcomes[i] = e
+    return outcomes  # type: ignore[return-value]
+
+
+@dataclass
+class _Pending:
+    infra: InfraSpec
+    names: Tuple[str, ...]
+    future: "asyncio.Future[Tuple[PlanOutcome, int]]"
+
+
+class PlanningService:
+    def __init__(self, pricing_file: str, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        self.pricing_file = pricing_file
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.pricing = load_pricing_context(pricing_file)
+        self.pricing_version = 1
+        self.pricing_loaded_at = time.time()
+        self.requests_served = 0
+        self.batches = 0
+        self._queue: "asyncio.Queue[_Pending]" = asyncio.Queue()
+        self._reload_lock = asyncio.Lock()
+
+    async def plan(
+        self, infra: InfraSpec, names: Sequence[str] = DEFAULT_SCENARIOS
+    ) -> Tuple[List[ScenarioCost], int]:
+        """Returns the scenarios and the pricing version they were computed with."""
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[Tuple[PlanOutcome, int]]" = loop.create_future()
+        await self._queue.put(_Pending(infra, tuple(names), future))
+        outcome, version = await future
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome, version
+
+    async def reload(self) -> int:
+        async with self._reload_lock:
+            loop = asyncio.get_running_loop()
+            pricing = await loop.run_in_executor(None, load_pricing_context,
+                                                 self.pricing_file)
+            self.pricing, self.pricing_version = pricing, self.pricing_version + 1
+            self.pricing_loaded_at = time.time()
+            return self.pricing_version
+
+    async def run_batcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # A reload during the batch applies to the next one
+            pricing, version = self.pricing, self.pricing_version
+            try:
+                outcomes = await loop.run_in_executor(
+                    None, plan_many, [(p.infra, p.names) for p in batch], pricing)
+            except Exception as e:
+                outcomes = [e] * len(batch)
+            self.batches += 1
+            self.requests_served += len(batch)
+            for pending, outcome in zip(batch, outcomes):
+                if not pending.future.done():
+                    pending.future.set_result((outcome, version))
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "pricing_file": self.pricing_file,
+            "pricing_version": self.pricing_version,
+            "pricing_loaded_at": self.pricing_loaded_at,
+            "requests": self.requests_served,
+            "batches": self.batches,
+        }
+
+    # HTTP
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        url = urlsplit(target)
+        if url.path == "/plan":
+            if method != "POST":
+                raise HttpError(405, "Используйте POST")
+            names = parse_qs(url.query).get("scenario") or list(DEFAULT_SCENARIOS)
+            try:
+                for name in names:
+                    get_node(name)
+                infra = validate_infra_spec_json(body)
+                scenarios, version = await self.plan(infra, names)
+            except ValueError as e:
+                raise HttpError(422, str(e)) from None
+            return 200, {"scenarios": [s.model_dump() for s in scenarios],
+                         "pricing_version": version}
+        if url.path == "/reload":
+            if method != "POST":
+                raise HttpError(405, "Используйте POST")
+            try:
+                version = await self.reload()
+            except (OSError, ValueError) as e:
+                raise HttpError(422, f"Цены не перезагружены: {e}") from None
+            return 200, {"pricing_version": version}
+        if url.path == "/health":
+            return 200, self.health()
+        raise HttpError(404, f"Неизвестный путь: {url.path}")
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        await serve_connection(reader, writer, self.dispatch)
+
+
+Dispatch = Callable[[str, str, bytes], Awaitable[Tuple[int, Any]]]
+
+
+async def serve_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                           dispatch: Dispatch) -> None:
+    """
+    Answers the requests of one keep-alive connection with
+    dispatch(method, target, body).
+    """
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except HttpError as e:
+                writer.write(_response(e.status, {"error": str(e)}, keep_alive=False))
+                break
+            if request is None:
+                break
+            method, target, headers, body = request
+            try:
+                status, payload = await dispatch(method, target, body)
+            except HttpError as e:
+                status, payload = e.status, {"error": str(e)}
+            except Exception as e:
+                status, payload = 500, {"error": str(e)}
+            keep_alive = headers.get("connection", "").lower() != "close"
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _read_request(
+    reader: asyncio.StreamReader
+) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "Некорректная строка запроса") from None
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HttpError(400, "Некорректный Content-Length") from None
+    if length > MAX_BODY_BYTES:
+        raise HttpError(413, "Слишком большой запрос")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+def _response(status: int, payload: Any, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def start_service(
+    pricing_file: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+    max_batch: int = DEFAULT_MAX_BATCH, max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+) -> Tuple[PlanningService, asyncio.AbstractServer, "asyncio.Task[None]"]:
+    """Starts listening; port=0 picks a free port (see server.sockets)."""
+    service = PlanningService(pricing_file, max_batch, max_wait_ms)
+    batcher = asyncio.get_running_loop().create_task(service.run_batcher())
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    return service, server, batcher
+
+
+async def _reload_on_signal(service: PlanningService) -> None:
+    try:
+        version = await service.reload()
+        click.secho(f"Цены перезагружены, версия {version}", fg="green", err=True)
+    except (OSError, ValueError) as e:
+        click.secho(f"Цены не перезагружены: {e}", fg="red", err=True)
+
+
+async def _serve(pricing_file: str, host: str, port: int, max_batch: int,
+                 max_wait_ms: float) -> None:
+    service, server, batcher = await start_service(pricing_file, host, port,
+                                                   max_batch, max_wait_ms)
+    if hasattr(signal, "SIGHUP"):
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGHUP, lambda: asyncio.ensure_future(_reload_on_signal(service)))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batcher.cancel()
+
+
+def serve(pricing_file: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+          max_batch: int = DEFAULT_MAX_BATCH,
+          max_wait_ms: float = DEFAULT_MAX_WAIT_MS) -> None:
+    asyncio.run(_serve(pricing_file, host, port, max_batch, max_wait_ms))
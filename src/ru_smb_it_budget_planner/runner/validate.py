@@ -0,0 +1,188 @@
+"""
+Validation of many spec files at once, for CI over a repo of client specs.
+
+Paths may be files, directories (their *.yaml, *.yml and *.json files,
+recursively, in sorted order) or glob patterns ("specs/**/infra.yaml").
+Every file is read once and hashed (SHA-256 of its content); the on-disk
+cache maps each path to the content hash and the validation result (None or
+the error message) it last had, so an unchanged file is reported without
+being parsed. A cache miss validates the very bytes that were hashed, so a
+file changing in between cannot store a result under the wrong hash. Paths
+are part of the key because parse errors quote them. The cache is tied to a
+schema version, a hash of the spec model and parser sources, and is dropped
+as a whole when it changes; it keeps at most MAX_CACHE_ENTRIES results, the
+oldest go first.
+
+Cache misses are validated across a process pool (serially when there are
+few of them). This module loads neither pydantic nor the spec models unless
+a file actually needs validating, so a re-run over unchanged files costs
+little more than reading them.
+"""
+import glob
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+SPEC_EXTENSIONS = (".yaml", ".yml", ".json")
+CACHE_FORMAT = 1
+MAX_CACHE_ENTRIES = 100_000
+# Fewer misses than this are validated in-process: a pool costs more to start
+MIN_PARALLEL_FILES = 16
+
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SCHEMA_SOURCES = ("models/infra_model.py", "dsl/parser.py")
+
+
+@dataclass
+class FileResult:
+    path: str
+    error: Optional[str] = None
+    cached: bool = False
+
+
+@dataclass
+class ValidationReport:
+    results: List[FileResult] = field(default_factory=list)
+
+    @property
+    def failed(self) -> List[FileResult]:
+        return [r for r in self.results if r.error is not None]
+
+    @property
+    def cached(self) -> int:
+        return sum(r.cached for r in self.results)
+
+
+def default_cache_path() -> str:
+    root = (os.environ.get("XDG_CACHE_HOME")
+            or os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(root, "ru-smb-it-budget-planner", "validate.json")
+
+
+def schema_version() -> str:
+    """Hash of the sources that decide whether a spec is valid and how errors read."""
+    digest = hashlib.sha256()
+    for name in _SCHEMA_SOURCES:
+        with open(os.path.join(_PACKAGE_DIR, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def expand_paths(paths: Iterable[str]) -> List[str]:
+    """
+    Spec files for files, directories and glob patterns; duplicates are
+    dropped, order kept.
+    """
+    files: Dict[str, None] = {}
+    for path in paths:
+        if os.path.isdir(path):
+            found = []
+            for root, _, names in os.walk(path):
+                found += [os.path.join(root, n) for n in names
+                          if n.lower().endswith(SPEC_EXTENSIONS)]
+            files.update(dict.fromkeys(sorted(found)))
+        elif glob.has_magic(path) and not os.path.exists(path):
+            matches = glob.glob(path, recursive=True)
+            files.update(dict.fromkeys(sorted(p for p in matches if os.path.isfile(p))))
+        else:
+            files[path] = None
+    return list(files)
+
+
+# Spec path -> [content hash, error message or None]
+CacheEntries = Dict[str, List[Optional[str]]]
+
+
+def load_cache(path: str, version: str) -> CacheEntries:
+    """
+    Cached results by spec path; empty when missing, unreadable or of another
+    schema version.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if (not isinstance(data, dict) or data.get("format") != CACHE_FORMAT
+            or data.get("schema") != version):
+        return {}
+    entries = data.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def save_cache(path: str, version: str, entries: CacheEntries) -> None:
+    if len(entries) > MAX_CACHE_ENTRIES:
+        entries = dict(list(entries.items())[-MAX_CACHE_ENTRIES:])
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"format": CACHE_FORMAT, "schema": version, "entries": entries}, f,
+                  ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _validate_content(item: Tuple[str, bytes]) -> Optional[str]:
+    from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec_content
+
+    path, content = item
+    try:
+        parse_infra_spec_content(content, path)
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def validate_files(paths: Sequence[str], cache_path: Optional[str] = None,
+                   workers: Optional[int] = None) -> ValidationReport:
+    """
+    Validates every spec under paths (see expand_paths). With cache_path the
+    results are looked up and stored by path and content hash; workers is the process
+    pool size (None: one per CPU, 1: in-process).
+    """
+    version = schema_version() if cache_path else ""
+    cache = load_cache(cache_path, version) if cache_path else {}
+    report = ValidationReport()
+    misses: List[int] = []
+    digests: List[str] = []
+    contents: List[Tuple[str, bytes]] = []
+    for path in expand_paths(paths):
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            digest = hashlib.sha256(content).hexdigest()
+        except FileNotFoundError:
+            report.results.append(FileResult(path, f"Файл не найден: {path}"))
+            continue
+        except OSError as e:
+            report.results.append(FileResult(path, f"Ошибка чтения файла: {e}"))
+            continue
+        entry = cache.get(path)
+        if entry and entry[0] == digest:
+            report.results.append(FileResult(path, entry[1], cached=True))
+            continue
+        misses.append(len(report.results))
+        digests.append(digest)
+        contents.append((path, content))
+        report.results.append(FileResult(path))
+
+    workers = min(workers or os.cpu_count() or 1, len(contents))
+    if workers > 1 and len(contents) >= MIN_PARALLEL_FILES:
+        # multiprocessing only when a pool is needed
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            errors = list(pool.map(_validate_content, contents,
+                                   chunksize=max(1, len(contents) // (workers * 4))))
+    else:
+        errors = [_validate_content(item) for item in contents]
+
+    for i, digest, error in zip(misses, digests, errors):
+        report.results[i].error = error
+        # Re-inserted last, so the oldest go first
+        cache.pop(report.results[i].path, None)
+        cache[report.results[i].path] = [digest, error]
+    if cache_path and misses:
+        save_cache(cache_path, version, cache)
+    return report
@@ -0,0 +1,98 @@
+"""
+`watch` mode: re-plan a spec whenever it (or the pricing file) changes.
+
+Files are polled by mtime and size, with no extra dependencies. A changed
+spec goes through IncrementalPlan.update, so only the edited items are
+validated and priced again. A changed pricing file rebuilds the plan from
+scratch. Errors are reported through the callback, and the last good result
+stays in place.
+"""
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ru_smb_it_budget_planner.dsl.parser import load_yaml
+from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+from ru_smb_it_budget_planner.calculator.scenario_builder import ScenarioCost
+from ru_smb_it_budget_planner.calculator.incremental import IncrementalPlan, UpdateStats
+from ru_smb_it_budget_planner.calculator.pipeline import DEFAULT_SCENARIOS
+
+DEFAULT_INTERVAL_SECONDS = 0.25
+
+FileState = Optional[Tuple[float, int]]
+
+
+@dataclass
+class Refresh:
+    scenarios: List[ScenarioCost]
+    stats: UpdateStats
+    elapsed_ms: float
+    pricing_reloaded: bool = False
+
+
+def load_spec_data(file_path: str) -> Dict[str, Any]:
+    if file_path.lower().endswith(".json"):
+        with open(file_path, 'rb') as f:
+            try:
+                data: Dict[str, Any] = json.loads(f.read())
+                return data
+            except ValueError as e:
+                raise ValueError(f"Ошибка чтения JSON: {e}") from None
+    return load_yaml(file_path)
+
+
+def _file_state(path: str) -> FileState:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime, st.st_size
+
+
+def poll_changes(paths: Sequence[str], interval: float = DEFAULT_INTERVAL_SECONDS,
+                 sleep: Callable[[float], None] = time.sleep) -> Iterator[List[str]]:
+    """Yields every path at first, then the paths whose mtime or size changed."""
+    states = {path: _file_state(path) for path in paths}
+    yield list(paths)
+    while True:
+        sleep(interval)
+        changed = []
+        for path in paths:
+            state = _file_state(path)
+            if state != states[path]:
+                states[path] = state
+                changed.append(path)
+        if changed:
+            yield changed
+
+
+class Watcher:
+    def __init__(self, infra_file: str, pricing_file: str,
+                 scenario_names: Sequence[str] = DEFAULT_SCENARIOS):
+        self.infra_file = infra_file
+        self.pricing_file = pricing_file
+        self.scenario_names = tuple(scenario_names)
+        self.plan: Optional[IncrementalPlan] = None
+
+    def refresh(self, changed: Sequence[str]) -> Refresh:
+        start = time.perf_counter()
+        reload_pricing = self.plan is None or self.pricing_file in changed
+        plan = self.plan
+        if plan is None or reload_pricing:
+            plan = IncrementalPlan(load_pricing_context(self.pricing_file))
+        stats = plan.update(load_spec_data(self.infra_file))
+        scenarios = plan.scenarios(self.scenario_names)
+        self.plan = plan  # Only after a successful update
+        return Refresh(scenarios, stats, (time.perf_counter() - start) * 1000,
+                       reload_pricing)
+
+    def run(self, on_refresh: Callable[[Refresh], None],
+            on_error: Callable[[Exception], None],
+            interval: float = DEFAULT_INTERVAL_SECONDS) -> None:
+        for changed in poll_changes([self.infra_file, self.pricing_file], interval):
+            try:
+                on_refresh(self.refresh(changed))
+            except (OSError, ValueError) as e:
+                on_error(e)
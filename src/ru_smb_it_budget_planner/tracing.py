@@ -0,0 +1,161 @@
+"""
+Lightweight timing spans and counters.
+
+Library code marks stages with @traced("name") or `with span("name")` and
+bumps counters with count("name"). Nothing is recorded unless a Tracer is
+active (see enable() / tracing()); when disabled every hook is a single
+global check, so the instrumentation can stay in hot paths.
+
+A Tracer summarizes spans per name or exports them in the Chrome trace event
+format (chrome://tracing, https://ui.perfetto.dev).
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class SpanEvent:
+    name: str
+    start_ns: int
+    duration_ns: int
+    thread_id: int
+
+
+@dataclass
+class SpanSummary:
+    name: str
+    calls: int
+    total_ms: float
+    max_ms: float
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.origin_ns = time.perf_counter_ns()
+        self.events: List[SpanEvent] = []
+        self.counters: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            event = SpanEvent(name, start, time.perf_counter_ns() - start,
+                              threading.get_ident())
+            with self._lock:
+                self.events.append(event)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def summary(self) -> List[SpanSummary]:
+        """Per-name totals, in order of first appearance."""
+        by_name: Dict[str, SpanSummary] = {}
+        for event in sorted(self.events, key=lambda e: e.start_ns):
+            ms = event.duration_ns / 1e6
+            s = by_name.setdefault(event.name, SpanSummary(event.name, 0, 0.0, 0.0))
+            s.calls += 1
+            s.total_ms += ms
+            s.max_ms = max(s.max_ms, ms)
+        return list(by_name.values())
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = [
+            {
+                "name": e.name, "ph": "X", "pid": pid, "tid": e.thread_id,
+                "ts": (e.start_ns - self.origin_ns) / 1000.0,
+                "dur": e.duration_ns / 1000.0,
+            }
+            for e in sorted(self.events, key=lambda e: e.start_ns)
+        ]
+        end_us = max((ev["ts"] + ev["dur"] for ev in events), default=0.0)
+        events.extend(
+            {"name": name, "ph": "C", "pid": pid, "tid": 0, "ts": end_us,
+             "args": {"value": value}}
+            for name, value in sorted(self.counters.items())
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"counters": dict(self.counters)}}
+
+    def write_chrome_trace(self, file_path: str) -> None:
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+
+
+_active: Optional[Tracer] = None
+
+
+def enable() -> Tracer:
+    global _active
+    _active = Tracer()
+    return _active
+
+
+def disable() -> None:
+    global _active
+    _active = None
+
+
+def active_tracer() -> Optional[Tracer]:
+    return _active
+
+
+@contextmanager
+def tracing() -> Iterator[Tracer]:
+    """Records spans and counters for the duration of the block."""
+    global _active
+    previous = _active
+    tracer = enable()
+    try:
+        yield tracer
+    finally:
+        _active = previous
+
+
+@contextmanager
+def _nothing() -> Iterator[None]:
+    yield
+
+
+def span(name: str) -> Any:
+    tracer = _active
+    return _nothing() if tracer is None else tracer.span(name)
+
+
+def count(name: str, n: int = 1) -> None:
+    tracer = _active
+    if tracer is not None:
+        tracer.count(name, n)
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator: records a span per call (named after the function by default)."""
+    def decorator(func: F) -> F:
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            tracer = _active
+            if tracer is None:
+                return func(*args, **kwargs)
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorator
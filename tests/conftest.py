@@ -0,0 +1,12 @@
+import pytest
+from helpers import sample_infra, sample_pricing
+
+
+@pytest.fixture
+def infra():
+    return sample_infra()
+
+
+@pytest.fixture
+def pricing():
+    return sample_pricing()
@@ -0,0 +1,124 @@
+from ru_smb_it_budget_planner.models.infra_model import (
+    InfraSpec, CompanyProfile, Workload, CurrentDeployment, OnPremServer,
+    ColocationUnit, CloudUsage, License
+)
+from ru_smb_it_budget_planner.models.pricing_model import (
+    ElectricityTariff, ColocationTariff, CloudProfile
+)
+from ru_smb_it_budget_planner.calculator.scenario_builder import PricingContext
+
+
+def workload(name, type_, vcpus, ram_gb=None, storage_gb=None, pd=False,
+             pd_special=False, kii=False, iops_profile="low", availability="99.5"):
+    """A workload with 3 GB of RAM and 25 GB of storage per vCPU unless given."""
+    return Workload(name=name, type=type_, vcpus=vcpus,
+                    ram_gb=vcpus * 3 if ram_gb is None else ram_gb,
+                    storage_gb=vcpus * 25 if storage_gb is None else storage_gb,
+                    iops_profile=iops_profile, availability=availability,
+                    contains_pd=pd, contains_pd_special=pd_special, kii_related=kii)
+
+
+def sample_infra():
+    """Two workloads on one Moscow server; tests adjust their own copy."""
+    return InfraSpec(
+        company_profile=CompanyProfile(
+            name="Test", industry="IT", size_class="S", region="Moscow",
+            has_pd=False, has_pd_special=False, has_kii=False
+        ),
+        workloads=[
+            workload("web", "web", 2, ram_gb=4, storage_gb=20),
+            workload("db", "db", 4, ram_gb=8, storage_gb=100, pd=True,
+                     iops_profile="medium", availability="99.9")
+        ],
+        current_deployment=CurrentDeployment(
+            on_prem_servers=[
+                OnPremServer(name="srv1", vcpus=8, ram_gb=16, storage_gb=500,
+                             power_watts=200, region="Moscow", age_years=1,
+                             capex_rub=100000)
+            ]
+        )
+    )
+
+
+def sample_pricing():
+    return PricingContext(
+        electricity=[
+            ElectricityTariff(region="Moscow", tariff_rub_per_kwh=5.0,
+                              updated_at="2025")
+        ],
+        colocation=[],
+        cloud_profiles=[
+            CloudProfile(code="ru_cloud_gp", vCPU_price_rub_per_hour=1.0,
+                         ram_price_rub_per_gb_hour=0.5,
+                         storage_price_rub_per_gb_month=10.0,
+                         egress_price_rub_per_gb=1.0)
+        ]
+    )
+
+
+def client_spec(i, servers=2):
+    """
+    Client `i` of a synthetic portfolio: up to four workloads with mixed
+    compliance flags, servers in Moscow (two spellings) and Kazan, and one
+    colocation, cloud and license item each.
+    """
+    regions = ("Moscow", "г. Москва", "Kazan")
+    return InfraSpec(
+        company_profile=CompanyProfile(
+            name=f"Client {i}", industry="IT", size_class="S", region="Moscow",
+            has_pd=False, has_pd_special=False, has_kii=False
+        ),
+        workloads=[
+            workload(f"w{j}", ("web", "db", "email", "1c")[j], 1 + (i + j) % 7,
+                     ram_gb=3 + j, storage_gb=17 * (j + 1), pd=(i + j) % 3 == 0,
+                     kii=(i + j) % 5 == 4)
+            for j in range(i % 5)
+        ],
+        current_deployment=CurrentDeployment(
+            on_prem_servers=[
+                OnPremServer(name=f"srv{j}", vcpus=16, ram_gb=64, storage_gb=2000,
+                             power_watts=113 + 7 * i + j, region=regions[(i + j) % 3],
+                             age_years=(i + j) % 5,
+                             capex_rub=99999.99 + 333.37 * i + 0.1 * j)
+                for j in range(servers)
+            ],
+            colocation_units=[
+                ColocationUnit(dc_region="Kazan", units=1 + i % 2, power_watts=300,
+                               bandwidth_mbps=100)
+            ],
+            cloud_usage=[
+                CloudUsage(provider_profile="ru_cloud_gp", vcpus=2, ram_gb=3,
+                           storage_gb=11 * i, region="Moscow", egress_gb=i)
+            ],
+        ),
+        licenses=[
+            License(product="1C", metric="user", seats=5,
+                    cost_rub_per_year=12345.67 * (i + 1))
+        ],
+    )
+
+
+def client_pricing():
+    """Tariffs for client_spec, with prices that do not round to kopecks."""
+    return PricingContext(
+        electricity=[
+            ElectricityTariff(region="Moscow", tariff_rub_per_kwh=5.3711,
+                              updated_at="2025"),
+            ElectricityTariff(region="Kazan", tariff_rub_per_kwh=4.11,
+                              updated_at="2025"),
+        ],
+        colocation=[
+            ColocationTariff(region="Kazan", price_rub_per_u_per_month=2999.9,
+                             included_power_watts=300, included_bandwidth_mbps=100)
+        ],
+        cloud_profiles=[
+            CloudProfile(code="ru_cloud_gp", vCPU_price_rub_per_hour=1.137,
+                         ram_price_rub_per_gb_hour=0.3713,
+                         storage_price_rub_per_gb_month=9.71,
+                         egress_price_rub_per_gb=1.13),
+            CloudProfile(code="ru_cloud_pd", vCPU_price_rub_per_hour=1.9,
+                         ram_price_rub_per_gb_hour=0.6,
+                         storage_price_rub_per_gb_month=8.0,
+                         egress_price_rub_per_gb=1.5, pd_compliant=True),
+        ]
+    )
@@ -0,0 +1,44 @@
+import pytest
+from helpers import client_pricing, client_spec
+from ru_smb_it_budget_planner.calculator.scenario_builder import (
+    calculate_as_is, calculate_minimal_cloud, calculate_hybrid
+)
+from ru_smb_it_budget_planner.calculator.batch_engine import (
+    calculate_batch, to_scenario_costs
+)
+
+
+@pytest.fixture
+def pricing():
+    return client_pricing()
+
+
+def test_batch_matches_per_spec_functions(pricing):
+    specs = [client_spec(i) for i in range(12)]
+    result = calculate_batch(specs, pricing)
+
+    assert result.shape == (12,)
+    for i, infra in enumerate(specs):
+        expected = [
+            calculate_as_is(infra, pricing),
+            calculate_minimal_cloud(infra, pricing),
+            calculate_hybrid(infra, pricing),
+        ]
+        assert to_scenario_costs(result[i]) == expected
+
+
+def test_batch_without_target_profile_keeps_on_prem(pricing):
+    pricing = pricing.model_copy(update={"cloud_profiles": []})
+    spec = client_spec(1)
+    spec.current_deployment.cloud_usage = []
+    result = calculate_batch([spec], pricing)
+    hybrid, as_is = result["hybrid"][0], result["as_is"][0]
+    assert hybrid["hardware_amortization"] == as_is["hardware_amortization"]
+    assert result["hybrid"]["cloud"][0] == 0.0
+
+
+def test_batch_reports_missing_tariff(pricing):
+    spec = client_spec(2)
+    spec.current_deployment.on_prem_servers[0].region = "Чукотка"
+    with pytest.raises(ValueError, match="(?s)Спецификация #1.*Чукотка"):
+        calculate_batch([client_spec(1), spec], pricing)
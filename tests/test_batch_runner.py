@@ -0,0 +1,51 @@
+import io
+import json
+import yaml
+import pytest
+from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
+from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+from ru_smb_it_budget_planner.calculator.pipeline import evaluate_scenarios
+from ru_smb_it_budget_planner.runner.batch import run_batch
+
+EXAMPLES = "examples/small_retail_on_prem"
+
+
+@pytest.fixture
+def input_lines():
+    with open(f"{EXAMPLES}/infra.yaml", encoding="utf-8") as f:
+        spec = yaml.safe_load(f)
+    lines = [
+        json.dumps({"id": f"client-{i}", "spec": spec}, ensure_ascii=False)
+        for i in range(5)
+    ]
+    lines.insert(2, '{"id": "broken", "spec": {"workloads": []}}')
+    lines.insert(4, "not json")
+    lines.append("")
+    lines.append(json.dumps(spec, ensure_ascii=False))
+    return [line + "\n" for line in lines]
+
+
+@pytest.mark.parametrize("workers, ordered", [(1, True), (2, True), (2, False)])
+def test_run_batch_streams_results_and_errors(input_lines, workers, ordered):
+    out, errors = io.StringIO(), io.StringIO()
+    stats = run_batch(input_lines, f"{EXAMPLES}/pricing.yaml", out, errors,
+                      workers=workers, chunk_size=2, ordered=ordered)
+
+    assert stats.processed == 8
+    assert stats.failed == 2
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    failures = [json.loads(line) for line in errors.getvalue().splitlines()]
+
+    ids = [r["id"] for r in results]
+    expected_ids = [f"client-{i}" for i in range(5)] + [9]
+    if ordered:
+        assert ids == expected_ids
+    else:
+        assert sorted(map(str, ids)) == sorted(map(str, expected_ids))
+    assert {f["id"] for f in failures} == {"broken", 5}
+    broken = next(f for f in failures if f["id"] == "broken")
+    assert broken["line"] == 3
+
+    expected = evaluate_scenarios(parse_infra_spec(f"{EXAMPLES}/infra.yaml"),
+                                  load_pricing_context(f"{EXAMPLES}/pricing.yaml"))
+    assert results[0]["scenarios"] == [s.model_dump() for s in expected]
@@ -1,7 +1,10 @@
 import pytest
+import numpy as np
 from ru_smb_it_budget_planner.models.infra_model import InfraSpec, CompanyProfile, Workload, CurrentDeployment, OnPremServer
 from ru_smb_it_budget_planner.models.pricing_model import ElectricityTariff, ColocationTariff, CloudProfile
 from ru_smb_it_budget_planner.calculator.scenario_builder import calculate_as_is, calculate_minimal_cloud, PricingContext
+from ru_smb_it_budget_planner.calculator.energy_calc import calculate_monthly_kwh
+from ru_smb_it_budget_planner.calculator.on_prem_calc import server_monthly_amortization
 
 @pytest.fixture
 def sample_infra():
@@ -45,3 +48,38 @@ def test_minimal_cloud_calculation(sample_infra, sample_pricing):
     # Amortization should be reduced (linear scaling assumption)
     as_is = calculate_as_is(sample_infra, sample_pricing)
     assert cost.details["hardware_amortization"] < as_is.details["hardware_amortization"]
+
+def test_pricing_lookup_normalizes_and_falls_back():
+    pricing = PricingContext(
+        electricity=[
+            ElectricityTariff(region="Москва", tariff_rub_per_kwh=7.0,
+                              updated_at="2025"),
+            ElectricityTariff(region="Приволжский федеральный округ",
+                              tariff_rub_per_kwh=5.5, updated_at="2025"),
+            ElectricityTariff(region="Россия", tariff_rub_per_kwh=6.0,
+                              updated_at="2025"),
+        ],
+        colocation=[],
+        cloud_profiles=[]
+    )
+    assert pricing.get_electricity_tariff("г. Москва").tariff_rub_per_kwh == 7.0
+    assert pricing.get_electricity_tariff("Moscow").tariff_rub_per_kwh == 7.0
+    assert pricing.get_electricity_tariff("Самарская обл.").tariff_rub_per_kwh == 5.5
+    assert pricing.get_electricity_tariff("Камчатский край").tariff_rub_per_kwh == 6.0
+    assert pricing.get_colocation_tariff("Москва") is None
+
+def test_as_is_reports_missing_tariffs(sample_infra, sample_pricing):
+    sample_infra.current_deployment.on_prem_servers[0].region = "Magadan"
+    with pytest.raises(ValueError) as excinfo:
+        calculate_as_is(sample_infra, sample_pricing)
+    assert "Magadan" in str(excinfo.value)
+
+def test_server_formulas_take_scalars_and_arrays():
+    capex = np.array([100000.0, 420000.0])
+    ages = np.array([1, 2])
+    assert server_monthly_amortization(100000.0, 1) == 100000.0 / 48
+    np.testing.assert_array_equal(server_monthly_amortization(capex, ages),
+                                  [100000.0 / 48, 420000.0 / 60])
+    assert calculate_monthly_kwh(np.array([200, 350])).tolist() == [
+        calculate_monthly_kwh(200), calculate_monthly_kwh(350)
+    ]
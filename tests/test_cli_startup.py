@@ -0,0 +1,64 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+# Cold-start import budget for `validate` in ms; the -X importtime total, so a
+# generous default holds on shared runners and RU_SMB_STARTUP_BUDGET_MS tunes it
+STARTUP_BUDGET_MS = float(os.environ.get("RU_SMB_STARTUP_BUDGET_MS", "1000"))
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+INFRA = EXAMPLES / "small_retail_on_prem" / "infra.yaml"
+
+# Modules that only the computing/printing commands may load
+HEAVY_MODULES = ("rich", "numpy", "ru_smb_it_budget_planner.calculator",
+                 "ru_smb_it_budget_planner.reporting")
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _import_times(*args):
+    # Runs this interpreter on fixed arguments, no untrusted input
+    proc = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-m", "ru_smb_it_budget_planner.cli",
+         *args],
+        capture_output=True, text=True, check=False,
+    )
+    modules = {}
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules[name] = int(cumulative_us)
+        # Top-level import; nested ones are part of its cumulative time
+        if len(indent) == 1:
+            total_us += int(cumulative_us)
+    return proc, modules, total_us / 1000.0
+
+
+def _validate_imports():
+    # --no-cache keeps the run out of the user's cache directory
+    proc, modules, total_ms = _import_times("validate", str(INFRA), "--no-cache")
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    return modules, total_ms
+
+
+def test_validate_skips_heavy_modules():
+    modules, _ = _validate_imports()
+    assert sorted(m for m in modules if m.startswith(HEAVY_MODULES)) == []
+
+
+def test_validate_stays_within_startup_budget():
+    _, total_ms = _validate_imports()
+    assert total_ms < STARTUP_BUDGET_MS, f"imports took {total_ms:.0f} ms"
+
+
+def test_help_loads_only_click():
+    proc, modules, _ = _import_times("--help")
+    assert proc.returncode == 0
+    assert not any(m.startswith("ru_smb_it_budget_planner.")
+                   and m != "ru_smb_it_budget_planner.cli" for m in modules)
+    assert "pydantic" not in modules
@@ -0,0 +1,107 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+from helpers import client_pricing, client_spec, workload
+from ru_smb_it_budget_planner.models.compiled import (
+    compile_infra, WORKLOAD_TYPES, PD, PD_SPECIAL, KII
+)
+from ru_smb_it_budget_planner.calculator.scenario_builder import calculate_as_is
+from ru_smb_it_budget_planner.calculator.money import kopecks
+from ru_smb_it_budget_planner.calculator.pipeline import evaluate_scenarios, ScenarioRun
+from ru_smb_it_budget_planner.calculator.placement import solve_placement
+
+
+MEDIUM = {"iops_profile": "medium", "availability": "99.9"}
+
+
+def _spec(servers=3):
+    """A client spec whose workloads cover every compliance flag."""
+    spec = client_spec(1, servers)
+    spec.workloads = [
+        workload("site", "web", 2, ram_gb=4, storage_gb=60, **MEDIUM),
+        workload("crm", "web", 2, ram_gb=4, storage_gb=60, pd=True, **MEDIUM),
+        workload("erp", "1c", 8, ram_gb=16, storage_gb=240, pd=True,
+                 pd_special=True, **MEDIUM),
+        workload("scada", "other", 4, ram_gb=8, storage_gb=120, kii=True, **MEDIUM),
+    ]
+    spec.current_deployment.cloud_usage[0].provider_profile = "RU_CLOUD_GP"
+    return spec
+
+
+@pytest.fixture
+def pricing():
+    return client_pricing()
+
+
+def test_compile_interns_names_and_encodes_flags():
+    c = compile_infra(_spec())
+
+    assert c.server_region_names == ("г. Москва", "Kazan", "Moscow")
+    assert c.server_region.tolist() == [0, 1, 2]
+    assert c.cloud_profile_names == ("RU_CLOUD_GP",)
+    assert [WORKLOAD_TYPES[t] for t in c.workload_type] == ["web", "web", "1c", "other"]
+    assert c.workload_flags.tolist() == [0, PD, PD | PD_SPECIAL, KII]
+    assert c.minimal_cloud_mask().tolist() == [True, False, False, False]
+    assert c.hybrid_mask().tolist() == [True, False, False, False]
+    assert c.server_vcpus.dtype == np.int32 and c.server_capex.dtype == np.float64
+    assert compile_infra(c) is c
+
+
+def test_compile_keeps_large_integers():
+    spec = _spec()
+    spec.current_deployment.on_prem_servers[0].storage_gb = 2 ** 40
+    c = compile_infra(spec)
+    assert c.server_storage.dtype == np.int64
+    assert c.server_storage[0] == 2 ** 40
+
+
+def test_as_is_matches_item_by_item_sums(pricing):
+    spec = _spec(servers=50)
+    cost = calculate_as_is(spec, pricing)
+
+    # Every item is rounded to kopecks, then the kopecks are added exactly
+    amortization = electricity = opex = 0
+    for server in spec.current_deployment.on_prem_servers:
+        tariff = pricing.get_electricity_tariff(server.region).tariff_rub_per_kwh
+        amortization += kopecks(server.capex_rub / ((server.age_years + 3) * 12.0))
+        energy = kopecks((server.power_watts / 1000.0) * 730 * tariff)
+        electricity += energy
+        opex += energy
+    opex += kopecks(2 * 2999.9)
+    opex += kopecks((2 * 1.137 + 3 * 0.3713) * 730 + 11 * 9.71 + 1 * 1.13)
+    opex += kopecks(12345.67 * 2 / 12.0)
+
+    assert cost.details["hardware_amortization"] == amortization / 100
+    assert cost.details["electricity"] == electricity / 100
+    assert cost.opex_monthly == opex / 100
+
+
+def test_pipeline_runs_on_compiled_spec(pricing):
+    spec = _spec()
+    compiled = compile_infra(spec)
+    names = ["as_is", "minimal_cloud", "hybrid", "optimal"]
+
+    assert (evaluate_scenarios(compiled, pricing, names)
+            == evaluate_scenarios(spec, pricing, names))
+    assert ScenarioRun(spec, pricing, compiled).get("compiled") is compiled
+
+    placements = {p.workload: p.placement
+                  for p in solve_placement(compiled, pricing).placements}
+    assert placements["crm"] in ("on_prem", "colocation", "cloud:ru_cloud_pd")
+    assert placements["erp"] in ("on_prem", "colocation")
+    assert placements["scada"] in ("on_prem", "colocation")
+
+
+def test_compiled_spec_is_at_least_five_times_smaller():
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        spec = _spec(servers=20_000)
+        models = tracemalloc.get_traced_memory()[0] - start
+        compiled = compile_infra(spec)
+        arrays = tracemalloc.get_traced_memory()[0] - start - models
+    finally:
+        tracemalloc.stop()
+    assert compiled.server_capex.size == 20_000
+    assert models > 5 * arrays
@@ -0,0 +1,91 @@
+import random
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from ru_smb_it_budget_planner.cli import cli
+from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec, validate_infra_spec
+from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+from ru_smb_it_budget_planner.calculator.pipeline import ScenarioRun
+from ru_smb_it_budget_planner.calculator.consolidation import (
+    pack, first_fit_decreasing, consolidate
+)
+
+INFRA = "examples/it_services_hybrid/infra.yaml"
+PRICING = "examples/it_services_hybrid/pricing.yaml"
+
+
+def _fleet(workloads, servers, seed=0):
+    rng = random.Random(seed)  # noqa: S311 - seeded test data
+    spec = parse_infra_spec(INFRA).model_dump()
+    spec["workloads"] = [
+        {**spec["workloads"][0], "name": f"vm-{i}", "vcpus": rng.choice((1, 2, 4, 8)),
+         "ram_gb": rng.choice((2, 4, 8, 16, 32)), "storage_gb": rng.randint(20, 500)}
+        for i in range(workloads)
+    ]
+    spec["current_deployment"]["on_prem_servers"] = [
+        {"name": f"srv-{i}", "vcpus": rng.choice((16, 32, 64)),
+         "ram_gb": rng.choice((64, 128, 256)),
+         "storage_gb": rng.choice((1000, 2000, 4000)),
+         "power_watts": rng.randint(200, 900), "region": "Санкт-Петербург",
+         "age_years": rng.randint(0, 8),
+         "capex_rub": float(rng.randint(150, 1500) * 1000)}
+        for i in range(servers)
+    ]
+    return validate_infra_spec(spec)
+
+
+def test_local_search_empties_bins_first_fit_leaves_open():
+    sizes = np.array([[3], [3], [2]])
+    caps = np.array([[4], [4], [8]])
+    cost = np.array([1.0, 1.0, 3.0])
+
+    # First fit decreasing spreads the items over every bin (cost 5)
+    assert first_fit_decreasing(sizes, caps, np.array([0, 1, 2])).tolist() == [0, 1, 2]
+    assign, passes = pack(sizes, caps, cost)
+    assert assign.tolist() == [2, 2, 2]
+    assert passes == 2
+
+
+def test_load_moves_to_cheaper_free_bin():
+    sizes = np.array([[2, 8]])
+    caps = np.array([[16, 64], [4, 16]])
+    cost = np.array([3.0, 1.0])
+    # The big server is cheaper per unit of capacity and is filled first
+    assert first_fit_decreasing(sizes, caps, np.array([0, 1])).tolist() == [0]
+    assign, _ = pack(sizes, caps, cost)
+    assert assign.tolist() == [1]
+
+
+def test_consolidation_is_feasible_and_reports_savings():
+    infra = _fleet(400, 150)
+    result = consolidate(infra, load_pricing_context(PRICING))
+
+    assert len(result.assignments) == 400 and not result.unplaced
+    servers = infra.current_deployment.on_prem_servers
+    assert [s.server for s in result.servers] == [s.name for s in servers]
+    hosts = {a.server for a in result.assignments}
+    for s in result.servers:
+        assert s.vcpus_used <= s.vcpus and s.ram_used_gb <= s.ram_gb
+        assert s.storage_used_gb <= s.storage_gb
+        assert s.keep == (s.server in hosts) == (s.workloads > 0)
+    assert result.decommissioned
+    assert result.amortization_savings_rub_monthly == pytest.approx(
+        sum(s.amortization_rub_monthly for s in result.servers if not s.keep))
+
+
+def test_scenario_consolidation_packs_remaining_workloads():
+    run = ScenarioRun(parse_infra_spec(INFRA), load_pricing_context(PRICING))
+    as_is, hybrid = run.consolidation("as_is"), run.consolidation("hybrid")
+    candidates = run.get("hybrid_candidates")
+    moved = {w.name for w, m in zip(run.infra.workloads, candidates) if m}
+
+    assert moved and not moved & {a.workload for a in hybrid.assignments}
+    assert len(as_is.assignments) == len(run.infra.workloads)
+    with pytest.raises(ValueError, match="optimal"):
+        run.consolidation("optimal")
+
+    result = CliRunner().invoke(cli, ["consolidate", INFRA, PRICING, "-s", "as_is"])
+    assert result.exit_code == 0, result.output
+    assert "Можно вывести из эксплуатации серверов: 0 из 1" in result.output
@@ -86,3 +86,26 @@ current_deployment: {}
     # Pydantic might coerce "yes" to True if strict=False, but let's check.
     # Actually Pydantic v2 is stricter. "yes" is not a valid bool by default.
     assert "Поле 'company_profile -> has_pd'" in str(excinfo.value)
+
+def test_json_spec_matches_yaml(tmp_path):
+    import json
+    source = "examples/small_retail_on_prem/infra.yaml"
+    with open(source, encoding="utf-8") as src:
+        data = yaml.safe_load(src)
+    f = tmp_path / "infra.json"
+    f.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    assert parse_infra_spec(str(f)) == parse_infra_spec(source)
+
+def test_invalid_infra_json(tmp_path):
+    f = tmp_path / "infra.json"
+    f.write_text('{"company_profile": {"name": "Test Corp"}, "workloads": [], '
+                 '"current_deployment": {}}', encoding="utf-8")
+    with pytest.raises(ValueError) as excinfo:
+        parse_infra_spec(str(f))
+    assert "company_profile -> industry" in str(excinfo.value)
+
+    f.write_text('{"company_profile": ', encoding="utf-8")
+    with pytest.raises(ValueError) as excinfo:
+        parse_infra_spec(str(f))
+    assert "Ошибка чтения JSON" in str(excinfo.value)
@@ -0,0 +1,108 @@
+import os
+import copy
+import pytest
+import yaml
+from ru_smb_it_budget_planner.dsl.parser import validate_infra_spec
+from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+from ru_smb_it_budget_planner.calculator.pipeline import evaluate_scenarios
+from ru_smb_it_budget_planner.calculator.incremental import IncrementalPlan
+from ru_smb_it_budget_planner.runner.watch import Watcher, poll_changes
+
+EXAMPLES = "examples/it_services_hybrid"
+
+
+@pytest.fixture
+def pricing():
+    return load_pricing_context(f"{EXAMPLES}/pricing.yaml")
+
+
+@pytest.fixture
+def data():
+    with open(f"{EXAMPLES}/infra.yaml", encoding="utf-8") as f:
+        spec = yaml.safe_load(f)
+    base = spec["workloads"][0]
+    spec["workloads"] = [dict(base, name=f"wl-{i}", type="web" if i % 2 else "db",
+                              contains_pd=i % 3 == 0)
+                         for i in range(50)]
+    return spec
+
+
+def _assert_matches_full(plan, data, pricing,
+                         names=("as_is", "minimal_cloud", "hybrid")):
+    # Exact: running totals are kept in kopecks
+    expected = evaluate_scenarios(validate_infra_spec(data), pricing, names)
+    assert plan.scenarios(names) == expected
+
+
+def test_update_reprices_only_changed_items(data, pricing):
+    plan = IncrementalPlan(pricing)
+    stats = plan.update(data)
+    assert stats.added == 50 + len(data["current_deployment"]["on_prem_servers"]) + len(
+        data["licenses"]
+    )
+    _assert_matches_full(plan, data, pricing)
+
+    edited = copy.deepcopy(data)
+    edited["workloads"][10]["vcpus"] = 32
+    del edited["workloads"][20]
+    edited["workloads"].insert(0, dict(edited["workloads"][5], name="new-web"))
+    edited["workloads"][30:40] = reversed(edited["workloads"][30:40])
+    edited["licenses"].append(
+        {"product": "CRM", "metric": "user", "seats": 10, "cost_rub_per_year": 120000}
+    )
+
+    stats = plan.update(edited)
+    assert (stats.added, stats.removed) == (3, 2)
+    _assert_matches_full(plan, edited, pricing,
+                         names=("hybrid", "as_is", "minimal_cloud"))
+    assert plan.infra == validate_infra_spec(edited)
+
+    # Many edits in a row accumulate no error
+    for i in range(20):
+        edited = copy.deepcopy(edited)
+        edited["workloads"][i]["ram_gb"] += 3
+        edited["licenses"][-1]["cost_rub_per_year"] += 0.37
+        plan.update(edited)
+    _assert_matches_full(plan, edited, pricing)
+
+
+def test_failed_update_keeps_previous_state(data, pricing):
+    plan = IncrementalPlan(pricing)
+    plan.update(data)
+    before = plan.scenarios()
+
+    missing = copy.deepcopy(data)
+    missing["current_deployment"]["on_prem_servers"][0]["region"] = "Якутия"
+    with pytest.raises(ValueError, match="Якутия"):
+        plan.update(missing)
+
+    invalid = copy.deepcopy(data)
+    invalid["workloads"][3]["vcpus"] = "много"
+    with pytest.raises(ValueError, match="workloads -> 3 -> vcpus"):
+        plan.update(invalid)
+
+    assert plan.scenarios() == before
+
+    # Sections of the wrong type are reported like a full validation, not read as empty
+    for field, value in (("workloads", {"oops": 1}), ("current_deployment", None),
+                         ("licenses", "1C")):
+        with pytest.raises(ValueError, match=f"Поле '{field}'"):
+            plan.update(dict(data, **{field: value}))
+    assert plan.scenarios() == before
+
+
+def test_watcher_refresh_and_polling(tmp_path, data):
+    infra_file = tmp_path / "infra.yaml"
+    infra_file.write_text(yaml.safe_dump(data, allow_unicode=True), encoding="utf-8")
+    watcher = Watcher(str(infra_file), f"{EXAMPLES}/pricing.yaml")
+
+    changes = poll_changes([str(infra_file)], sleep=lambda _: None)
+    first = watcher.refresh(next(changes))
+    assert first.pricing_reloaded
+
+    data["workloads"][0]["ram_gb"] *= 2
+    infra_file.write_text(yaml.safe_dump(data, allow_unicode=True), encoding="utf-8")
+    os.utime(infra_file, (1, 1))
+    second = watcher.refresh(next(changes))
+    assert not second.pricing_reloaded
+    assert (second.stats.added, second.stats.removed) == (1, 1)
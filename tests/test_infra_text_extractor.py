@@ -0,0 +1,79 @@
+import random
+
+import pytest
+import yaml
+
+from ru_smb_it_budget_planner.dsl.parser import validate_infra_spec
+from ru_smb_it_budget_planner.ai_interface.infra_text_extractor import (
+    KeywordMatcher, KeywordRule, InfraTextExtractor, DEFAULT_RULES, extract_specs,
+    spec_to_yaml,
+)
+from ru_smb_it_budget_planner.ai_interface.infra_text_to_yaml_stub import (
+    text_to_infra_yaml_stub
+)
+
+
+def test_matcher_finds_overlapping_keywords():
+    keywords = {"he": 1, "she": 2, "his": 4, "hers": 8, "аб": 16}
+    matcher = KeywordMatcher(keywords)
+    rng = random.Random(3)  # noqa: S311 - seeded test data
+    for _ in range(500):
+        text = "".join(rng.choice("hersiаб") for _ in range(rng.randint(0, 12)))
+        expected = 0
+        for word, mask in keywords.items():
+            if word in text:
+                expected |= mask
+        assert matcher.matches(text) == expected, text
+
+
+def test_extracts_specs_without_yaml():
+    texts = [
+        "У нас есть сайт и бухгалтерия в 1С, обрабатываем Персональные Данные",
+        "Только почта",
+        "WEB-магазин",
+    ]
+    specs = list(extract_specs(texts))
+
+    assert [w.name for w in specs[0].workloads] == ["website", "1c-server"]
+    assert specs[0].company_profile.has_pd
+    assert specs[1].workloads == [] and not specs[1].company_profile.has_pd
+    assert [w.type for w in specs[2].workloads] == ["web"]
+    # Specs built from the same matches are independent objects
+    specs[2].workloads[0].vcpus = 64
+    assert next(extract_specs(["web"])).workloads[0].vcpus == 2
+
+    text = text_to_infra_yaml_stub(texts[0])
+    assert validate_infra_spec(yaml.safe_load(text)) == specs[0]
+    header = "company_profile:\n  name: Generated Company\n"
+    assert spec_to_yaml(specs[1]).startswith(header)
+
+
+def test_stub_matches_only_cyrillic_1c_by_default():
+    # Latin "1c" is also a substring of "21c", "1cm" and the like; not a default keyword
+    for text in ("1c", "сервер 21c", "стойка 1cm", "хранилище 1C"):
+        assert "1c-server" not in text_to_infra_yaml_stub(text), text
+    assert "name: 1c-server" in text_to_infra_yaml_stub("Бухгалтерия 1С")
+
+    one_c = DEFAULT_RULES[2]
+    latin = KeywordRule(one_c.keywords + ("1c",), workload=one_c.workload)
+    extractor = InfraTextExtractor(DEFAULT_RULES[:2] + (latin,))
+    workloads = extractor.extract("хранилище 1C").workloads
+    assert [w.name for w in workloads] == ["1c-server"]
+
+
+def test_custom_rules_and_process_pool():
+    kii = KeywordRule(("кии", "объект кии"), profile={"has_kii": True})
+    rules = DEFAULT_RULES + (kii,)
+    extractor = InfraTextExtractor(rules)
+    rng = random.Random(5)  # noqa: S311 - seeded test data
+    words = ("сайт", "1С", "кии", "персональные данные", "склад", "офис")
+    texts = [" ".join(rng.choice(words) for _ in range(rng.randint(0, 6)))
+             for _ in range(300)]
+
+    serial = list(extract_specs(texts, extractor))
+    assert list(extract_specs(texts, extractor, workers=2, chunk_size=16)) == serial
+    assert [s.company_profile.has_kii for s in serial] == ["кии" in t for t in texts]
+
+    with pytest.raises(ValueError, match="Ошибка валидации"):
+        vpn = KeywordRule(("vpn",), workload={"name": "vpn", "type": "vpn"})
+        InfraTextExtractor(rules + (vpn,))
@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from ru_smb_it_budget_planner.cli import cli
+from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
+from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+from ru_smb_it_budget_planner.models.compiled import compile_infra
+from ru_smb_it_budget_planner.calculator.pipeline import (
+    ScenarioRun, build_ledger, register_node, unregister_node
+)
+from ru_smb_it_budget_planner.calculator.scenario_builder import (
+    calculate_moved_to_cloud
+)
+from ru_smb_it_budget_planner.calculator.ledger import CostLedger, ITEM_KINDS
+from ru_smb_it_budget_planner.reporting.ledger_export import (
+    write_ledger_csv, write_ledger_jsonl, export_ledger, LEDGER_COLUMNS
+)
+
+INFRA = "examples/small_retail_on_prem/infra.yaml"
+PRICING = "examples/small_retail_on_prem/pricing.yaml"
+SCENARIOS = ["as_is", "minimal_cloud", "hybrid", "optimal"]
+HYBRID_INFRA = "examples/it_services_hybrid/infra.yaml"
+HYBRID_PRICING = "examples/it_services_hybrid/pricing.yaml"
+
+
+@pytest.fixture
+def run():
+    return ScenarioRun(parse_infra_spec(INFRA), load_pricing_context(PRICING))
+
+
+def test_ledger_adds_up_to_scenario_details(run):
+    scenarios = run.scenarios(SCENARIOS)
+    ledger = run.ledger(SCENARIOS)
+    totals = ledger.totals()
+
+    assert ledger.scenario_names == tuple(SCENARIOS)
+    assert totals["as_is"] == scenarios[0].details
+    for s in scenarios:
+        assert totals[s.scenario_name] == pytest.approx(s.details, rel=1e-12, abs=1e-9)
+
+
+def test_rows_point_at_spec_items():
+    run = ScenarioRun(parse_infra_spec(HYBRID_INFRA),
+                      load_pricing_context(HYBRID_PRICING))
+    infra = run.infra
+    ledger = run.ledger(["as_is", "hybrid"])
+    names, codes = ledger.item_dictionary()
+
+    servers = ledger.kind == ITEM_KINDS.index("server")
+    servers_in_spec = {s.name for s in infra.current_deployment.on_prem_servers}
+    assert {names[c] for c in codes[servers]} == servers_in_spec
+    moved = ledger.kind == ITEM_KINDS.index("workload")
+    assert moved.any() and (ledger.scenario[moved] == 1).all()
+    assert {names[c] for c in codes[moved]} <= {w.name for w in infra.workloads}
+
+    # A compiled spec keeps no server names; rows are still there, exported blank
+    compiled = build_ledger(compile_infra(infra), run.pricing, ["as_is"])
+    names, codes = compiled.item_dictionary()
+    servers = compiled.kind == ITEM_KINDS.index("server")
+    assert {names[c] for c in codes[servers]} == {""}
+
+
+def test_csv_and_jsonl_exports(run):
+    ledger = run.ledger(SCENARIOS)
+
+    out = io.StringIO()
+    assert write_ledger_csv(ledger, out) == len(ledger)
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert tuple(rows[0]) == LEDGER_COLUMNS
+    assert len(rows) == len(ledger)
+    assert [float(r["amount_rub_monthly"]) for r in rows] == ledger.amount.tolist()
+
+    out = io.StringIO()
+    write_ledger_jsonl(ledger, out)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [{k: str(v) for k, v in r.items()} for r in records[:3]] == rows[:3]
+    assert records[-1]["scenario"] == "optimal"
+
+
+def test_parquet_export(run, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    ledger = run.ledger(SCENARIOS)
+    path = tmp_path / "ledger.parquet"
+    export_ledger(ledger, str(path))
+
+    table = pq.read_table(path)
+    assert table.column_names == list(LEDGER_COLUMNS)
+    assert table.column("amount_rub_monthly").to_pylist() == ledger.amount.tolist()
+    assert table.column("scenario").to_pylist()[0] == "as_is"
+
+
+def test_concat_merges_scenarios_and_rejects_scenarios_without_ledger(run):
+    parts = [run.ledger(["hybrid"]), run.ledger(["as_is"]), run.ledger(["hybrid"])]
+    merged = CostLedger.concat(parts)
+    assert merged.scenario_names == ("hybrid", "as_is")
+    assert np.bincount(merged.scenario).tolist() == [2 * len(parts[0]), len(parts[1])]
+
+    @register_node("all_cloud", depends_on=("as_is",), scenario=True)
+    def all_cloud(infra, pricing, as_is):
+        return calculate_moved_to_cloud("all_cloud", infra, pricing, as_is,
+                                        infra.workloads)
+
+    try:
+        with pytest.raises(ValueError, match="all_cloud"):
+            run.ledger(["all_cloud"])
+    finally:
+        unregister_node("all_cloud")
+
+
+def test_cli_plan_writes_ledger(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    result = CliRunner().invoke(cli, ["plan", INFRA, PRICING, "--format", "csv",
+                                      "--ledger", str(path)])
+    assert result.exit_code == 0, result.output
+    lines = path.read_text(encoding="utf-8").splitlines()
+    records = [json.loads(line) for line in lines]
+    assert {r["scenario"] for r in records} == {"as_is", "minimal_cloud", "hybrid"}
+
+    result = CliRunner().invoke(cli, ["plan", INFRA, PRICING,
+                                      "--ledger", str(tmp_path / "ledger.xlsx")])
+    assert result.exit_code == 1
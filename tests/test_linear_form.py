@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from helpers import workload
+from ru_smb_it_budget_planner.cli import cli
+from ru_smb_it_budget_planner.models.infra_model import (
+    InfraSpec, CompanyProfile, CurrentDeployment, OnPremServer,
+    ColocationUnit, CloudUsage, License,
+)
+from ru_smb_it_budget_planner.models.pricing_model import (
+    ElectricityTariff, ColocationTariff, CloudProfile
+)
+from ru_smb_it_budget_planner.calculator.scenario_builder import PricingContext
+from ru_smb_it_budget_planner.calculator.pipeline import evaluate_scenarios
+from ru_smb_it_budget_planner.calculator.linear_form import (
+    LINEAR_SCENARIOS, PriceParameter, compile_linear_form, sensitivity
+)
+
+EXAMPLES = "examples/it_services_hybrid"
+
+
+@pytest.fixture
+def infra():
+    return InfraSpec(
+        company_profile=CompanyProfile(name="Linear", industry="IT", size_class="M",
+                                       region="Moscow", has_pd=True,
+                                       has_pd_special=False, has_kii=False),
+        workloads=[workload("site", "web", 2, storage_gb=80),
+                   workload("crm", "db", 6, storage_gb=240, pd=True),
+                   workload("mail", "email", 3, storage_gb=120)],
+        current_deployment=CurrentDeployment(
+            on_prem_servers=[
+                OnPremServer(name="a", vcpus=16, ram_gb=64, storage_gb=2000,
+                             power_watts=350, region="Moscow", age_years=2,
+                             capex_rub=420000.0),
+                OnPremServer(name="b", vcpus=8, ram_gb=32, storage_gb=1000,
+                             power_watts=220, region="г. Москва", age_years=0,
+                             capex_rub=180000.0),
+                OnPremServer(name="c", vcpus=8, ram_gb=32, storage_gb=1000,
+                             power_watts=240, region="Kazan", age_years=4,
+                             capex_rub=150000.0),
+            ],
+            colocation_units=[ColocationUnit(dc_region="Moscow", units=2,
+                                             power_watts=300, bandwidth_mbps=100)],
+            cloud_usage=[CloudUsage(provider_profile="ru_cloud_pd", vcpus=4, ram_gb=8,
+                                    storage_gb=200, region="Moscow", egress_gb=50)],
+        ),
+        licenses=[License(product="1C", metric="user", seats=10,
+                          cost_rub_per_year=96000.0)],
+    )
+
+
+def _pricing(scale=1.0):
+    return PricingContext(
+        electricity=[ElectricityTariff(region="Moscow", tariff_rub_per_kwh=6.13 * scale,
+                                       updated_at="2025"),
+                     ElectricityTariff(region="Россия", tariff_rub_per_kwh=5.2,
+                                       updated_at="2025")],
+        colocation=[ColocationTariff(region="Moscow", price_rub_per_u_per_month=3100.0,
+                                     included_power_watts=300,
+                                     included_bandwidth_mbps=100)],
+        cloud_profiles=[
+            CloudProfile(code="ru_cloud_gp", vCPU_price_rub_per_hour=1.31 * scale,
+                         ram_price_rub_per_gb_hour=0.41,
+                         storage_price_rub_per_gb_month=6.3,
+                         egress_price_rub_per_gb=1.2),
+            CloudProfile(code="ru_cloud_pd", vCPU_price_rub_per_hour=1.9,
+                         ram_price_rub_per_gb_hour=0.6,
+                         storage_price_rub_per_gb_month=8.0,
+                         egress_price_rub_per_gb=1.5 / scale),
+            CloudProfile(code="unused", vCPU_price_rub_per_hour=9.0,
+                         ram_price_rub_per_gb_hour=9.0,
+                         storage_price_rub_per_gb_month=9.0,
+                         egress_price_rub_per_gb=9.0),
+        ],
+    )
+
+
+def _monthly(infra, pricing):
+    scenarios = evaluate_scenarios(infra, pricing, LINEAR_SCENARIOS)
+    return np.array([s.total_monthly_rub for s in scenarios])
+
+
+def test_form_reprices_like_the_calculators(infra):
+    form = compile_linear_form(infra, _pricing())
+
+    # Spellings of one region share a parameter; Kazan falls back to the national tariff
+    assert set(form.parameters) == {
+        PriceParameter("electricity", "Moscow", "tariff_rub_per_kwh"),
+        PriceParameter("electricity", "Россия", "tariff_rub_per_kwh"),
+        PriceParameter("colocation", "Moscow", "price_rub_per_u_per_month"),
+    } | {PriceParameter("cloud", code, f) for code in ("ru_cloud_pd", "ru_cloud_gp")
+         for f in ("vCPU_price_rub_per_hour", "ram_price_rub_per_gb_hour",
+                   "storage_price_rub_per_gb_month", "egress_price_rub_per_gb")}
+    assert not any(p.key == "ru_cloud_gp" for p in form.terms("as_is"))
+
+    # Per-item kopeck rounding of the calculators is the only difference
+    scales = (1.0, 0.5, 1.7)
+    prices = np.array([form.price_vector(_pricing(scale)) for scale in scales])
+    costs = form.monthly(prices)
+    assert costs.shape == (3, 3)
+    for row, scale in zip(costs, scales):
+        np.testing.assert_allclose(row, _monthly(infra, _pricing(scale)), atol=0.05)
+    np.testing.assert_allclose(form.monthly(prices[1]), costs[1])
+    np.testing.assert_allclose(form.yearly(), costs[0] * 12)
+
+
+def test_tornado_ranks_prices_by_swing(infra):
+    pricing = _pricing()
+    result = sensitivity(infra, pricing, ["as_is", "hybrid"], delta=0.25)
+    bars = result.bars["hybrid"]
+    assert [b.swing for b in bars] == sorted((b.swing for b in bars), reverse=True)
+    assert all(b.parameter.key != "unused" for b in bars)
+
+    parameter = PriceParameter("cloud", "ru_cloud_gp", "vCPU_price_rub_per_hour")
+    vcpu = next(b for b in bars if b.parameter == parameter)
+    profiles = [
+        p.model_copy(
+            update={"vCPU_price_rub_per_hour": p.vCPU_price_rub_per_hour * 1.25}
+        )
+        if p.code == "ru_cloud_gp" else p
+        for p in pricing.cloud_profiles
+    ]
+    raised = pricing.model_copy(update={"cloud_profiles": profiles})
+    expected = evaluate_scenarios(infra, raised, ["hybrid"])
+    assert vcpu.high_yearly_rub == pytest.approx(expected[0].total_yearly_rub, abs=0.5)
+    assert vcpu.low_yearly_rub < result.base_yearly_rub["hybrid"] < vcpu.high_yearly_rub
+
+    with pytest.raises(ValueError, match="не линеен по тарифам: optimal"):
+        compile_linear_form(infra, pricing, ["as_is", "optimal"])
+    with pytest.raises(ValueError, match="ru_cloud_pd"):
+        compile_linear_form(infra, pricing).price_vector(
+            pricing.model_copy(update={"cloud_profiles": pricing.cloud_profiles[:1]}))
+
+
+def test_cli_sensitivity():
+    files = [f"{EXAMPLES}/infra.yaml", f"{EXAMPLES}/pricing.yaml"]
+    result = CliRunner().invoke(cli, ["sensitivity", *files,
+                                      "-s", "hybrid", "--top", "2", "--delta", "0.1"])
+    assert result.exit_code == 0, result.output
+    assert "Чувствительность hybrid к ценам ±10%" in result.output
+    assert "ru_cloud_gp: vCPU" in result.output
+
+    result = CliRunner().invoke(cli, ["sensitivity", *files, "-s", "optimal"])
+    assert result.exit_code == 1
+    assert "не линеен по тарифам" in result.output
@@ -0,0 +1,92 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+from helpers import client_pricing, client_spec
+from ru_smb_it_budget_planner.models.infra_model import CompanyProfile
+from ru_smb_it_budget_planner.calculator.pipeline import evaluate_scenarios
+from ru_smb_it_budget_planner.calculator.batch_engine import (
+    calculate_batch, to_scenario_costs, SCENARIO_NAMES
+)
+from ru_smb_it_budget_planner.calculator.money import (
+    group_sum, kopecks, round_half_away, scale_kopecks, to_kopecks, to_rub
+)
+from ru_smb_it_budget_planner.calculator.portfolio import PortfolioAccumulator
+
+PRICING = client_pricing()
+
+
+def _batch(specs):
+    return calculate_batch(specs, PRICING)
+
+
+def _totals_kop(result):
+    return [int(to_kopecks(result[name]["total_monthly_rub"]).sum())
+            for name in SCENARIO_NAMES]
+
+
+def test_rounding_and_group_sums():
+    values = np.array([0.5, 1.5, 2.5, -0.5, -2.5, 2.4999, 0.0, 1e15 + 0.5])
+    assert round_half_away(values).tolist() == [1, 2, 3, -1, -3, 2, 0, 10 ** 15 + 1]
+    assert to_kopecks(np.array([0.125, 0.135, -0.125])).tolist() == [13, 14, -13]
+    assert scale_kopecks(np.array([1001, 3]), 0.5).tolist() == [501, 2]
+    assert (to_rub(150), to_rub(np.array([1, -250])).tolist()) == (1.5, [0.01, -2.5])
+    with pytest.raises(ValueError, match="конечным"):
+        to_kopecks(np.array([1.0, np.nan]))
+
+    rng = np.random.default_rng(3)
+    rub = rng.uniform(-1e6, 1e6, size=10_000)
+    assert [kopecks(v) for v in rub.tolist()] == to_kopecks(rub).tolist()
+
+    owner = rng.integers(0, 50, size=rub.size)
+    kop = to_kopecks(rub)
+    expected = np.zeros(50, dtype=np.int64)
+    np.add.at(expected, owner, kop)
+    order = rng.permutation(rub.size)
+    assert group_sum(owner, kop, 50).tolist() == expected.tolist()
+    assert group_sum(owner[order], kop[order], 50).tolist() == expected.tolist()
+    # Above the float-exact range the sums are still exact
+    big = np.full(4, 2 ** 61, dtype=np.int64)
+    sums = group_sum(np.array([0, 0, 1, 1]), big + [1, 0, 0, -1], 2)
+    assert sums.tolist() == [2 ** 62 + 1, 2 ** 62 - 1]
+
+
+def test_batch_serial_chunked_and_multiprocess_runs_are_bit_identical():
+    specs = [client_spec(i) for i in range(60)]
+    whole = _batch(specs)
+
+    for i in (0, 7, 33):
+        expected = evaluate_scenarios(specs[i], PRICING, SCENARIO_NAMES)
+        assert to_scenario_costs(whole[i]) == expected
+
+    chunks = [specs[i:i + 7] for i in range(0, len(specs), 7)]
+    chunked = np.concatenate([_batch(chunk) for chunk in chunks])
+    reversed_run = _batch(specs[::-1])[::-1]
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        parallel = np.concatenate(list(pool.map(_batch, chunks)))
+
+    assert chunked.tobytes() == whole.tobytes()
+    assert reversed_run.tobytes() == whole.tobytes()
+    assert parallel.tobytes() == whole.tobytes()
+    assert _totals_kop(chunked) == _totals_kop(reversed_run) == _totals_kop(whole)
+
+
+def test_portfolio_sums_do_not_depend_on_chunking_or_order():
+    rng = np.random.default_rng(11)
+    yearly = np.round(rng.uniform(1e3, 1e8, size=(999, 2)), 2)
+    company = CompanyProfile(name="c", industry="IT", size_class="S", region="Moscow",
+                             has_pd=False, has_pd_special=False, has_kii=False)
+
+    def summary(order, chunk):
+        acc = PortfolioAccumulator(("as_is", "hybrid"), top_k=0)
+        for start in range(0, len(order), chunk):
+            rows = order[start:start + chunk]
+            acc.add([str(i) for i in rows], [company] * len(rows), yearly[rows])
+        return acc.summary()
+
+    first = summary(np.arange(999), 999)
+    for order, chunk in ((np.arange(999), 10), (rng.permutation(999), 64)):
+        other = summary(order, chunk)
+        assert other.cost_sum.tobytes() == first.cost_sum.tobytes()
+        assert other.savings_sum.tobytes() == first.savings_sum.tobytes()
+    assert first.cost_sum[0, 0] == int(to_kopecks(yearly[:, 0]).sum()) / 100
@@ -0,0 +1,69 @@
+import pytest
+from helpers import sample_infra, workload
+from ru_smb_it_budget_planner.calculator.scenario_builder import (
+    calculate_as_is, calculate_minimal_cloud, calculate_hybrid,
+    calculate_moved_to_cloud
+)
+from ru_smb_it_budget_planner.calculator import pipeline
+from ru_smb_it_budget_planner.calculator.pipeline import (
+    ScenarioRun, evaluate_scenarios, register_node, unregister_node
+)
+
+
+@pytest.fixture
+def infra():
+    spec = sample_infra()
+    spec.workloads.insert(1, workload("mail", "email", 2, ram_gb=4, storage_gb=200))
+    return spec
+
+
+def test_pipeline_matches_direct_functions(infra, pricing):
+    scenarios = evaluate_scenarios(infra, pricing)
+    assert scenarios == [
+        calculate_as_is(infra, pricing),
+        calculate_minimal_cloud(infra, pricing),
+        calculate_hybrid(infra, pricing),
+    ]
+
+
+def test_as_is_computed_once(infra, pricing, monkeypatch):
+    calls = []
+    original = pipeline.calculate_as_is
+
+    def counting(*args):
+        calls.append(1)
+        return original(*args)
+
+    monkeypatch.setattr(pipeline, "calculate_as_is", counting)
+    run = ScenarioRun(infra, pricing)
+    run.scenarios()
+    run.scenario("hybrid")
+    assert len(calls) == 1
+
+
+def test_third_party_scenario(infra, pricing):
+    @register_node("all_cloud", depends_on=("as_is",), scenario=True)
+    def all_cloud(infra, pricing, as_is):
+        return calculate_moved_to_cloud("all_cloud", infra, pricing, as_is,
+                                        infra.workloads)
+
+    try:
+        run = ScenarioRun(infra, pricing)
+        result = run.scenario("all_cloud")
+        assert result.details["hardware_amortization"] == 0.0
+        assert run.is_computed("as_is")
+    finally:
+        unregister_node("all_cloud")
+
+
+def test_dependency_cycle_is_reported(infra, pricing):
+    register_a = register_node("loop_a", depends_on=("loop_b",), scenario=True)
+    register_b = register_node("loop_b", depends_on=("loop_a",))
+    register_a(lambda infra, pricing, loop_b: loop_b)
+    register_b(lambda infra, pricing, loop_a: loop_a)
+    try:
+        with pytest.raises(ValueError, match="Циклическая зависимость"):
+            ScenarioRun(infra, pricing).scenario("loop_a")
+    finally:
+        unregister_node("loop_a")
+        unregister_node("loop_b")
@@ -0,0 +1,122 @@
+import itertools
+import random
+import pytest
+from helpers import workload
+from ru_smb_it_budget_planner.models.infra_model import (
+    InfraSpec, CompanyProfile, CurrentDeployment, OnPremServer
+)
+from ru_smb_it_budget_planner.models.pricing_model import (
+    ElectricityTariff, CloudProfile
+)
+from ru_smb_it_budget_planner.calculator.scenario_builder import (
+    PricingContext, calculate_as_is
+)
+from ru_smb_it_budget_planner.calculator.placement import (
+    solve_placement, calculate_optimal, _knapsack, ON_PREM
+)
+
+
+def _infra(workloads, server_vcpus=64, server_ram=256):
+    return InfraSpec(
+        company_profile=CompanyProfile(
+            name="Test", industry="IT", size_class="S", region="Moscow",
+            has_pd=True, has_pd_special=False, has_kii=True
+        ),
+        workloads=workloads,
+        current_deployment=CurrentDeployment(
+            on_prem_servers=[
+                OnPremServer(name="srv1", vcpus=server_vcpus, ram_gb=server_ram,
+                             storage_gb=2000, power_watts=400, region="Moscow",
+                             age_years=1, capex_rub=600000)
+            ]
+        )
+    )
+
+
+@pytest.fixture
+def pricing():
+    return PricingContext(
+        electricity=[
+            ElectricityTariff(region="Moscow", tariff_rub_per_kwh=6.0,
+                              updated_at="2025")
+        ],
+        colocation=[],
+        cloud_profiles=[
+            CloudProfile(code="cheap", vCPU_price_rub_per_hour=0.2,
+                         ram_price_rub_per_gb_hour=0.05,
+                         storage_price_rub_per_gb_month=1.0,
+                         egress_price_rub_per_gb=0.5),
+            CloudProfile(code="pd_cloud", vCPU_price_rub_per_hour=0.4,
+                         ram_price_rub_per_gb_hour=0.1,
+                         storage_price_rub_per_gb_month=2.0,
+                         egress_price_rub_per_gb=0.5, pd_compliant=True),
+        ]
+    )
+
+
+def test_compliance_constraints(pricing):
+    infra = _infra(
+        [workload("web", "other", 4, ram_gb=8, storage_gb=10),
+         workload("crm", "other", 4, ram_gb=8, storage_gb=10, pd=True),
+         workload("scada", "other", 4, ram_gb=8, storage_gb=10, kii=True)]
+    )
+    result = solve_placement(infra, pricing)
+    placement = {p.workload: p.placement for p in result.placements}
+    assert placement == {"web": "cloud:cheap", "crm": "cloud:pd_cloud",
+                         "scada": ON_PREM}
+    assert result.proven_optimal
+
+
+def test_all_on_prem_reproduces_as_is():
+    pricing = PricingContext(
+        electricity=[
+            ElectricityTariff(region="Moscow", tariff_rub_per_kwh=6.0,
+                              updated_at="2025")
+        ],
+        colocation=[], cloud_profiles=[]
+    )
+    infra = _infra([workload("a", "other", 4, ram_gb=8, storage_gb=10),
+                    workload("b", "other", 2, ram_gb=4, storage_gb=10)])
+    optimal = calculate_optimal(infra, pricing)
+    assert optimal.total_monthly_rub == pytest.approx(
+        calculate_as_is(infra, pricing).total_monthly_rub
+    )
+
+
+def test_knapsack_matches_brute_force():
+    rng = random.Random(3)  # noqa: S311 - seeded test data
+    for _ in range(20):
+        n = 10
+        gains = [rng.uniform(1, 100) for _ in range(n)]
+        weights = [(rng.randint(1, 16), rng.randint(1, 64)) for _ in range(n)]
+        caps = (40.0, 150.0)
+        _, best, upper, _ = _knapsack(gains, weights, caps, 1_000_000)
+        brute = max(
+            sum(gains[i] for i in combo)
+            for r in range(n + 1) for combo in itertools.combinations(range(n), r)
+            if all(sum(weights[i][d] for i in combo) <= caps[d] for d in range(2))
+        )
+        assert best == pytest.approx(brute)
+        assert upper == pytest.approx(best)
+
+
+def test_capacity_limit_and_bound_with_many_workloads(pricing):
+    rng = random.Random(5)  # noqa: S311 - seeded test data
+    # Expensive cloud makes every workload prefer on-prem, which cannot hold them all
+    pricing = pricing.model_copy(update={"cloud_profiles": [
+        CloudProfile(code="cheap", vCPU_price_rub_per_hour=5.0,
+                     ram_price_rub_per_gb_hour=0.6, storage_price_rub_per_gb_month=1.0,
+                     egress_price_rub_per_gb=0.5)
+    ]})
+    workloads = [
+        workload(f"w{i}", "other", rng.randint(1, 8), ram_gb=rng.randint(2, 32),
+                 storage_gb=10)
+        for i in range(300)
+    ]
+    infra = _infra(workloads, server_vcpus=400, server_ram=2000)
+    result = solve_placement(infra, pricing, node_limit=20_000)
+
+    on_prem = [p for p in result.placements if p.placement == ON_PREM]
+    assert sum(p.vcpus for p in on_prem) <= 400
+    assert 0 < len(on_prem) < 300
+    assert result.lower_bound_monthly_rub <= result.objective_monthly_rub + 1e-6
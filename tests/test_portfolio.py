@@ -0,0 +1,106 @@
+import copy
+import json
+
+import numpy as np
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from ru_smb_it_budget_planner.cli import cli
+from ru_smb_it_budget_planner.dsl.parser import validate_infra_spec
+from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+from ru_smb_it_budget_planner.calculator.pipeline import evaluate_scenarios
+from ru_smb_it_budget_planner.calculator.portfolio import (
+    PortfolioAccumulator, group_percentiles
+)
+from ru_smb_it_budget_planner.models.infra_model import CompanyProfile
+from ru_smb_it_budget_planner.runner.portfolio import iter_specs, run_portfolio
+
+EXAMPLES = "examples/it_services_hybrid"
+
+
+def _company(region, industry="IT", size_class="S"):
+    return CompanyProfile(name="c", industry=industry, size_class=size_class,
+                          region=region, has_pd=False, has_pd_special=False,
+                          has_kii=False)
+
+
+def test_group_percentiles_match_numpy():
+    rng = np.random.default_rng(7)
+    groups = rng.integers(0, 5, size=1000)
+    values = rng.normal(size=1000)
+    result = group_percentiles(groups, values, 6, (0, 25, 50, 90, 100))
+
+    for g in range(5):
+        expected = np.percentile(values[groups == g], [0, 25, 50, 90, 100])
+        assert result[g] == pytest.approx(expected)
+    assert np.isnan(result[5]).all()
+
+
+def test_accumulator_groups_and_ranks_across_chunks():
+    acc = PortfolioAccumulator(("as_is", "hybrid"), group_by=("region",), top_k=2)
+    acc.add(["a", "b"], [_company("Москва"), _company("Kazan")],
+            [[100.0, 90.0], [50.0, 60.0]])
+    acc.add(["c", "d"], [_company("г. Москва"), _company("Казань")],
+            [[300.0, 100.0], [80.0, 75.0]])
+    summary = acc.summary((50,))
+
+    assert summary.groups == [("Москва",), ("Kazan",), ("Казань",)]
+    assert summary.clients.tolist() == [2, 1, 1]
+    assert summary.cost_sum[0].tolist() == [400.0, 190.0]
+    assert summary.savings_mean[0].tolist() == [0.0, 105.0]
+    assert summary.cost_percentiles[0, 0, 0] == 200.0
+    # b has no saving and is not ranked
+    top = [(c.client, c.savings_yearly_rub) for c in summary.top_clients]
+    assert top == [("c", 200.0), ("a", 10.0)]
+    assert summary.top_clients[0].savings_pct == pytest.approx(200 / 3)
+
+
+def test_run_portfolio_over_jsonl(tmp_path):
+    pricing = load_pricing_context(f"{EXAMPLES}/pricing.yaml")
+    with open(f"{EXAMPLES}/infra.yaml", encoding="utf-8") as f:
+        spec = yaml.safe_load(f)
+    retail = copy.deepcopy(spec)
+    retail["company_profile"]["industry"] = "retail"
+    unpriced = copy.deepcopy(spec)
+    unpriced["current_deployment"]["on_prem_servers"][0]["region"] = "Владивосток"
+    lines = [json.dumps({"id": f"it-{i}", "spec": spec}, ensure_ascii=False)
+             for i in range(3)]
+    lines += [json.dumps({"id": "shop", "spec": retail}, ensure_ascii=False),
+              "not json",
+              json.dumps({"id": "far", "spec": unpriced}, ensure_ascii=False)]
+    path = tmp_path / "clients.jsonl"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    summary = run_portfolio(iter_specs(str(path)), pricing,
+                            ("minimal_cloud", "optimal"), group_by=("industry",),
+                            chunk_size=2)
+
+    names = ["as_is", "minimal_cloud", "optimal"]
+    expected = {s.scenario_name: s.total_yearly_rub
+                for s in evaluate_scenarios(validate_infra_spec(spec), pricing, names)}
+    assert summary.scenario_names == ("as_is", "minimal_cloud", "optimal")
+    assert summary.groups == [(spec["company_profile"]["industry"],), ("retail",)]
+    assert summary.clients.tolist() == [3, 1]
+    assert summary.cost_sum[0, 2] == pytest.approx(3 * expected["optimal"])
+    assert (summary.processed, summary.failed) == (6, 2)
+    assert summary.errors[0].startswith("5: Ошибка чтения JSON")
+    assert summary.errors[1].startswith("far: В ценах отсутствуют данные")
+    assert summary.top_clients[0].client == "it-0"
+    assert summary.top_clients[0].scenario == "optimal"
+
+
+def test_cli_portfolio_over_directory(tmp_path):
+    for name in ("a", "b"):
+        (tmp_path / "clients" / name).mkdir(parents=True)
+        (tmp_path / "clients" / name / "infra.yaml").write_text(
+            open(f"{EXAMPLES}/infra.yaml", encoding="utf-8").read(), encoding="utf-8")
+
+    result = CliRunner().invoke(cli, ["portfolio", str(tmp_path / "clients"),
+                                      f"{EXAMPLES}/pricing.yaml", "-g", "region",
+                                      "-g", "size_class", "--format", "csv"])
+    assert result.exit_code == 0, result.output
+    lines = result.stdout.splitlines()
+    assert lines[0].startswith("region,size_class,Сценарий,Клиентов")
+    assert lines[1].split(",")[2:4] == ["as_is", "2"]
+    assert "Клиентов обработано: 2, с ошибками: 0" in result.stderr
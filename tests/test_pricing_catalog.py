@@ -0,0 +1,104 @@
+import pickle
+import pytest
+from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
+from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+from ru_smb_it_budget_planner.dsl.catalog import (
+    compile_catalog, open_catalog, CatalogTable, MAGIC
+)
+from ru_smb_it_budget_planner.calculator.pipeline import evaluate_scenarios
+
+EXAMPLES = "examples/it_services_hybrid"
+
+OVERRIDE = """
+electricity:
+  - region: "СПб"
+    tariff_rub_per_kwh: 9.5
+  - region: "*"
+    tariff_rub_per_kwh: 8.0
+    updated_at: "2025-06-01"
+    comment: "Средний тариф по России"
+cloud_profiles:
+  - code: "ru_cloud_pd"
+    vCPU_price_rub_per_hour: 2.0
+    ram_price_rub_per_gb_hour: 0.7
+    storage_price_rub_per_gb_month: 7.0
+    egress_price_rub_per_gb: 1.5
+    pd_compliant: true
+"""
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    source = tmp_path / "pricing"
+    source.mkdir()
+    (source / "10-base.yaml").write_text(
+        open(f"{EXAMPLES}/pricing.yaml", encoding="utf-8").read(), encoding="utf-8"
+    )
+    (source / "20-override.yaml").write_text(OVERRIDE, encoding="utf-8")
+    path = tmp_path / "pricing.cat"
+    counts = compile_catalog(str(source), str(path))
+    assert counts == {"electricity": 2, "colocation": 1, "cloud_profiles": 2}
+    return str(path)
+
+
+def test_catalog_layers_overrides(catalog):
+    pricing = load_pricing_context(catalog)
+    assert isinstance(pricing.electricity, CatalogTable)
+
+    spb = pricing.get_electricity_tariff("Санкт-Петербург")
+    assert spb.tariff_rub_per_kwh == 9.5
+    assert spb.updated_at == "2025-01-01"  # Kept from the base layer
+    assert spb.region == "Санкт-Петербург"
+
+    fallback = pricing.get_electricity_tariff("Камчатский край")
+    assert fallback.comment == "Средний тариф по России"
+    assert pricing.get_cloud_profile("RU_CLOUD_PD").pd_compliant is True
+    assert pricing.get_colocation_tariff("Москва") is None
+
+
+def test_catalog_matches_yaml_results(tmp_path):
+    path = tmp_path / "pricing.cat"
+    compile_catalog(f"{EXAMPLES}/pricing.yaml", str(path))
+    infra = parse_infra_spec(f"{EXAMPLES}/infra.yaml")
+
+    from_yaml = evaluate_scenarios(infra,
+                                   load_pricing_context(f"{EXAMPLES}/pricing.yaml"))
+    from_catalog = evaluate_scenarios(infra, open_catalog(str(path)))
+    assert from_catalog == from_yaml
+
+
+def test_catalog_rows_are_lazy_and_picklable(catalog):
+    pricing = open_catalog(catalog)
+    table = pricing.cloud_profiles
+    assert table._cache == [None, None]
+
+    profile = pricing.get_cloud_profile("ru_cloud_pd")
+    assert table[1] is profile
+    assert table._cache[0] is None
+
+    # Unpickles what the test itself just pickled
+    restored = pickle.loads(pickle.dumps(pricing))  # noqa: S301
+    assert restored.cloud_profiles == list(table)
+    assert restored.get_cloud_profile("ru_cloud_pd") == profile
+
+
+def test_catalog_index_is_read_per_key(catalog):
+    pricing = open_catalog(catalog)
+    index = pricing.electricity.key_index
+    assert index._series == {}
+
+    assert pricing.get_electricity_tariff("СПб").tariff_rub_per_kwh == 9.5
+    assert pricing.get_electricity_tariff("Камчатский край").comment is not None
+    # Only the keys looked up, with the federal district and national fallbacks
+    assert set(index._series) == {"санкт-петербург", "камчатский край", "дфо", "*"}
+    assert index._series["камчатский край"] is None
+    assert sorted(index) == ["*", "санкт-петербург"] and len(index) == 2
+
+
+def test_catalog_version_mismatch(catalog, tmp_path):
+    data = bytearray(open(catalog, "rb").read())
+    data[len(MAGIC)] = 99
+    bad = tmp_path / "old.cat"
+    bad.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="compile-pricing"):
+        open_catalog(str(bad))
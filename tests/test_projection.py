@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from helpers import sample_infra
+from ru_smb_it_budget_planner.models.infra_model import License
+from ru_smb_it_budget_planner.models.pricing_model import HardwareProfile
+from ru_smb_it_budget_planner.calculator.pipeline import evaluate_scenarios
+from ru_smb_it_budget_planner.calculator.projection import ProjectionParams, project
+
+
+def _infra(age_years=1, name="Test"):
+    spec = sample_infra()
+    spec.company_profile.name = name
+    spec.workloads[1].vcpus = 2
+    server = spec.current_deployment.on_prem_servers[0]
+    server.age_years, server.capex_rub = age_years, 120000
+    spec.licenses = [
+        License(product="1C", metric="user", seats=5, cost_rub_per_year=12000)
+    ]
+    return spec
+
+
+def test_flat_projection_uses_lifetime_amortization(pricing):
+    infra = _infra(age_years=1)
+    result = project([infra], pricing,
+                     ProjectionParams(horizon_months=24, lifetime_years=4))
+    assert result.costs.shape == (1, 3, 5, 24)
+    assert result.costs.flags["C_CONTIGUOUS"]
+
+    hardware = result.costs[0, 0, 0]
+    np.testing.assert_allclose(hardware, 120000 / 48)
+    as_is = evaluate_scenarios(infra, pricing)[0]
+    np.testing.assert_allclose(result.costs[0, 0, 1], as_is.details["electricity"])
+    np.testing.assert_allclose(result.npv()[0], result.monthly_totals[0].sum(axis=1))
+
+
+def test_cash_mode_pays_renewal_once(pricing):
+    infra = _infra(age_years=4)
+    params = ProjectionParams(
+        horizon_months=36, lifetime_years=5, capex_mode="cash",
+        hardware=HardwareProfile(capex_rub=200000, lifetime_years=5, power_watts=300)
+    )
+    hardware = project([infra], pricing, params).costs[0, 0, 0]
+    assert hardware.sum() == pytest.approx(200000)
+    assert hardware[12] == pytest.approx(200000)
+
+
+def test_ramp_indexation_and_discounting(pricing):
+    params = ProjectionParams(horizon_months=24, migration_months=6,
+                              discount_rate_yearly=0.2,
+                              indexation_yearly={"licenses": 0.1})
+    result = project([_infra(name="A"), _infra(name="B")], pricing, params)
+    totals = result.monthly_totals
+
+    assert totals.shape == (2, 3, 24)
+    # Cloud cost of minimal_cloud ramps up over 6 months and then stays flat
+    cloud = result.costs[0, 1, 3]
+    assert cloud[0] < cloud[5] and cloud[5] == pytest.approx(cloud[23])
+    licenses = result.costs[0, 0, 4]
+    assert licenses[12] == pytest.approx(licenses[0] * 1.1)
+    assert (result.npv() < totals.sum(axis=2)).all()
+    assert result.yearly_totals().shape == (2, 3, 2)
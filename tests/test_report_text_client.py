@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+import pytest
+
+from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
+from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+from ru_smb_it_budget_planner.calculator.pipeline import evaluate_scenarios
+from ru_smb_it_budget_planner.ai_interface.report_text_generator_stub import (
+    generate_report_text_stub
+)
+from ru_smb_it_budget_planner.ai_interface.report_text_client import (
+    LruTextCache, ReportTextClient, ReportTextError, content_key, scenarios_payload
+)
+from ru_smb_it_budget_planner.ai_interface.report_text_standin import start_standin
+
+EXAMPLES = "examples/small_retail_on_prem"
+
+
+def _scenario_lists(count):
+    base = evaluate_scenarios(parse_infra_spec(f"{EXAMPLES}/infra.yaml"),
+                              load_pricing_context(f"{EXAMPLES}/pricing.yaml"))
+    return [
+        [s.model_copy(update={"total_yearly_rub": s.total_yearly_rub + i})
+         for s in base]
+        for i in range(count)
+    ]
+
+
+def _with_standin(latency_ms, scenario):
+    async def runner():
+        backend, server = await start_standin(port=0, latency_ms=latency_ms)
+        try:
+            return await scenario(backend, server.sockets[0].getsockname()[1])
+        finally:
+            server.close()
+    return asyncio.run(runner())
+
+
+def test_lru_cache_and_content_keys():
+    cache = LruTextCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")  # b is the least recently used
+    assert (cache.get("b"), cache.get("c"), len(cache)) == (None, "3", 2)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    payload = scenarios_payload(_scenario_lists(1)[0])
+    assert content_key(payload) == content_key(list(payload))
+    assert content_key(payload, "2") != content_key(payload)
+
+
+def test_concurrent_requests_are_batched_deduplicated_and_cached():
+    lists = _scenario_lists(10)
+
+    async def scenario(backend, port):
+        async with ReportTextClient("127.0.0.1", port, max_batch=4,
+                                    max_concurrency=2) as client:
+            first = await client.generate_many([lists[i % 10] for i in range(40)])
+            calls = backend.requests
+            second = await client.generate_many(lists)
+            return client, first, second, calls, (backend.requests, backend.items)
+
+    client, first, second, calls, served = _with_standin(50, scenario)
+    assert first == [generate_report_text_stub(lists[i % 10]) for i in range(40)]
+    assert second == first[:10]
+    # Equal inputs share one item; the 10 distinct ones go in batches of at most 4
+    assert served == (calls, 10)
+    assert 3 <= calls <= 5
+    assert client.backend_calls == calls
+    assert client.cache.hits == 10
+
+
+def test_concurrency_bound_and_timeout():
+    lists = _scenario_lists(6)
+
+    async def bounded(backend, port):
+        async with ReportTextClient("127.0.0.1", port, max_batch=2,
+                                    max_concurrency=1) as client:
+            start = time.perf_counter()
+            await client.generate_many(lists)
+            return backend.requests, time.perf_counter() - start
+
+    requests, elapsed = _with_standin(100, bounded)
+    assert requests == 3
+    assert elapsed >= 0.3
+
+    async def slow(backend, port):
+        async with ReportTextClient("127.0.0.1", port, timeout=0.05) as client:
+            with pytest.raises(ReportTextError, match="не ответил за 0.05 с"):
+                await client.generate(lists[0])
+            return len(client.cache)
+
+    assert _with_standin(500, slow) == 0
+
+
+def test_truncated_or_malformed_responses_fail_every_waiter():
+    lists = _scenario_lists(1)
+    # A body cut short of its Content-Length, then texts that are not strings
+    replies = [b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\n{\"texts\"",
+               b"HTTP/1.1 200 OK\r\nContent-Length: 14\r\n\r\n{\"texts\": [1]}"]
+
+    async def runner():
+        async def handle(reader, writer):
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(replies[handle.calls])
+            handle.calls += 1
+            await writer.drain()
+            writer.close()
+        handle.calls = 0
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            async with ReportTextClient("127.0.0.1", port, timeout=2) as client:
+                with pytest.raises(ReportTextError, match="недоступен"):
+                    await asyncio.wait_for(client.generate(lists[0]), 3)
+                # The failed key is not left in flight: a retry reaches the
+                # backend again
+                with pytest.raises(ReportTextError, match="некорректный ответ"):
+                    await asyncio.wait_for(client.generate(lists[0]), 3)
+                return handle.calls, len(client.cache)
+        finally:
+            server.close()
+
+    assert asyncio.run(runner()) == (2, 0)
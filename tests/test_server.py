@@ -0,0 +1,129 @@
+import asyncio
+import json
+import shutil
+import yaml
+from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
+from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+from ru_smb_it_budget_planner.calculator.pipeline import evaluate_scenarios
+from ru_smb_it_budget_planner.runner.server import (
+    start_service, plan_many, _reload_on_signal
+)
+
+EXAMPLES = "examples/small_retail_on_prem"
+
+
+def _spec_body():
+    with open(f"{EXAMPLES}/infra.yaml", encoding="utf-8") as f:
+        return json.dumps(yaml.safe_load(f), ensure_ascii=False).encode("utf-8")
+
+
+async def _call(port, method, target, body=b""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = (f"{method} {target} HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+def _with_service(pricing_file, scenario):
+    async def runner():
+        service, server, batcher = await start_service(pricing_file, port=0,
+                                                       max_wait_ms=20)
+        try:
+            return await scenario(service, server.sockets[0].getsockname()[1])
+        finally:
+            server.close()
+            batcher.cancel()
+    return asyncio.run(runner())
+
+
+def test_concurrent_requests_are_batched():
+    body = _spec_body()
+    expected = evaluate_scenarios(parse_infra_spec(f"{EXAMPLES}/infra.yaml"),
+                                  load_pricing_context(f"{EXAMPLES}/pricing.yaml"))
+
+    async def scenario(service, port):
+        responses = await asyncio.gather(
+            *(_call(port, "POST", "/plan", body) for _ in range(20))
+        )
+        return service, responses
+
+    service, responses = _with_service(f"{EXAMPLES}/pricing.yaml", scenario)
+    assert all(status == 200 for status, _ in responses)
+    assert all(payload["scenarios"] == [s.model_dump() for s in expected]
+               for _, payload in responses)
+    assert service.requests_served == 20
+    assert service.batches < 20
+
+
+def test_plan_errors_and_scenario_selection():
+    async def scenario(service, port):
+        invalid = await _call(port, "POST", "/plan", b'{"company_profile": {}}')
+        unknown = await _call(port, "POST", "/plan?scenario=nope", _spec_body())
+        selected = await _call(port, "POST", "/plan?scenario=optimal&scenario=as_is",
+                               _spec_body())
+        wrong_method = await _call(port, "GET", "/plan")
+        return invalid, unknown, selected, wrong_method
+
+    invalid, unknown, selected, wrong_method = _with_service(
+        f"{EXAMPLES}/pricing.yaml", scenario
+    )
+    assert invalid[0] == 422 and "Обязательное поле отсутствует" in invalid[1]["error"]
+    assert unknown[0] == 422 and "nope" in unknown[1]["error"]
+    assert [s["scenario_name"] for s in selected[1]["scenarios"]] == [
+        "optimal", "as_is"
+    ]
+    assert wrong_method[0] == 405
+
+
+def test_reload_swaps_pricing(tmp_path):
+    pricing_file = tmp_path / "pricing.yaml"
+    shutil.copy(f"{EXAMPLES}/pricing.yaml", pricing_file)
+
+    async def scenario(service, port):
+        before = await _call(port, "POST", "/plan?scenario=as_is", _spec_body())
+        data = yaml.safe_load(pricing_file.read_text(encoding="utf-8"))
+        data["electricity"][0]["tariff_rub_per_kwh"] *= 2
+        pricing_file.write_text(yaml.safe_dump(data, allow_unicode=True),
+                                encoding="utf-8")
+        reloaded = await _call(port, "POST", "/reload")
+        after = await _call(port, "POST", "/plan?scenario=as_is", _spec_body())
+        return before[1], reloaded[1], after[1]
+
+    before, reloaded, after = _with_service(str(pricing_file), scenario)
+    assert reloaded == {"pricing_version": 2}
+    assert (before["pricing_version"], after["pricing_version"]) == (1, 2)
+    electricity = before["scenarios"][0]["details"]["electricity"]
+    assert after["scenarios"][0]["details"]["electricity"] == 2 * electricity
+
+
+def test_signal_reload_reports_to_stderr(tmp_path, capsys):
+    pricing_file = tmp_path / "pricing.yaml"
+    shutil.copy(f"{EXAMPLES}/pricing.yaml", pricing_file)
+
+    async def scenario(service, port):
+        await _reload_on_signal(service)
+        pricing_file.write_text("electricity: [", encoding="utf-8")
+        await _reload_on_signal(service)
+        return service.pricing_version
+
+    assert _with_service(str(pricing_file), scenario) == 2
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "Цены перезагружены, версия 2" in captured.err
+    assert "Цены не перезагружены: Ошибка чтения YAML" in captured.err
+
+
+def test_plan_many_isolates_failures():
+    pricing = load_pricing_context(f"{EXAMPLES}/pricing.yaml")
+    good = parse_infra_spec(f"{EXAMPLES}/infra.yaml")
+    bad = good.model_copy(deep=True)
+    bad.current_deployment.on_prem_servers[0].region = "Якутия"
+
+    outcomes = plan_many([(good, ("hybrid", "as_is")), (bad, ("as_is",))], pricing)
+    assert outcomes[0] == evaluate_scenarios(good, pricing, ("hybrid", "as_is"))
+    assert isinstance(outcomes[1], ValueError) and "Якутия" in str(outcomes[1])
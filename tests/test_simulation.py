@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from helpers import sample_infra
+from ru_smb_it_budget_planner.models.infra_model import CloudUsage
+from ru_smb_it_budget_planner.models.pricing_model import ElectricityTariff
+from ru_smb_it_budget_planner.calculator.pipeline import evaluate_scenarios
+from ru_smb_it_budget_planner.calculator.simulation import (
+    FactorRange, TariffUncertainty, scenario_components, simulate
+)
+
+
+@pytest.fixture
+def infra():
+    spec = sample_infra()
+    spec.current_deployment.cloud_usage = [
+        CloudUsage(provider_profile="ru_cloud_gp", vcpus=1, ram_gb=2,
+                   storage_gb=50, region="Moscow", egress_gb=30)
+    ]
+    return spec
+
+
+def test_components_reproduce_base_costs(infra, pricing):
+    fixed, components = scenario_components(infra, pricing)
+    expected = [s.total_monthly_rub for s in evaluate_scenarios(infra, pricing)]
+    # The linear form is not rounded to kopecks per item like the calculators
+    np.testing.assert_allclose(fixed + components.sum(axis=1), expected, atol=0.01)
+
+
+def test_fixed_factors_scale_costs(infra, pricing):
+    uncertainty = TariffUncertainty(electricity=FactorRange.parse("1.15"),
+                                    cloud_vcpu=FactorRange.parse("2"))
+    result = simulate(infra, pricing, uncertainty, draws=1000, seed=1)
+
+    scaled = pricing.model_copy(update={
+        "electricity": [
+            ElectricityTariff(region="Moscow", tariff_rub_per_kwh=5.0 * 1.15,
+                              updated_at="2025")
+        ],
+        "cloud_profiles": [
+            pricing.cloud_profiles[0].model_copy(
+                update={"vCPU_price_rub_per_hour": 2.0}
+            )
+        ],
+    })
+    for s in evaluate_scenarios(infra, scaled):
+        assert result.percentiles_yearly_rub[s.scenario_name]["p50"] == pytest.approx(
+            s.total_yearly_rub
+        )
+
+
+def test_probabilities_and_workers(infra, pricing):
+    uncertainty = TariffUncertainty(cloud_vcpu=FactorRange.parse("0.1:1:3"))
+    result = simulate(infra, pricing, uncertainty, draws=20_000, seed=7, workers=2)
+    assert result.draws == 20_000
+    assert sum(result.probability_cheapest.values()) == pytest.approx(1.0)
+    p = result.percentiles_yearly_rub["hybrid"]
+    assert p["p5"] < p["p50"] < p["p95"]
+
+
+def test_factor_range_validation():
+    with pytest.raises(ValueError):
+        FactorRange.parse("2:1")
+    with pytest.raises(ValueError):
+        FactorRange.parse("abc")
+
+
+def test_price_dependent_scenarios_are_rejected(infra, pricing):
+    # optimal re-places workloads when prices move; a fixed decomposition would bias
+    # every draw
+    with pytest.raises(ValueError, match="не линеен по тарифам: optimal"):
+        simulate(infra, pricing, TariffUncertainty(), draws=10,
+                 scenario_names=["as_is", "optimal"])
@@ -0,0 +1,126 @@
+import csv
+import io
+import tracemalloc
+
+import pytest
+from click.testing import CliRunner
+
+from ru_smb_it_budget_planner.cli import cli
+from ru_smb_it_budget_planner.calculator.scenario_builder import ScenarioCost
+from ru_smb_it_budget_planner.reporting.streaming import (
+    write_scenario_comparison, write_cost_breakdown, write_scenario_details,
+    CATEGORIES, Column, TableWriter
+)
+from ru_smb_it_budget_planner.reporting.owner_report_ru import (
+    generate_owner_report, write_owner_report
+)
+
+INFRA = "examples/it_services_hybrid/infra.yaml"
+PRICING = "examples/it_services_hybrid/pricing.yaml"
+
+
+def _cost(name, opex, capex_yearly, details=None):
+    return ScenarioCost(
+        scenario_name=name, opex_monthly=opex, capex_yearly_amortized=capex_yearly,
+        total_monthly_rub=opex + capex_yearly / 12,
+        total_yearly_rub=opex * 12 + capex_yearly,
+        details=details or {}
+    )
+
+
+def _scenario(i):
+    return _cost(f"s{i}", 1000.0, 12000.0,
+                 {"hardware_amortization": 1000.0, "electricity": 1000.0 + i})
+
+
+class _NullWriter(io.TextIOBase):
+    def write(self, s):
+        return len(s)
+
+
+def test_text_pagination_repeats_header():
+    out = io.StringIO()
+    rows = write_scenario_comparison((_scenario(i) for i in range(5)), out, "text",
+                                     page_size=2)
+
+    text = out.getvalue()
+    assert rows == 5
+    assert text.count("Сценарий") == 3
+    assert "(стр. 3)" in text and "(стр. 4)" not in text
+    lines = text.splitlines()
+    assert lines[1].startswith("Сценарий") and lines[2].startswith("-----")
+    assert lines[3].split() == ["s0", "1,000.00", "1,000.00", "2,000.00", "24,000.00"]
+
+
+def test_incomplete_writer_fails_on_construction():
+    class HeaderOnly(TableWriter):
+        def _write_header(self, page):
+            pass
+
+    with pytest.raises(TypeError, match="_write_cells"):
+        HeaderOnly(io.StringIO(), [Column("x")])
+
+
+def test_markdown_and_csv():
+    scenarios = [_scenario(0), _cost("a|b", 1.0, 0.0)]
+
+    md = io.StringIO()
+    write_cost_breakdown(scenarios, md, "markdown")
+    lines = md.getvalue().splitlines()
+    assert lines[0] == "### Детализация расходов (RUB/мес)"
+    assert lines[3] == "|---|" + "---:|" * len(CATEGORIES)
+    assert lines[5].startswith("| a\\|b | 0.00")
+
+    out = io.StringIO()
+    write_scenario_details(scenarios, out, "csv", page_size=1)
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert len(rows) == 3
+    assert rows[0][:2] == ["scenario", "opex_monthly"]
+    assert rows[1][:5] == ["s0", "1000.00", "12000.00", "2000.00", "24000.00"]
+    assert rows[2][0] == "a|b"
+
+
+def test_streaming_memory_is_constant_in_row_count():
+    def peak(n):
+        out = _NullWriter()
+        tracemalloc.start()
+        try:
+            write_scenario_comparison((_scenario(i) for i in range(n)), out, "text",
+                                      page_size=50)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    small, large = peak(1_000), peak(50_000)
+    assert large < 2 * small + 64 * 1024
+
+
+def test_owner_report_stream_matches_string():
+    scenarios = [
+        _cost("as_is", 1000.0, 12000.0),
+        _cost("hybrid", 800.0, 6000.0),
+    ]
+    out = io.StringIO()
+    write_owner_report(scenarios, out)
+    assert out.getvalue() == generate_owner_report(scenarios)
+    assert "**Рекомендуемый сценарий:** hybrid" in out.getvalue()
+
+
+def test_cli_plan_formats(tmp_path):
+    runner = CliRunner()
+    result = runner.invoke(cli, ["plan", INFRA, PRICING, "--format", "csv"])
+    assert result.exit_code == 0, result.output
+    rows = list(csv.reader(io.StringIO(result.output)))
+    assert [r[0] for r in rows] == ["scenario", "as_is", "minimal_cloud", "hybrid"]
+
+    out = tmp_path / "plan.md"
+    result = runner.invoke(cli, ["plan", INFRA, PRICING, "--format", "markdown",
+                                 "-o", str(out)])
+    assert result.exit_code == 0, result.output
+    text = out.read_text(encoding="utf-8")
+    assert text.startswith("### Сравнение сценариев бюджета (RUB)")
+
+    result = runner.invoke(cli, ["plan", INFRA, PRICING, "--format", "rich",
+                                 "-o", str(out)])
+    assert result.exit_code == 1
+    assert "rich" in result.output
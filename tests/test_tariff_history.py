@@ -0,0 +1,177 @@
+import pickle
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from ru_smb_it_budget_planner.cli import cli
+from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
+from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+from ru_smb_it_budget_planner.dsl.catalog import compile_catalog
+from ru_smb_it_budget_planner.models.pricing_model import (
+    ElectricityTariff, CloudProfile
+)
+from ru_smb_it_budget_planner.calculator.scenario_builder import PricingContext
+from ru_smb_it_budget_planner.calculator.pipeline import evaluate_scenarios
+from ru_smb_it_budget_planner.calculator.projection import (
+    ProjectionParams, project, CATEGORIES
+)
+
+INFRA = "examples/small_retail_on_prem/infra.yaml"
+PRICING = "examples/small_retail_on_prem/pricing.yaml"
+
+HISTORY = """
+electricity:
+  - region: "Москва"
+    tariff_rub_per_kwh: 9.0
+    updated_at: "2025-06-20"
+    valid_from: 2025-07-01
+"""
+
+
+def _tariff(region, price, valid_from=None):
+    return ElectricityTariff(region=region, tariff_rub_per_kwh=price, updated_at="2025",
+                             valid_from=valid_from)
+
+
+def _profile(price, valid_from=None):
+    return CloudProfile(code="ru_cloud_gp", vCPU_price_rub_per_hour=price,
+                        ram_price_rub_per_gb_hour=0.5,
+                        storage_price_rub_per_gb_month=10.0,
+                        egress_price_rub_per_gb=1.0, valid_from=valid_from)
+
+
+def _with_history(tmp_path):
+    path = tmp_path / "pricing.yaml"
+    base = open(PRICING, encoding="utf-8").read()
+    path.write_text(base.replace("electricity:\n", HISTORY.lstrip(), 1),
+                    encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def pricing():
+    return PricingContext(
+        electricity=[
+            _tariff("Moscow", 6.0, date(2025, 7, 1)),
+            _tariff("Россия", 4.0),
+            _tariff("г. Москва", 5.0, date(2024, 1, 1)),
+        ],
+        colocation=[],
+        cloud_profiles=[_profile(1.2, date(2025, 1, 1)),
+                        _profile(1.0, date(2024, 1, 1))],
+    )
+
+
+def test_lookup_returns_version_in_force(pricing):
+    def price(as_of):
+        return pricing.get_electricity_tariff("Москва", as_of).tariff_rub_per_kwh
+
+    assert price(None) == 6.0
+    assert price(date(2025, 7, 1)) == 6.0
+    assert price(date(2025, 6, 30)) == 5.0
+    assert price(date(2024, 1, 1)) == 5.0
+    # Before the first regional version the national default applies
+    assert price(date(2023, 12, 31)) == 4.0
+    profile = pricing.get_cloud_profile("ru_cloud_gp", date(2024, 6, 1))
+    assert profile.vCPU_price_rub_per_hour == 1.0
+    assert pricing.get_cloud_profile("ru_cloud_gp", date(2023, 6, 1)) is None
+    assert pricing.price_changes(date(2024, 1, 1), date(2025, 7, 1)) == [
+        date(2025, 1, 1), date(2025, 7, 1)
+    ]
+
+
+def test_first_listed_row_wins_for_the_same_start_date():
+    pricing = PricingContext(electricity=[_tariff("Москва", 5.0),
+                                          _tariff("Moscow", 6.0),
+                                          _tariff("Moscow", 7.0, date(2024, 1, 1)),
+                                          _tariff("г. Москва", 8.0, date(2024, 1, 1))],
+                             colocation=[], cloud_profiles=[])
+    assert pricing.get_electricity_tariff("Moscow", date(2023, 1, 1)).region == "Москва"
+    tariff = pricing.get_electricity_tariff("Москва", date(2024, 1, 1))
+    assert tariff.tariff_rub_per_kwh == 7.0
+
+
+def test_dated_view_shares_indexes_and_survives_pickling(pricing):
+    view = pricing.at(date(2024, 6, 1))
+    assert view._indexes.electricity is pricing._indexes.electricity
+    assert pricing.as_of is None
+    assert view.get_electricity_tariff("Moscow").tariff_rub_per_kwh == 5.0
+
+    # Unpickles what the test itself just pickled
+    restored = pickle.loads(pickle.dumps(view))  # noqa: S301
+    assert restored.as_of == date(2024, 6, 1)
+    assert restored.get_cloud_profile("ru_cloud_gp").vCPU_price_rub_per_hour == 1.0
+
+    infra = parse_infra_spec(INFRA)
+    with pytest.raises(ValueError, match="на 2020-01-01"):
+        dated = load_pricing_context(PRICING).at(date(2020, 1, 1))
+        evaluate_scenarios(infra, dated.model_copy(update={"electricity": []}))
+
+
+def test_catalog_keeps_versions(tmp_path):
+    source = tmp_path / "pricing"
+    source.mkdir()
+    (source / "10-base.yaml").write_text(open(PRICING, encoding="utf-8").read(),
+                                         encoding="utf-8")
+    (source / "20-history.yaml").write_text(HISTORY, encoding="utf-8")
+    path = tmp_path / "pricing.cat"
+    assert compile_catalog(str(source), str(path))["electricity"] == 2
+
+    yaml_pricing = load_pricing_context(PRICING)
+    before = load_pricing_context(str(path), date(2025, 6, 30))
+    assert (before.get_electricity_tariff("Москва")
+            == yaml_pricing.get_electricity_tariff("Москва"))
+    after = load_pricing_context(str(path), date(2025, 7, 1)).get_electricity_tariff(
+        "Москва"
+    )
+    assert (after.tariff_rub_per_kwh, after.valid_from) == (9.0, date(2025, 7, 1))
+
+
+def test_projection_switches_tariffs_when_they_take_effect(tmp_path):
+    path = _with_history(tmp_path)
+    pricing = load_pricing_context(str(path))
+    assert len(pricing.electricity) == 2
+    infra = parse_infra_spec(INFRA)
+    params = ProjectionParams(horizon_months=12, start_date=date(2025, 1, 15))
+
+    costs = project([infra], pricing, params, ["as_is"]).costs
+    electricity = costs[0, 0, CATEGORIES.index("electricity")]
+    old, new = (
+        evaluate_scenarios(infra, pricing.at(d), ["as_is"])[0].details["electricity"]
+        for d in (date(2025, 1, 15), date(2025, 7, 1))
+    )
+    assert new > old
+    assert electricity == pytest.approx(np.array([old] * 6 + [new] * 6))
+
+
+def test_cli_plan_as_of(tmp_path):
+    path = _with_history(tmp_path)
+
+    def totals(*args):
+        result = CliRunner().invoke(cli, ["plan", INFRA, str(path), "-s", "as_is",
+                                          "--format", "csv", *args])
+        assert result.exit_code == 0, result.output
+        return result.output
+
+    assert totals("--as-of", "2025-06-30") != totals("--as-of", "2025-07-01")
+    assert totals("--as-of", "2025-07-01") == totals()
+    result = CliRunner().invoke(cli, ["plan", INFRA, str(path),
+                                      "--as-of", "2025-13-01"])
+    assert result.exit_code == 2
+
+
+def test_future_versions_do_not_apply_before_they_start(pricing):
+    scheduled = _tariff("Moscow", 99.0, date.today() + timedelta(days=400))
+    future = pricing.model_copy(
+        update={"electricity": pricing.electricity + [scheduled]}
+    )
+
+    assert future.get_electricity_tariff("Москва").tariff_rub_per_kwh == 6.0
+    scheduled_tariff = future.get_electricity_tariff("Москва", scheduled.valid_from)
+    assert scheduled_tariff.tariff_rub_per_kwh == 99.0
+    # A key whose only version is scheduled falls back like any missing key
+    only_future = PricingContext(electricity=[scheduled, _tariff("Россия", 4.0)],
+                                 colocation=[], cloud_profiles=[])
+    assert only_future.get_electricity_tariff("Moscow").tariff_rub_per_kwh == 4.0
@@ -0,0 +1,71 @@
+import json
+
+from click.testing import CliRunner
+
+from ru_smb_it_budget_planner import tracing
+from ru_smb_it_budget_planner.cli import cli
+from ru_smb_it_budget_planner.dsl.parser import parse_infra_spec
+from ru_smb_it_budget_planner.calculator.pricing_loader import load_pricing_context
+from ru_smb_it_budget_planner.calculator.pipeline import evaluate_scenarios
+
+INFRA = "examples/it_services_hybrid/infra.yaml"
+PRICING = "examples/it_services_hybrid/pricing.yaml"
+
+
+def test_spans_and_counters_recorded_only_while_enabled():
+    infra = parse_infra_spec(INFRA)
+    pricing = load_pricing_context(PRICING)
+    assert tracing.active_tracer() is None
+
+    with tracing.tracing() as tracer:
+        evaluate_scenarios(infra, pricing)
+        pricing.get_cloud_profile("no_such_profile")
+    assert tracing.active_tracer() is None
+
+    names = [s.name for s in tracer.summary()]
+    assert names[:2] == ["calculate_as_is", "calculate_moved_to_cloud"]
+    assert tracer.summary()[1].calls == 2  # minimal_cloud and hybrid
+    assert tracer.counters["tariff_lookups"] > 0
+    assert tracer.counters["tariff_misses"] == 1
+    assert tracer.counters["items_processed"] > 0
+
+    # Nothing leaks into a finished tracer
+    events = len(tracer.events)
+    evaluate_scenarios(infra, pricing)
+    assert len(tracer.events) == events
+
+
+def test_chrome_trace_export(tmp_path):
+    with tracing.tracing() as tracer:
+        with tracing.span("outer"):
+            with tracing.span("inner"):
+                pass
+        tracing.count("items", 3)
+
+    out = tmp_path / "trace.json"
+    tracer.write_chrome_trace(str(out))
+    data = json.loads(out.read_text(encoding="utf-8"))
+
+    spans = {e["name"]: e for e in data["traceEvents"] if e["ph"] == "X"}
+    outer, inner = spans["outer"], spans["inner"]
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    counters = [e for e in data["traceEvents"] if e["ph"] == "C"]
+    assert [(e["name"], e["args"]["value"]) for e in counters] == [("items", 3)]
+    assert data["otherData"]["counters"] == {"items": 3}
+
+
+def test_cli_profile_and_trace_out(tmp_path):
+    out = tmp_path / "trace.json"
+    result = CliRunner().invoke(
+        cli, ["--profile", "--trace-out", str(out), "plan", INFRA, PRICING]
+    )
+    assert result.exit_code == 0, result.output
+    assert "Профиль выполнения" in result.output
+    assert "tariff_lookups" in result.output
+
+    events = json.loads(out.read_text(encoding="utf-8"))["traceEvents"]
+    names = {e["name"] for e in events}
+    assert {"parse_infra_spec", "load_pricing_context", "calculate_as_is",
+            "write_scenario_comparison"} <= names
+    assert tracing.active_tracer() is None
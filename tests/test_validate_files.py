@@ -0,0 +1,101 @@
+import json
+
+from click.testing import CliRunner
+
+from ru_smb_it_budget_planner.cli import cli
+from ru_smb_it_budget_planner.runner import validate as validate_runner
+from ru_smb_it_budget_planner.runner.validate import (
+    expand_paths, validate_files, MIN_PARALLEL_FILES
+)
+
+INFRA = "examples/small_retail_on_prem/infra.yaml"
+
+
+def _specs(tmp_path, count):
+    text = open(INFRA, encoding="utf-8").read()
+    for i in range(count):
+        folder = tmp_path / "specs" / f"c{i % 3}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"infra-{i:02}.yaml").write_text(text, encoding="utf-8")
+    return tmp_path / "specs"
+
+
+def test_expand_paths_dedupes_directories_and_globs(tmp_path):
+    specs = _specs(tmp_path, 4)
+    (specs / "notes.txt").write_text("x", encoding="utf-8")
+    first = str(specs / "c0" / "infra-00.yaml")
+
+    paths = expand_paths([first, str(specs), str(specs / "**" / "*.yaml"),
+                          "missing.yaml"])
+    assert paths[0] == first
+    assert sorted(paths[1:4]) == paths[1:4] and len(paths) == 5
+    assert paths[-1] == "missing.yaml"
+
+
+def test_cache_skips_unchanged_files(tmp_path, monkeypatch):
+    specs = _specs(tmp_path, MIN_PARALLEL_FILES + 4)
+    broken = specs / "c1" / "infra-01.yaml"
+    broken.write_text("company_profile: {}\n", encoding="utf-8")
+    cache = str(tmp_path / "cache" / "validate.json")
+
+    first = validate_files([str(specs)], cache_path=cache, workers=2)
+    assert (len(first.results), len(first.failed), first.cached) == (20, 1, 0)
+    assert first.failed[0].path == str(broken)
+    assert "Обязательное поле отсутствует" in first.failed[0].error
+
+    calls = []
+    monkeypatch.setattr(validate_runner, "_validate_content",
+                        lambda item: calls.append(item[0]))
+    (specs / "c2" / "infra-02.yaml").write_text(
+        "\n" + open(INFRA, encoding="utf-8").read(), encoding="utf-8")
+    second = validate_files([str(specs)], cache_path=cache, workers=1)
+    assert calls == [str(specs / "c2" / "infra-02.yaml")]
+    assert second.cached == 19
+    assert [r.error for r in second.failed] == [first.failed[0].error]
+
+    # Another schema version invalidates everything
+    with open(cache, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["schema"] == validate_runner.schema_version()
+    monkeypatch.setattr(validate_runner, "schema_version", lambda: "other")
+    assert validate_files([str(specs)], cache_path=cache, workers=1).cached == 0
+
+
+def test_results_are_for_the_hashed_content(tmp_path, monkeypatch):
+    spec = _specs(tmp_path, 1) / "c0" / "infra-00.yaml"
+    cache = str(tmp_path / "validate.json")
+    validate_content = validate_runner._validate_content
+
+    def edited_meanwhile(item):
+        spec.write_text("company_profile: {}\n", encoding="utf-8")
+        return validate_content(item)
+
+    monkeypatch.setattr(validate_runner, "_validate_content", edited_meanwhile)
+    assert validate_files([str(spec)], cache_path=cache, workers=1).failed == []
+    monkeypatch.undo()
+    # The broken content has another hash: it is validated, not served from the cache
+    again = validate_files([str(spec)], cache_path=cache, workers=1)
+    assert (again.cached, len(again.failed)) == (0, 1)
+
+
+def test_cli_validate_many(tmp_path):
+    specs = _specs(tmp_path, 3)
+    (specs / "c0" / "bad.json").write_text("{", encoding="utf-8")
+    cache = str(tmp_path / "validate.json")
+
+    result = CliRunner().invoke(cli, ["validate", str(specs), "--cache", cache])
+    assert result.exit_code == 1
+    assert f"{specs / 'c0' / 'bad.json'}:\nОшибка валидации" in result.output
+    assert "Проверено файлов: 4, с ошибками: 1, из кэша: 0" in result.output
+
+    result = CliRunner().invoke(cli, ["validate", str(specs / "c1"), str(specs / "c2"),
+                                      "--cache", cache])
+    assert result.exit_code == 0, result.output
+    assert "Проверено файлов: 2, с ошибками: 0, из кэша: 2" in result.output
+
+    result = CliRunner().invoke(cli, ["validate", INFRA, "--no-cache"])
+    assert result.output.strip() == "Конфигурация корректна!"
+    result = CliRunner().invoke(cli, ["validate", str(tmp_path / "nothing" / "*.yaml"),
+                                      "--no-cache"])
+    assert result.exit_code == 1
+    assert result.output.strip() == "Файлы спецификаций не найдены"